@@ -0,0 +1,68 @@
+"""
+Itinerary Builder Scaling Benchmark
+Times the builder on long trips over large synthetic cities (30 days,
+10,000-100,000 POIs): the schedule core alone (block assignment over a prebuilt matrix) and
+build_records end to end per planning mode
+"""
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_tools.itinerary_builder.implementation import (
+    ItineraryBuilderMCP, PACE_MAX_POIS, BLOCKS_PER_DAY
+)
+from benchmarks.serialization_bench import make_time_windows
+from benchmarks.distance_bench import make_pois
+
+
+def best_of(runs: int, fn) -> float:
+    """Fastest of `runs` calls, in milliseconds."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(days: int, n: int, pace: str, modes, runs: int):
+    pois = make_pois(n)
+    windows = make_time_windows(days)
+    builder = ItineraryBuilderMCP()
+    reachable = days * BLOCKS_PER_DAY * PACE_MAX_POIS[pace]
+    matrix = builder.matrix_for(pois[:reachable])
+
+    print(f"\n{days} days, {n} POIs, {pace} pace ({len(matrix)} reachable)")
+    core_ms = best_of(runs, lambda: builder._build_days(pois, matrix, windows, pace, 240))
+    print(f"  schedule core (greedy):   {core_ms:10.2f} ms  ({core_ms * 1000 / days:.0f} µs/day)")
+    for mode in modes:
+        constraints = {"pace": pace, "maxTravelTimePerDay": 240, "planningMode": mode}
+        with redirect_stdout(io.StringIO()):
+            build_ms = best_of(runs, lambda: builder.build_records(pois, windows, constraints))
+        print(f"  build_records ({mode}):{' ' * (10 - len(mode))}{build_ms:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Itinerary builder scaling benchmark")
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 30])
+    parser.add_argument("--pois", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--pace", default="fast", choices=sorted(PACE_MAX_POIS))
+    parser.add_argument("--modes", nargs="+", default=["greedy", "clustered"])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Itinerary Builder Scaling Benchmark")
+    print("=" * 60)
+    for days in args.days:
+        for n in args.pois:
+            bench(days, n, args.pace, args.modes, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Synthetic City Benchmark
+Times the planning stack over generated cities of 10,000-100,000 POIs: city
+generation, POI search (constraint filtering + ranking, uncached and cached;
+the first search of a candidate set also builds its feature table),
+build_records on the search results and feasibility evaluation
+"""
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.synthetic_city import SyntheticCity
+from mcp_tools.poi_search.implementation import POISearchMCP
+from mcp_tools.poi_search.schema import POISearchInput
+from mcp_tools.poi_search.cache import SearchCache
+from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP
+from symbolic.feasibility_engine import FeasibilityEngine
+from benchmarks.serialization_bench import make_time_windows
+from benchmarks.distance_bench import BENCH_CITY
+
+SEARCHES = {
+    "culture": {"interests": ["culture", "history"], "constraints": {}},
+    "indoor, 5 km": {"interests": ["culture"], "constraints": {"indoorOnly": True, "maxDistance": 5}},
+    "food, low budget": {"interests": ["food"], "constraints": {"budget": "low"}},
+}
+
+
+def timed(fn):
+    """(result, milliseconds) of one call."""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(n: int, days: int, pace: str, seed: int):
+    city = SyntheticCity(n, seed=seed)
+    _, generate_ms = timed(lambda: city.pois(BENCH_CITY))
+    print(f"\n{n} POIs, {days}-day {pace} trip")
+    print(f"  generate city:            {generate_ms:10.2f} ms")
+
+    # Every candidate is fetched, so search cost scales with the city
+    search = POISearchMCP(cache=SearchCache(), synthetic=city, candidate_limit=n)
+    for label, query in SEARCHES.items():
+        poi_input = POISearchInput(city=BENCH_CITY, pageSize=200, **query)
+        page, cold_ms = timed(lambda: search.search_records(poi_input))
+        _, warm_ms = timed(lambda: search.search_records(poi_input))
+        print(f"  search ({label}):{' ' * (17 - len(label))}{cold_ms:10.2f} ms  (cached {warm_ms:.2f} ms, {page.totalFound} found)")
+
+    poi_input = POISearchInput(city=BENCH_CITY, interests=["culture", "food"], constraints={}, pageSize=200)
+    page, _ = timed(lambda: search.search_records(poi_input))
+    builder = ItineraryBuilderMCP()
+    constraints = {"pace": pace, "maxTravelTimePerDay": 240}
+    output, build_ms = timed(lambda: builder.build_records(page.pois, make_time_windows(days), constraints))
+    print(f"  build_records (200 POIs): {build_ms:10.2f} ms")
+
+    itinerary = output.itinerary.model_dump()
+    engine = FeasibilityEngine()
+    report, feasibility_ms = timed(lambda: engine.evaluate(itinerary, constraints))
+    print(f"  feasibility:              {feasibility_ms:10.2f} ms  (score {report['overall_score']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planning benchmark over synthetic cities")
+    parser.add_argument("--pois", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--pace", default="moderate", choices=["relaxed", "moderate", "fast"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Synthetic City Benchmark")
+    print("=" * 60)
+    for n in args.pois:
+        bench(n, args.days, args.pace, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Distance Matrix Benchmark
+Times the builder's NumPy haversine matrix against per-pair geopy geodesic
+calls (the builder's previous distance path) for 50, 500 and 5,000 POIs of a
+synthetic city
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+from contextlib import redirect_stdout
+from typing import List
+
+from geopy.distance import geodesic
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.poi_record import POIRecord
+from data_sources.synthetic_city import SyntheticCity
+from mcp_tools.poi_search.feature_table import POIFeatureTable
+from mcp_tools.itinerary_builder.distance_matrix import DistanceMatrix
+from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP
+from benchmarks.serialization_bench import make_time_windows
+
+# Benchmarks plan in a synthetic city of this name (see data_sources.synthetic_city)
+BENCH_CITY = "Jaipur"
+MAX_SAMPLE_PAIRS = 20000
+
+
+def make_pois(n: int, seed: int = 0) -> List[POIRecord]:
+    """n POI records of a synthetic city, shaped as POI search returns them."""
+    table = POIFeatureTable.from_pois(SyntheticCity(n, seed=seed).pois(BENCH_CITY))
+    return [table.record(row) for row in range(table.size)]
+
+
+def bench_size(n: int, days: int):
+    pois = make_pois(n)
+    rng = random.Random(1)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(min(MAX_SAMPLE_PAIRS, n * n))]
+    coords = [(p["coordinates"]["lat"], p["coordinates"]["lon"]) for p in pois]
+
+    start = time.perf_counter()
+    for i, j in pairs:
+        geodesic(coords[i], coords[j]).kilometers
+    geodesic_us = (time.perf_counter() - start) * 1e6 / len(pairs)
+
+    start = time.perf_counter()
+    matrix = DistanceMatrix.from_pois(pois)
+    matrix_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i, j in pairs:
+        matrix.travel_minutes(i, j)
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(pairs)
+
+    builder = ItineraryBuilderMCP()
+    windows = make_time_windows(days)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        builder.build_records(pois, windows, {"pace": "fast", "maxTravelTimePerDay": 240})
+    build_ms = (time.perf_counter() - start) * 1000
+
+    all_pairs = n * (n - 1) // 2
+    print(f"\n{n} POIs ({days}-day build)")
+    print(f"  geodesic per pair:        {geodesic_us:10.2f} µs  (all {all_pairs} pairs ≈ {geodesic_us * all_pairs / 1e6:.2f} s)")
+    print(f"  matrix build (all pairs): {matrix_ms:10.2f} ms  ({matrix.km.nbytes / 1e6:.1f} MB)")
+    print(f"  matrix lookup per pair:   {lookup_us:10.2f} µs")
+    print(f"  build_records:            {build_ms:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the itinerary builder distance matrix")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--days", type=int, default=30, help="Max trip length for the build timing")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        # Enough days to consume the candidates at a fast pace, capped at --days
+        bench_size(n, max(1, min(args.days, n // 9)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Serialization Benchmark
+Compares the per-plan cost of the legacy pydantic round-trip path
+(search -> model_dump -> ItineraryBuilderInput -> build -> model_dump)
+with the typed record path (search_records -> build_records)
+"""
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_tools.poi_search.implementation import POISearchMCP
+from mcp_tools.poi_search.schema import POISearchInput
+from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP
+from mcp_tools.itinerary_builder.schema import ItineraryBuilderInput, TimeWindow
+
+BUILD_CONSTRAINTS = {"maxTravelTimePerDay": 120, "pace": "fast", "preferences": {}}
+
+
+def make_time_windows(days: int) -> List[TimeWindow]:
+    """Morning/afternoon/evening windows starting tomorrow."""
+    base = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    windows = []
+    for day in range(days):
+        date = base + timedelta(days=day)
+        windows.append(TimeWindow(
+            day=day + 1,
+            morning={'start': date.replace(hour=9).isoformat(), 'end': date.replace(hour=12).isoformat()},
+            afternoon={'start': date.replace(hour=13).isoformat(), 'end': date.replace(hour=17).isoformat()},
+            evening={'start': date.replace(hour=18).isoformat(), 'end': date.replace(hour=21).isoformat()}
+        ))
+    return windows
+
+
+def legacy_plan(search: POISearchMCP, builder: ItineraryBuilderMCP, poi_input: POISearchInput, windows: List[TimeWindow]) -> Dict:
+    """Plan the way the pipeline did before typed records."""
+    results = search.search(poi_input)
+    pois_dict = [poi.model_dump() for poi in results.pois]
+    output = builder.build(ItineraryBuilderInput(pois=pois_dict, timeWindows=windows, constraints=BUILD_CONSTRAINTS))
+    return {
+        "itinerary": output.itinerary.model_dump(),
+        "pois": [poi.model_dump() for poi in results.pois]
+    }
+
+
+def record_plan(search: POISearchMCP, builder: ItineraryBuilderMCP, poi_input: POISearchInput, windows: List[TimeWindow]) -> Dict:
+    """Plan the way the pipeline does now."""
+    page = search.search_records(poi_input)
+    output = builder.build_records(page.pois, windows, BUILD_CONSTRAINTS)
+    return {
+        "itinerary": output.itinerary.model_dump(),
+        "pois": page.pois
+    }
+
+
+def legacy_handoff(search: POISearchMCP, poi_input: POISearchInput, windows: List[TimeWindow]) -> ItineraryBuilderInput:
+    """Search-to-builder hand-off only (no itinerary construction), legacy path."""
+    results = search.search(poi_input)
+    return ItineraryBuilderInput(
+        pois=[poi.model_dump() for poi in results.pois],
+        timeWindows=windows,
+        constraints=BUILD_CONSTRAINTS
+    )
+
+
+def record_handoff(search: POISearchMCP, poi_input: POISearchInput, windows: List[TimeWindow]):
+    """Search-to-builder hand-off only, record path."""
+    return search.search_records(poi_input).pois
+
+
+def time_plans(plan: Callable, runs: int, *args) -> float:
+    """Mean milliseconds per plan over `runs` runs."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        plan(*args)
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pydantic round-trip and typed record planning paths")
+    parser.add_argument("--runs", type=int, default=200, help="Plans per path")
+    parser.add_argument("--days", type=int, default=3, help="Trip length")
+    parser.add_argument("--page-size", type=int, default=40, help="POIs per search page")
+    args = parser.parse_args()
+
+    search = POISearchMCP(use_mock=True)
+    builder = ItineraryBuilderMCP()
+    poi_input = POISearchInput(
+        city="Jaipur, India",
+        interests=["culture", "history"],
+        constraints={},
+        pageSize=args.page_size
+    )
+    windows = make_time_windows(args.days)
+
+    # Warm the search cache and parsers so both paths measure steady state
+    with redirect_stdout(io.StringIO()):  # Builder logs every day
+        legacy_plan(search, builder, poi_input, windows)
+        record_plan(search, builder, poi_input, windows)
+        results = {
+            "full plan": (
+                time_plans(legacy_plan, args.runs, search, builder, poi_input, windows),
+                time_plans(record_plan, args.runs, search, builder, poi_input, windows)
+            ),
+            "search -> builder hand-off": (
+                time_plans(legacy_handoff, args.runs, search, poi_input, windows),
+                time_plans(record_handoff, args.runs, search, poi_input, windows)
+            )
+        }
+
+    print(f"Runs per path: {args.runs} ({args.days} days, page size {args.page_size})")
+    for label, (legacy_ms, record_ms) in results.items():
+        print(f"\n{label}")
+        print(f"  pydantic round-trip: {legacy_ms:8.3f} ms")
+        print(f"  typed records:       {record_ms:8.3f} ms")
+        if record_ms > 0:
+            print(f"  speed-up:            {legacy_ms / record_ms:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ from typing import List, Dict, Optional
 import os
 from dotenv import load_dotenv
 
+from data_sources.poi_record import RawPOI
+from data_sources.synthetic_city import SyntheticCity
+
 # Load .env from project root
 env_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
 if os.path.exists(env_path):
@@ -14,19 +17,31 @@ if os.path.exists(env_path):
 else:
     load_dotenv()
 
+# RawPOI source of mock POIs served because Overpass failed (never cached as OSM data)
+FALLBACK_SOURCE = 'mock'
+
 class OSMClient:
     """
     Client for querying OpenStreetMap data via Overpass API
     """
     
-    def __init__(self, use_mock: bool = False):
+    def __init__(self, use_mock: bool = False, synthetic: Optional[SyntheticCity] = None):
         """
         Initialize OSM Client
         
         Args:
             use_mock: If True, use mock data instead of real API (for testing)
+            synthetic: Generated city to serve as mock data (implies use_mock);
+                with use_mock and none given, SYNTHETIC_CITY_POIS (and
+                SYNTHETIC_CITY_SEED) select one, else the Jaipur sample is used
         """
-        self.use_mock = use_mock
+        if synthetic is None and use_mock and os.getenv('SYNTHETIC_CITY_POIS'):
+            synthetic = SyntheticCity(
+                n_pois=int(os.getenv('SYNTHETIC_CITY_POIS')),
+                seed=int(os.getenv('SYNTHETIC_CITY_SEED', '0'))
+            )
+        self.synthetic = synthetic
+        self.use_mock = use_mock or synthetic is not None
         # Try different Overpass instances (fallback if one is down)
         self.overpass_instances = [
             "https://overpass-api.de/api/interpreter",
@@ -40,6 +55,17 @@ class OSMClient:
         self.headers = {
             'User-Agent': 'TravelPlanner/1.0 (Educational Capstone Project)'
         }
+        # City centres seen while geocoding (city -> {lat, lon})
+        self._city_centers: Dict[str, Dict] = {}
+        # Searches answered (wholly or partly) with mock data because Overpass failed
+        self.fallbacks = 0
+    
+    @property
+    def source(self) -> str:
+        """Data source label for cache keys ('osm', 'mock' or 'synthetic:<pois>:<seed>')."""
+        if self.synthetic is not None:
+            return f"synthetic:{self.synthetic.n_pois}:{self.synthetic.seed}"
+        return 'mock' if self.use_mock else 'osm'
     
     def get_city_bbox(self, city: str) -> Optional[Dict]:
         """
@@ -64,6 +90,11 @@ class OSMClient:
             data = response.json()
             
             if data:
+                if data[0].get("lat") and data[0].get("lon"):
+                    self._city_centers[city] = {
+                        "lat": float(data[0]["lat"]),
+                        "lon": float(data[0]["lon"])
+                    }
                 bbox = data[0].get("boundingbox", [])
                 if bbox:
                     return {
@@ -76,8 +107,26 @@ class OSMClient:
             print(f"Error getting bbox for {city}: {e}")
         return None
     
-    def _get_mock_pois(self, city: str) -> List[Dict]:
+    def get_city_center(self, city: str) -> Optional[Dict]:
+        """
+        City centre {lat, lon} recorded while geocoding (no extra request)
+        
+        Args:
+            city: City name as passed to search_pois
+        
+        Returns:
+            Centre coordinates (the generated centre for a synthetic city) or
+            None if the city has not been geocoded
+        """
+        if city not in self._city_centers and self.synthetic is not None:
+            lat, lon = self.synthetic.center
+            return {"lat": lat, "lon": lon}
+        return self._city_centers.get(city)
+    
+    def _get_mock_pois(self, city: str) -> List[RawPOI]:
         """Return mock POI data for testing when API is unavailable"""
+        if self.synthetic is not None:
+            return self.synthetic.pois(city)
         # Expanded Jaipur POIs for testing
         mock_pois = [
             {
@@ -86,7 +135,7 @@ class OSMClient:
                 "category": "tourism",
                 "subcategory": "attraction",
                 "coordinates": {"lat": 26.9239, "lon": 75.8267},
-                "tags": {"tourism": "attraction", "name": "Hawa Mahal"},
+                "tags": {"tourism": "attraction", "name": "Hawa Mahal", "opening_hours": "09:00-16:30"},
                 "source": "osm"
             },
             {
@@ -95,7 +144,7 @@ class OSMClient:
                 "category": "tourism",
                 "subcategory": "palace",
                 "coordinates": {"lat": 26.9258, "lon": 75.8236},
-                "tags": {"tourism": "palace", "name": "City Palace"},
+                "tags": {"tourism": "palace", "name": "City Palace", "opening_hours": "09:30-17:00"},
                 "source": "osm"
             },
             {
@@ -113,7 +162,7 @@ class OSMClient:
                 "category": "tourism",
                 "subcategory": "attraction",
                 "coordinates": {"lat": 26.9247, "lon": 75.8246},
-                "tags": {"tourism": "attraction", "name": "Jantar Mantar"},
+                "tags": {"tourism": "attraction", "name": "Jantar Mantar", "opening_hours": "09:00-16:30"},
                 "source": "osm"
             },
             {
@@ -140,7 +189,7 @@ class OSMClient:
                 "category": "tourism",
                 "subcategory": "museum",
                 "coordinates": {"lat": 26.9124, "lon": 75.8185},
-                "tags": {"tourism": "museum", "name": "Albert Hall Museum"},
+                "tags": {"tourism": "museum", "name": "Albert Hall Museum", "opening_hours": "Mo-Su 09:00-17:00"},
                 "source": "osm"
             },
             {
@@ -218,6 +267,11 @@ class OSMClient:
         ]
         return mock_pois
     
+    def _fallback_pois(self, city: str) -> List[RawPOI]:
+        """Mock POIs standing in for a failed Overpass search, marked with FALLBACK_SOURCE"""
+        self.fallbacks += 1
+        return [dict(poi, source=FALLBACK_SOURCE) for poi in self._get_mock_pois(city)]
+    
     def _try_next_instance(self):
         """Switch to next Overpass instance"""
         self.current_instance = (self.current_instance + 1) % len(self.overpass_instances)
@@ -231,7 +285,7 @@ class OSMClient:
         categories: List[str] = None,
         limit: int = 50,
         max_retries: int = 3
-    ) -> List[Dict]:
+    ) -> List[RawPOI]:
         """
         Search for Points of Interest in a city
         
@@ -247,6 +301,8 @@ class OSMClient:
         # Use mock data if enabled
         if self.use_mock:
             print(f"Using mock data for {city}")
+            if self.synthetic is not None:
+                return self.synthetic.search(city, categories, limit)
             return self._get_mock_pois(city)[:limit]
         
         if categories is None:
@@ -258,7 +314,7 @@ class OSMClient:
             print(f"Could not find bounding box for {city}")
             # Fallback to mock data
             print("Falling back to mock data...")
-            return self._get_mock_pois(city)[:limit]
+            return self._fallback_pois(city)[:limit]
         
         pois = []
         retry_count = 0
@@ -330,7 +386,7 @@ class OSMClient:
                         continue
                     else:
                         print("All Overpass instances failed. Using mock data...")
-                        return self._get_mock_pois(city)[:limit]
+                        return self._fallback_pois(city)[:limit]
                 else:
                     # Other error, try next instance
                     retry_count += 1
@@ -343,7 +399,7 @@ class OSMClient:
         min_required = min(15, limit)
         if len(pois) < min_required:
             print(f"Only found {len(pois)} POIs. Supplementing with mock data to reach {min_required}...")
-            mock_pois = self._get_mock_pois(city)
+            mock_pois = self._fallback_pois(city)
             # Add mock POIs to fill the gap
             for mock_poi in mock_pois:
                 if mock_poi['id'] not in [p['id'] for p in pois]:
@@ -362,7 +418,7 @@ class OSMClient:
         lon = round(float(coords.get("lon", 0)), 4)
         return (name, lat, lon)
     
-    def _node_to_dict(self, node, category: str) -> Optional[Dict]:
+    def _node_to_dict(self, node, category: str) -> Optional[RawPOI]:
         """Convert Overpass node to POI dictionary"""
         tags = node.tags
         
@@ -387,7 +443,7 @@ class OSMClient:
             "source": "osm"
         }
     
-    def _way_to_dict(self, way, category: str) -> Optional[Dict]:
+    def _way_to_dict(self, way, category: str) -> Optional[RawPOI]:
         """Convert Overpass way to POI dictionary"""
         tags = way.tags
         
@@ -422,7 +478,7 @@ class OSMClient:
             "source": "osm"
         }
     
-    def get_poi_details(self, osm_id: str) -> Optional[Dict]:
+    def get_poi_details(self, osm_id: str) -> Optional[RawPOI]:
         """
         Get detailed information about a specific POI by OSM ID
         
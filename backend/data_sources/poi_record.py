@@ -0,0 +1,46 @@
+"""
+Typed POI records
+Plain-dict records shared by the OSM client, POI search, itinerary builder and
+API responses. They are TypedDicts, so they cost nothing at runtime; pydantic
+validation happens only at the MCP/HTTP boundaries.
+"""
+from typing import Dict, List, NamedTuple, Optional
+try:
+    from typing import TypedDict
+except ImportError:  # Python < 3.8
+    from typing_extensions import TypedDict
+
+
+class Coordinates(TypedDict):
+    lat: float
+    lon: float
+
+
+class RawPOI(TypedDict):
+    """POI as returned by OSMClient (one OSM node/way)"""
+    id: str
+    name: str
+    category: str
+    subcategory: str
+    coordinates: Coordinates
+    tags: Dict[str, str]
+    source: str
+
+
+class POIRecord(TypedDict):
+    """Search result POI; same shape as mcp_tools.poi_search.schema.POI"""
+    id: str
+    name: str
+    category: str
+    coordinates: Coordinates
+    estimatedDuration: int
+    openingHours: Optional[str]
+    source: str
+    metadata: Dict
+
+
+class POIRecordPage(NamedTuple):
+    """One page of ranked POI records"""
+    pois: List[POIRecord]
+    totalFound: int
+    nextCursor: Optional[str]
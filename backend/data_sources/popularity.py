@@ -0,0 +1,154 @@
+"""
+POI Popularity Prior
+Offline job computing a popularity prior per POI from OSM tag signals
+(wikidata, wikipedia, heritage, tourism=attraction, tag richness) and,
+optionally, Wikidata sitelink counts from a local dump.
+
+Run once per city; search loads the precomputed priors at ingest so ranking
+pays nothing per request:
+
+    python3 data_sources/popularity.py --city "Jaipur, India" --output poi_popularity.json
+    export POI_POPULARITY_PATH=poi_popularity.json
+"""
+import os
+import sys
+import json
+import math
+import argparse
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.poi_record import RawPOI
+
+# Weight per signal; a POI with every signal at full strength scores 1.0
+SIGNAL_WEIGHTS = {
+    'wikidata': 0.25,
+    'wikipedia': 0.2,
+    'heritage': 0.15,
+    'attraction': 0.15,
+    'richness': 0.1,
+    'sitelinks': 0.15
+}
+
+# heritage=* value -> strength (1 = World Heritage, 2 = national, else regional/local)
+HERITAGE_STRENGTH = {'1': 1.0, '2': 0.75}
+DEFAULT_HERITAGE_STRENGTH = 0.5
+
+# Tag count / sitelink count at which those signals saturate (log-scaled below)
+RICHNESS_SATURATION = 20
+SITELINK_SATURATION = 100
+
+
+def _log_share(count: int, saturation: int) -> float:
+    """log1p-scaled share of a saturation count, clipped to [0, 1]."""
+    if count <= 0:
+        return 0.0
+    return min(1.0, math.log1p(count) / math.log1p(saturation))
+
+
+def popularity_prior(tags: Dict, sitelinks: Optional[Dict[str, int]] = None) -> float:
+    """
+    Popularity prior in [0, 1] for one POI
+
+    Args:
+        tags: OSM tags
+        sitelinks: Optional Wikidata QID -> sitelink count map
+
+    Returns:
+        Weighted sum of signal strengths (see SIGNAL_WEIGHTS)
+    """
+    tags = tags or {}
+    w = SIGNAL_WEIGHTS
+    prior = 0.0
+    qid = str(tags.get('wikidata', '')).strip()
+    if qid:
+        prior += w['wikidata']
+    if tags.get('wikipedia'):
+        prior += w['wikipedia']
+    heritage = str(tags.get('heritage', '')).strip()
+    if heritage and heritage != 'no':
+        prior += w['heritage'] * HERITAGE_STRENGTH.get(heritage, DEFAULT_HERITAGE_STRENGTH)
+    if tags.get('tourism') == 'attraction':
+        prior += w['attraction']
+    prior += w['richness'] * _log_share(len(tags), RICHNESS_SATURATION)
+    if sitelinks and qid:
+        prior += w['sitelinks'] * _log_share(sitelinks.get(qid, 0), SITELINK_SATURATION)
+    return round(min(1.0, prior), 4)
+
+
+def load_sitelinks(path: str) -> Dict[str, int]:
+    """
+    Load a local Wikidata sitelink dump
+
+    Accepts a JSON object {QID: count} or a TSV/CSV with `QID<sep>count` lines.
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return {str(qid): int(count) for qid, count in json.load(f).items()}
+        sitelinks = {}
+        for line in f:
+            parts = line.replace(',', '\t').split('\t')
+            if len(parts) >= 2 and parts[1].strip().isdigit():
+                sitelinks[parts[0].strip()] = int(parts[1])
+        return sitelinks
+
+
+def compute_priors(pois: Iterable[RawPOI], sitelinks: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+    """POI ID -> popularity prior."""
+    return {
+        poi['id']: popularity_prior(poi.get('tags', {}), sitelinks)
+        for poi in pois
+    }
+
+
+def save_priors(priors: Dict[str, float], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(priors, f, indent=0, sort_keys=True)
+
+
+@lru_cache(maxsize=8)
+def load_priors(path: str) -> Dict[str, float]:
+    """Precomputed priors from disk ({} if the file is missing or unreadable)."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not load POI popularity priors from {path}: {e}")
+        return {}
+
+
+def get_priors() -> Dict[str, float]:
+    """Priors from POI_POPULARITY_PATH ({} if unset; POIs then fall back to their tags)."""
+    path = os.getenv('POI_POPULARITY_PATH')
+    return load_priors(path) if path else {}
+
+
+def main():
+    from data_sources.osm_client import OSMClient
+
+    parser = argparse.ArgumentParser(description="Compute POI popularity priors for a city")
+    parser.add_argument("--city", default=os.getenv("TARGET_CITY", "Jaipur, India"))
+    parser.add_argument("--output", default=os.getenv("POI_POPULARITY_PATH", "poi_popularity.json"))
+    parser.add_argument("--sitelinks", default=os.getenv("WIKIDATA_SITELINKS_PATH"),
+                        help="Local Wikidata sitelink dump (JSON or TSV)")
+    parser.add_argument("--limit", type=int, default=2000, help="Max POIs to fetch")
+    parser.add_argument("--mock", action="store_true", help="Use mock POI data")
+    args = parser.parse_args()
+
+    client = OSMClient(use_mock=args.mock)
+    pois = client.search_pois(args.city, limit=args.limit)
+    sitelinks = load_sitelinks(args.sitelinks) if args.sitelinks else None
+
+    priors = compute_priors(pois, sitelinks)
+    save_priors(priors, args.output)
+
+    top = sorted(pois, key=lambda p: -priors[p['id']])[:10]
+    print(f"✅ Wrote {len(priors)} priors for {args.city} to {args.output}")
+    for poi in top:
+        print(f"   {priors[poi['id']]:.3f}  {poi['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Road Network Travel Times
+Builds a driving graph from a local OSM road extract (.osm XML or Overpass
+JSON) at ingest, folded to junction nodes in CSR form, and answers
+many-to-many travel-time queries with a per-node-pair cache.
+
+Build once per city, then point the builder at the result:
+
+    python3 data_sources/road_network.py jaipur_roads.osm --output jaipur_roads.npz
+    export ROAD_NETWORK_PATH=jaipur_roads.npz
+"""
+import os
+import sys
+import json
+import heapq
+import argparse
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_tools.poi_search.scoring import EARTH_RADIUS_KM
+
+# Driving speed (km/h) per OSM highway class (urban averages, not limits)
+SPEEDS_KMH = {
+    'motorway': 80, 'motorway_link': 50,
+    'trunk': 55, 'trunk_link': 40,
+    'primary': 40, 'primary_link': 30,
+    'secondary': 32, 'secondary_link': 25,
+    'tertiary': 28, 'tertiary_link': 22,
+    'unclassified': 22, 'residential': 18,
+    'living_street': 10, 'service': 12, 'road': 20, 'track': 12
+}
+
+# Speed for the leg between a POI and its nearest graph node
+SNAP_SPEED_KMH = 10
+
+# Arrays stored in a saved graph (.npz)
+GRAPH_ARRAYS = ('lat', 'lon', 'offsets', 'targets', 'weights')
+
+# Cached node pairs before the cache is cleared
+PAIR_CACHE_LIMIT = 1_000_000
+
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (scalars or arrays)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * 1000 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _way_speed(tags: Dict[str, str]) -> Optional[float]:
+    """Speed (km/h) for a way, or None if it is not drivable."""
+    speed = SPEEDS_KMH.get(tags.get('highway', ''))
+    if speed is None or tags.get('access') in ('no', 'private'):
+        return None
+    try:
+        limit = float(str(tags.get('maxspeed', '')).split()[0])
+        speed = min(speed, limit)
+    except (ValueError, IndexError):
+        pass
+    return speed
+
+
+def _oneway(tags: Dict[str, str]) -> int:
+    """1 forward only, -1 backward only, 0 both ways."""
+    value = str(tags.get('oneway', '')).lower()
+    if value in ('yes', '1', 'true') or tags.get('junction') == 'roundabout':
+        return 1
+    if value == '-1':
+        return -1
+    return 0
+
+
+def _read_osm_xml(path: str) -> Tuple[Dict[int, Tuple[float, float]], List[Tuple[List[int], Dict[str, str]]]]:
+    nodes: Dict[int, Tuple[float, float]] = {}
+    ways = []
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag == 'node':
+            nodes[int(elem.get('id'))] = (float(elem.get('lat')), float(elem.get('lon')))
+            elem.clear()
+        elif elem.tag == 'way':
+            refs = [int(nd.get('ref')) for nd in elem.findall('nd')]
+            tags = {tag.get('k'): tag.get('v') for tag in elem.findall('tag')}
+            ways.append((refs, tags))
+            elem.clear()
+    return nodes, ways
+
+
+def _read_overpass_json(path: str) -> Tuple[Dict[int, Tuple[float, float]], List[Tuple[List[int], Dict[str, str]]]]:
+    with open(path, encoding='utf-8') as f:
+        elements = json.load(f).get('elements', [])
+    nodes = {e['id']: (e['lat'], e['lon']) for e in elements if e.get('type') == 'node'}
+    ways = [(e.get('nodes', []), e.get('tags', {})) for e in elements if e.get('type') == 'way']
+    return nodes, ways
+
+
+class RoadNetwork:
+    """
+    Directed road graph in CSR form over junction nodes.
+    Intermediate way nodes are folded into edge weights at ingest, so the
+    graph only holds intersections and dead ends. Edge weights are seconds.
+    """
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        weights: np.ndarray
+    ):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.size = len(self.lat)
+        # Python lists for the search loops (ndarray scalar access is slow)
+        self._adj = self._adjacency(self.offsets, self.targets, self.weights)
+        self._pair_cache: Dict[Tuple[int, int], float] = {}
+        self._lock = threading.Lock()
+
+    # ----- Ingest -----
+
+    @classmethod
+    def from_osm(cls, path: str) -> 'RoadNetwork':
+        """Build from an .osm XML extract or an Overpass JSON (`out body; >; out skel qt;`) dump."""
+        nodes, ways = _read_overpass_json(path) if path.endswith('.json') else _read_osm_xml(path)
+
+        drivable = []
+        use_count: Dict[int, int] = {}
+        for refs, tags in ways:
+            speed = _way_speed(tags)
+            refs = [ref for ref in refs if ref in nodes]
+            if speed is None or len(refs) < 2:
+                continue
+            drivable.append((refs, speed, _oneway(tags)))
+            for ref in refs:
+                use_count[ref] = use_count.get(ref, 0) + 1
+            for end in (refs[0], refs[-1]):
+                use_count[end] = use_count.get(end, 0) + 1  # Way ends are always junctions
+
+        index: Dict[int, int] = {}
+        edges: Dict[Tuple[int, int], float] = {}
+
+        def node_index(ref: int) -> int:
+            if ref not in index:
+                index[ref] = len(index)
+            return index[ref]
+
+        def add_edge(a: int, b: int, seconds: float):
+            if a != b and seconds < edges.get((a, b), float('inf')):
+                edges[(a, b)] = seconds
+
+        for refs, speed, oneway in drivable:
+            start = refs[0]
+            metres = 0.0
+            for prev, ref in zip(refs, refs[1:]):
+                metres += float(_haversine_m(*nodes[prev], *nodes[ref]))
+                if use_count.get(ref, 0) > 1:
+                    seconds = metres / (speed / 3.6)
+                    a, b = node_index(start), node_index(ref)
+                    if oneway >= 0:
+                        add_edge(a, b, seconds)
+                    if oneway <= 0:
+                        add_edge(b, a, seconds)
+                    start, metres = ref, 0.0
+
+        coords = np.zeros((len(index), 2))
+        for ref, i in index.items():
+            coords[i] = nodes[ref]
+        order = sorted(edges)
+        offsets = np.zeros(len(index) + 1, dtype=np.int64)
+        for a, _ in order:
+            offsets[a + 1] += 1
+        offsets = np.cumsum(offsets)
+        targets = np.array([b for _, b in order], dtype=np.int64)
+        weights = np.array([edges[key] for key in order], dtype=np.float64)
+        return cls(coords[:, 0], coords[:, 1], offsets, targets, weights)
+
+    @staticmethod
+    def _adjacency(offsets, targets, weights) -> List[List[Tuple[int, float]]]:
+        offsets, targets, weights = offsets.tolist(), targets.tolist(), weights.tolist()
+        return [
+            list(zip(targets[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]]))
+            for i in range(len(offsets) - 1)
+        ]
+
+    # ----- Persistence -----
+
+    def save(self, path: str):
+        np.savez_compressed(path, **{key: getattr(self, key) for key in GRAPH_ARRAYS})
+
+    @classmethod
+    def load(cls, path: str) -> 'RoadNetwork':
+        """Load a saved .npz graph, or build from a raw extract."""
+        if not path.endswith('.npz'):
+            return cls.from_osm(path)
+        data = np.load(path)
+        # Graphs saved with ALT landmark tables still load; the tables are ignored
+        return cls(**{key: data[key] for key in GRAPH_ARRAYS})
+
+    # ----- Queries -----
+
+    def snap(self, lat: Sequence[float], lon: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest graph node and straight-line distance (m) for each point."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        nodes = np.empty(lat.size, dtype=np.int64)
+        metres = np.empty(lat.size)
+        for i in range(lat.size):
+            d = _haversine_m(lat[i], lon[i], self.lat, self.lon)
+            nodes[i] = int(np.argmin(d))
+            metres[i] = d[nodes[i]]
+        return nodes, metres
+
+    def _remember(self, key: Tuple[int, int], seconds: float):
+        with self._lock:
+            if len(self._pair_cache) >= PAIR_CACHE_LIMIT:
+                self._pair_cache.clear()
+            self._pair_cache[key] = seconds
+
+    def many_to_many(self, sources: Sequence[int], targets: Sequence[int]) -> np.ndarray:
+        """
+        Travel seconds between graph nodes (inf if unreachable)
+
+        One Dijkstra per source with pending (uncached) targets, stopped as
+        soon as they are all settled; every settled pair is cached.
+        """
+        result = np.full((len(sources), len(targets)), np.inf)
+        target_set = set(targets)
+        for i, source in enumerate(sources):
+            pending = {t for t in target_set if (source, t) not in self._pair_cache}
+            if pending:
+                dist = [float('inf')] * self.size
+                dist[source] = 0.0
+                heap = [(0.0, source)]
+                while heap and pending:
+                    d, u = heapq.heappop(heap)
+                    if d > dist[u]:
+                        continue
+                    if u in pending:
+                        pending.discard(u)
+                        self._remember((source, u), d)
+                    for v, w in self._adj[u]:
+                        nd = d + w
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+                for t in pending:
+                    self._remember((source, t), float('inf'))
+            for j, t in enumerate(targets):
+                result[i, j] = self._pair_cache.get((source, t), np.inf)
+        return result
+
+    def _door_to_door(self, nodes_a, snap_a, nodes_b, snap_b) -> np.ndarray:
+        """Minutes between snapped points a and b (road + snap legs; NaN if unreachable)."""
+        sources = sorted(set(nodes_a.tolist()))
+        targets = sorted(set(nodes_b.tolist()))
+        seconds = self.many_to_many(sources, targets)
+        source_at = {node: k for k, node in enumerate(sources)}
+        target_at = {node: k for k, node in enumerate(targets)}
+        rows = np.array([source_at[n] for n in nodes_a.tolist()], dtype=np.int64)
+        cols = np.array([target_at[n] for n in nodes_b.tolist()], dtype=np.int64)
+        road = seconds[np.ix_(rows, cols)]
+        speed = SNAP_SPEED_KMH / 3.6
+        minutes = (road + (snap_a / speed)[:, None] + (snap_b / speed)[None, :]) / 60
+        minutes[~np.isfinite(minutes)] = np.nan
+        return minutes
+
+    def travel_minutes_matrix(self, lat: Sequence[float], lon: Sequence[float]) -> np.ndarray:
+        """
+        Door-to-door travel minutes between points (snap legs included)
+
+        Unreachable pairs are returned as NaN so callers can fall back to
+        their own estimate.
+        """
+        nodes, snap_m = self.snap(lat, lon)
+        minutes = self._door_to_door(nodes, snap_m, nodes, snap_m)
+        np.fill_diagonal(minutes, 0.0)
+        return minutes
+
+    def travel_minutes_cross(
+        self,
+        lat_a: Sequence[float],
+        lon_a: Sequence[float],
+        lat_b: Sequence[float],
+        lon_b: Sequence[float]
+    ) -> np.ndarray:
+        """Door-to-door travel minutes from every point in a to every point in b (NaN if unreachable)."""
+        nodes_a, snap_a = self.snap(lat_a, lon_a)
+        nodes_b, snap_b = self.snap(lat_b, lon_b)
+        return self._door_to_door(nodes_a, snap_a, nodes_b, snap_b)
+
+    def cache_size(self) -> int:
+        return len(self._pair_cache)
+
+
+_shared_network: Optional[RoadNetwork] = None
+_shared_path: Optional[str] = None
+_shared_lock = threading.Lock()
+
+
+def get_road_network() -> Optional[RoadNetwork]:
+    """Process-wide road network from ROAD_NETWORK_PATH (None if unset or unreadable)."""
+    global _shared_network, _shared_path
+    path = os.getenv('ROAD_NETWORK_PATH')
+    if not path:
+        return None
+    with _shared_lock:
+        if _shared_path != path:
+            try:
+                _shared_network = RoadNetwork.load(path)
+            except (OSError, ValueError, KeyError, ET.ParseError) as e:
+                print(f"⚠️  Could not load road network from {path}: {e}")
+                _shared_network = None
+            _shared_path = path
+        return _shared_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a road-network travel-time graph from an OSM extract")
+    parser.add_argument("extract", help=".osm XML extract or Overpass JSON dump")
+    parser.add_argument("--output", default="road_network.npz")
+    args = parser.parse_args()
+
+    network = RoadNetwork.from_osm(args.extract)
+    network.save(args.output)
+    print(f"✅ {network.size} junctions, {len(network.targets)} road segments, "
+          f"-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Synthetic City
+Deterministic generator of OSM-shaped POIs at any scale (10k-100k+) for offline
+benchmarks: POIs cluster around districts of uneven size, follow a configurable
+category mix and carry opening hours and tags the way OSM data does, so search,
+building and feasibility see realistic features
+"""
+import math
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from data_sources.poi_record import RawPOI
+
+# (OSM category, subcategory) -> share of POIs
+DEFAULT_CATEGORY_MIX: Dict[Tuple[str, str], float] = {
+    ('tourism', 'attraction'): 0.12,
+    ('tourism', 'museum'): 0.06,
+    ('tourism', 'gallery'): 0.03,
+    ('tourism', 'viewpoint'): 0.03,
+    ('historic', 'monument'): 0.06,
+    ('historic', 'fort'): 0.02,
+    ('historic', 'palace'): 0.02,
+    ('amenity', 'place_of_worship'): 0.10,
+    ('amenity', 'restaurant'): 0.18,
+    ('amenity', 'cafe'): 0.08,
+    ('amenity', 'theatre'): 0.02,
+    ('leisure', 'park'): 0.08,
+    ('leisure', 'garden'): 0.04,
+    ('shop', 'mall'): 0.02,
+    ('shop', 'marketplace'): 0.04,
+    ('natural', 'peak'): 0.01,
+}
+
+# opening_hours values drawn per subcategory (others use GENERIC_HOURS)
+HOURS_BY_SUBCATEGORY: Dict[str, Tuple[str, ...]] = {
+    'museum': ('Tu-Su 10:00-17:00', '09:30-17:30', 'Mo-Sa 10:00-18:00'),
+    'gallery': ('Tu-Su 11:00-19:00', '10:00-18:00'),
+    'fort': ('08:00-17:30', '09:00-17:00'),
+    'palace': ('09:30-17:00', '09:00-16:30'),
+    'restaurant': ('11:00-23:00', '12:00-15:00,19:00-23:30', 'Mo-Sa 11:30-22:30'),
+    'cafe': ('07:30-21:00', '08:00-20:00', 'Mo-Fr 07:00-19:00; Sa,Su 09:00-18:00'),
+    'place_of_worship': ('05:00-12:00,16:00-21:00', '06:00-20:00'),
+    'park': ('06:00-19:00', 'sunrise-sunset', '24/7'),
+    'garden': ('08:00-18:00', 'sunrise-sunset'),
+    'theatre': ('Tu-Su 17:00-23:00',),
+    'mall': ('10:00-22:00',),
+    'marketplace': ('Mo-Sa 10:00-21:00', '11:00-22:00'),
+    'viewpoint': ('24/7', '06:00-20:00'),
+}
+GENERIC_HOURS = ('09:00-18:00', '10:00-17:00', '24/7')
+
+_NAME_PREFIXES = (
+    'Rani', 'Raja', 'Surya', 'Chandra', 'Moti', 'Heera', 'Nahar', 'Gulab',
+    'Lakshmi', 'Govind', 'Shanti', 'Kesar', 'Amrit', 'Jal', 'Sheesh', 'Neel'
+)
+
+_KM_PER_DEGREE = 111.32
+
+
+class SyntheticCity:
+    """
+    Seeded generator of a synthetic city's POIs.
+    The same (seed, city, settings) always yields the same POIs; different city
+    names give different layouts from the same settings. Generated lists are
+    memoised per city.
+    """
+
+    def __init__(
+        self,
+        n_pois: int = 10000,
+        center: Tuple[float, float] = (26.9124, 75.7873),
+        radius_km: float = 15.0,
+        districts: int = 12,
+        district_km: float = 1.5,
+        scatter: float = 0.15,
+        category_mix: Optional[Dict[Tuple[str, str], float]] = None,
+        hours_share: float = 0.6,
+        seed: int = 0
+    ):
+        """
+        Args:
+            n_pois: POIs per city
+            center: City centre (lat, lon)
+            radius_km: POIs (and district centres) lie within this radius of the centre
+            districts: Number of clusters; sizes are uneven (Zipf-like)
+            district_km: Spread (standard deviation, km) of a district
+            scatter: Share of POIs spread uniformly over the city instead of a district
+            category_mix: (category, subcategory) -> weight (defaults to DEFAULT_CATEGORY_MIX)
+            hours_share: Share of POIs with an opening_hours tag
+            seed: Base seed
+        """
+        self.n_pois = n_pois
+        self.center = center
+        self.radius_km = radius_km
+        self.districts = max(1, districts)
+        self.district_km = district_km
+        self.scatter = scatter
+        self.category_mix = dict(category_mix or DEFAULT_CATEGORY_MIX)
+        self.hours_share = hours_share
+        self.seed = seed
+        self._cache: Dict[str, List[RawPOI]] = {}
+
+    def pois(self, city: str) -> List[RawPOI]:
+        """All POIs of a city (shared list; callers must not mutate it)."""
+        if city not in self._cache:
+            self._cache[city] = self._generate(city)
+        return self._cache[city]
+
+    def search(self, city: str, categories: Optional[List[str]] = None, limit: Optional[int] = None) -> List[RawPOI]:
+        """POIs in the given top-level categories (all if None), in generation order."""
+        pois = self.pois(city)
+        if categories:
+            wanted = set(categories)
+            pois = [poi for poi in pois if poi['category'] in wanted]
+        return pois[:limit] if limit is not None else list(pois)
+
+    def _generate(self, city: str) -> List[RawPOI]:
+        n = self.n_pois
+        rng = np.random.default_rng([self.seed, zlib.crc32(city.lower().encode())])
+        lat, lon = self._coordinates(rng, n)
+
+        kinds = list(self.category_mix)
+        weights = np.array([self.category_mix[kind] for kind in kinds], dtype=np.float64)
+        kind_index = rng.choice(len(kinds), size=n, p=weights / weights.sum())
+        has_hours = rng.random(n) < self.hours_share
+        hours_pick = rng.integers(0, 1 << 30, size=n)
+        name_pick = rng.integers(0, len(_NAME_PREFIXES), size=n)
+        # Shared draws for optional tags (wheelchair, fee, wikidata, heritage, indoor)
+        extras = rng.random((n, 5))
+
+        pois: List[RawPOI] = []
+        for i in range(n):
+            category, subcategory = kinds[kind_index[i]]
+            name = f"{_NAME_PREFIXES[name_pick[i]]} {subcategory.replace('_', ' ').title()} {i}"
+            tags = {category: subcategory, 'name': name}
+            if has_hours[i]:
+                options = HOURS_BY_SUBCATEGORY.get(subcategory, GENERIC_HOURS)
+                tags['opening_hours'] = options[hours_pick[i] % len(options)]
+            wheelchair, fee, wiki, heritage, indoor = extras[i]
+            if wheelchair < 0.3:
+                tags['wheelchair'] = 'yes' if wheelchair < 0.2 else 'limited'
+            if fee < 0.25:
+                tags['fee'] = 'no'
+            elif fee < 0.5:
+                tags['charge'] = f"{int(fee * 1000)} INR"
+            if wiki < 0.05:
+                tags['wikidata'] = f"Q{9000000 + i}"
+                tags['wikipedia'] = f"en:{name}"
+            if heritage < 0.02 and category == 'historic':
+                tags['heritage'] = '2'
+            if indoor < 0.05:
+                tags['indoor'] = 'yes'
+            pois.append(RawPOI(
+                id=f"node/{9000000000 + i}",
+                name=name,
+                category=category,
+                subcategory=subcategory,
+                coordinates={'lat': float(lat[i]), 'lon': float(lon[i])},
+                tags=tags,
+                source='synthetic'
+            ))
+        return pois
+
+    def _coordinates(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Clustered (north, east) offsets in km within radius_km, as lat/lon arrays."""
+        # District centres uniform over the inner disc; sizes ~ 1/rank
+        angle = rng.uniform(0, 2 * math.pi, self.districts)
+        dist = self.radius_km * 0.8 * np.sqrt(rng.random(self.districts))
+        centres = np.column_stack([dist * np.sin(angle), dist * np.cos(angle)])
+        sizes = 1.0 / np.arange(1, self.districts + 1)
+        district = rng.choice(self.districts, size=n, p=sizes / sizes.sum())
+        offsets = centres[district] + rng.normal(0.0, self.district_km, (n, 2))
+
+        # Uniform background scatter over the whole city
+        scattered = rng.random(n) < self.scatter
+        angle = rng.uniform(0, 2 * math.pi, n)
+        dist = self.radius_km * np.sqrt(rng.random(n))
+        offsets[scattered] = np.column_stack([dist * np.sin(angle), dist * np.cos(angle)])[scattered]
+
+        # Keep everything inside the city radius
+        norm = np.hypot(offsets[:, 0], offsets[:, 1])
+        outside = norm > self.radius_km
+        offsets[outside] *= (self.radius_km / norm[outside])[:, None]
+
+        lat = self.center[0] + offsets[:, 0] / _KM_PER_DEGREE
+        lon = self.center[1] + offsets[:, 1] / (_KM_PER_DEGREE * math.cos(math.radians(self.center[0])))
+        return lat, lon
@@ -18,8 +18,10 @@ class EditApplier:
     Only regenerates affected parts
     """
     
-    def __init__(self, use_mock_data: bool = False):
+    def __init__(self, use_mock_data: bool = False, itinerary_builder=None):
         self.poi_search = POISearchMCP(use_mock=use_mock_data)
+        # Builder of the current itinerary, for rebuilding days/blocks in place
+        self.itinerary_builder = itinerary_builder
     
     def apply(
         self,
@@ -57,10 +59,10 @@ class EditApplier:
             changes = self._apply_swap_edit(updated_itinerary, day, block, value, category, constraints)
         
         elif edit_type == "add":
-            changes = self._apply_add_edit(updated_itinerary, day, block, category, constraints)
+            changes = self._apply_add_edit(updated_itinerary, day, block, category, constraints, value)
         
         elif edit_type == "remove":
-            changes = self._apply_remove_edit(updated_itinerary, day, block, value)
+            changes = self._apply_remove_edit(updated_itinerary, day, block, value, constraints)
         
         elif edit_type == "reduce_travel":
             changes = self._apply_reduce_travel_edit(updated_itinerary, day)
@@ -68,6 +70,12 @@ class EditApplier:
         elif edit_type == "replace":
             changes = self._apply_swap_edit(updated_itinerary, day, block, value, category, constraints)
         
+        elif edit_type == "regenerate":
+            changes = self._apply_regenerate_edit(updated_itinerary, day, block)
+        
+        elif edit_type == "weather":
+            changes = self._apply_weather_edit(updated_itinerary, day, block)
+        
         else:
             return {
                 "success": False,
@@ -134,6 +142,11 @@ class EditApplier:
         constraints: Dict
     ) -> List[Dict]:
         """Swap POIs in specified block"""
+        # Indoors: precomputed rain alternatives first, search only if none apply
+        if value == "indoors":
+            changes = self._apply_weather_edit(itinerary, day, block_type)
+            if changes:
+                return changes
         changes = []
         
         # Find target block
@@ -154,32 +167,23 @@ class EditApplier:
                     poi_input = POISearchInput(
                         city=constraints.get("city", "Jaipur"),
                         interests=search_interests,
-                        constraints={"indoor": value == "indoors"} if value == "indoors" else {}
+                        constraints={"indoorOnly": True} if value == "indoors" else {}
                     )
                     
-                    poi_results = self.poi_search.search(poi_input)
+                    # Find a POI not already in itinerary
+                    new_poi = self._find_unused_poi(poi_input, self._get_all_poi_ids(itinerary))
                     
-                    if poi_results.pois:
-                        # Find a POI not already in itinerary
-                        existing_poi_ids = self._get_all_poi_ids(itinerary)
-                        new_poi = None
-                        
-                        for poi in poi_results.pois:
-                            if poi.id not in existing_poi_ids:
-                                new_poi = poi
-                                break
-                        
-                        if new_poi and block.get("pois"):
-                            old_poi = block["pois"][0]["poiId"]
-                            block["pois"][0]["poiId"] = new_poi.id
-                            changes.append({
-                                "type": "swap",
-                                "day": d["day"],
-                                "block": block["type"],
-                                "old_poi": old_poi,
-                                "new_poi": new_poi.id,
-                                "reason": f"Swapped for {value or category or 'alternative'}"
-                            })
+                    if new_poi and block.get("pois"):
+                        old_poi = block["pois"][0]["poiId"]
+                        block["pois"][0]["poiId"] = new_poi.id
+                        changes.append({
+                            "type": "swap",
+                            "day": d["day"],
+                            "block": block["type"],
+                            "old_poi": old_poi,
+                            "new_poi": new_poi.id,
+                            "reason": f"Swapped for {value or category or 'alternative'}"
+                        })
                 except Exception as e:
                     changes.append({
                         "type": "swap_error",
@@ -196,55 +200,56 @@ class EditApplier:
         day: Optional[int],
         block_type: Optional[str],
         category: Optional[str],
-        constraints: Dict
+        constraints: Dict,
+        value: Optional[str] = None
     ) -> List[Dict]:
-        """Add a POI to the itinerary"""
+        """Add a POI to the itinerary (a named POI if value names one, else the best unused match)"""
         changes = []
         
         # Search for POI to add
         search_interests = [category] if category else constraints.get("interests", [])
+        city = constraints.get("city", "Jaipur")
         
         try:
-            poi_input = POISearchInput(
-                city=constraints.get("city", "Jaipur"),
-                interests=search_interests,
-                constraints={}
-            )
+            # "Add Albert Hall": resolve the name directly via the city's name index
+            # (exact names/aliases only, never a POI already scheduled)
+            existing_ids = self._get_all_poi_ids(itinerary)
+            new_poi = self.poi_search.find_by_name(city, value, exclude=existing_ids) if value else None
             
-            poi_results = self.poi_search.search(poi_input)
-            
-            if poi_results.pois:
+            if new_poi is None:
+                poi_input = POISearchInput(
+                    city=city,
+                    interests=search_interests,
+                    constraints={}
+                )
+                
                 # Find a POI not already in itinerary
-                existing_poi_ids = self._get_all_poi_ids(itinerary)
-                new_poi = None
+                new_poi = self._find_unused_poi(poi_input, existing_ids)
+            
+            if new_poi:
+                # Find best day/block to add
+                target_day = day or 1
+                target_block = block_type or "afternoon"
                 
-                for poi in poi_results.pois:
-                    if poi.id not in existing_poi_ids:
-                        new_poi = poi
+                for d in itinerary["days"]:
+                    if d["day"] == target_day:
+                        for block in d.get("blocks", []):
+                            if block["type"] == target_block:
+                                block["pois"].append({
+                                    "poiId": new_poi.id,
+                                    "name": new_poi.name,
+                                    "category": new_poi.category,
+                                    "duration": new_poi.estimatedDuration
+                                })
+                                changes.append({
+                                    "type": "add",
+                                    "day": target_day,
+                                    "block": target_block,
+                                    "poi": new_poi.id,
+                                    "category": category
+                                })
+                                break
                         break
-                
-                if new_poi:
-                    # Find best day/block to add
-                    target_day = day or 1
-                    target_block = block_type or "afternoon"
-                    
-                    for d in itinerary["days"]:
-                        if d["day"] == target_day:
-                            for block in d.get("blocks", []):
-                                if block["type"] == target_block:
-                                    block["pois"].append({
-                                        "poiId": new_poi.id,
-                                        "duration": new_poi.estimatedDuration
-                                    })
-                                    changes.append({
-                                        "type": "add",
-                                        "day": target_day,
-                                        "block": target_block,
-                                        "poi": new_poi.id,
-                                        "category": category
-                                    })
-                                    break
-                            break
         except Exception as e:
             changes.append({
                 "type": "add_error",
@@ -258,11 +263,22 @@ class EditApplier:
         itinerary: Dict,
         day: Optional[int],
         block_type: Optional[str],
-        poi_name: Optional[str]
+        poi_name: Optional[str],
+        constraints: Optional[Dict] = None
     ) -> List[Dict]:
         """Remove a POI from the itinerary"""
         changes = []
         
+        # Resolve a spoken name ("Jal Mahal", "water palace") to a POI ID via the name index
+        # (exact names/aliases only, so a generic word cannot hit an unrelated landmark)
+        target_id = None
+        if poi_name and constraints:
+            try:
+                match = self.poi_search.find_by_name(constraints.get("city", "Jaipur"), poi_name)
+                target_id = match.id if match else None
+            except Exception:
+                target_id = None
+        
         for d in itinerary["days"]:
             if day and d["day"] != day:
                 continue
@@ -275,7 +291,12 @@ class EditApplier:
                 original_pois = block.get("pois", [])
                 if poi_name:
                     # Remove specific POI
-                    block["pois"] = [p for p in original_pois if poi_name.lower() not in p.get("poiId", "").lower()]
+                    block["pois"] = [
+                        p for p in original_pois
+                        if p.get("poiId") != target_id
+                        and poi_name.lower() not in p.get("poiId", "").lower()
+                        and poi_name.lower() not in (p.get("name") or "").lower()
+                    ]
                 elif original_pois:
                     # Remove last POI
                     removed = original_pois.pop()
@@ -319,6 +340,139 @@ class EditApplier:
         
         return changes
     
+    def _apply_regenerate_edit(
+        self,
+        itinerary: Dict,
+        day: Optional[int],
+        block_type: Optional[str]
+    ) -> List[Dict]:
+        """Rebuild a day (or one of its blocks) with the itinerary builder, keeping everything else"""
+        if self.itinerary_builder is None:
+            return [{"type": "regenerate_error", "day": day, "error": "No itinerary builder available"}]
+        
+        changes = []
+        target_days = [day] if day else [d["day"] for d in itinerary["days"]]
+        for day_num in target_days:
+            index = next((i for i, d in enumerate(itinerary["days"]) if d["day"] == day_num), None)
+            if index is None:
+                continue
+            old_day = itinerary["days"][index]
+            old_ids = [p.get("poiId") for b in old_day.get("blocks", []) for p in b.get("pois", [])]
+            try:
+                if block_type:
+                    new_block = self.itinerary_builder.rebuild_block(day_num, block_type, itinerary).model_dump()
+                    old_day["blocks"] = [
+                        new_block if b.get("type") == block_type else b for b in old_day.get("blocks", [])
+                    ]
+                    old_day["returnTravelTime"] = self.itinerary_builder.return_travel(day_num, old_day["blocks"])
+                    old_day["totalTravelTime"] = (
+                        sum(b.get("travelTime", 0) for b in old_day["blocks"]) + old_day["returnTravelTime"]
+                    )
+                else:
+                    new_day = self.itinerary_builder.rebuild_day(day_num, itinerary).model_dump()
+                    if old_day.get("city"):
+                        new_day["city"] = old_day["city"]
+                    itinerary["days"][index] = new_day
+            except ValueError as e:
+                changes.append({"type": "regenerate_error", "day": day_num, "block": block_type, "error": str(e)})
+                continue
+            new_ids = [
+                p.get("poiId") for b in itinerary["days"][index].get("blocks", []) for p in b.get("pois", [])
+            ]
+            changes.append({
+                "type": "regenerated",
+                "day": day_num,
+                "block": block_type,
+                "removed": [i for i in old_ids if i not in new_ids],
+                "added": [i for i in new_ids if i not in old_ids]
+            })
+        
+        if changes:
+            itinerary["rainAlternatives"] = {
+                poi_id: [alt.model_dump() for alt in options]
+                for poi_id, options in self.itinerary_builder.rain_alternatives(itinerary["days"]).items()
+            }
+        return changes
+    
+    def _apply_weather_edit(
+        self,
+        itinerary: Dict,
+        day: Optional[int],
+        block_type: Optional[str]
+    ) -> List[Dict]:
+        """
+        Swap outdoor POIs for their nearest unused indoor alternative (itinerary['rainAlternatives']);
+        with an itinerary builder, swapped blocks are re-timed and day travel totals updated
+        """
+        alternatives = itinerary.get("rainAlternatives") or {}
+        used = set(self._get_all_poi_ids(itinerary))
+        changes = []
+        for d in itinerary["days"]:
+            if day and d["day"] != day:
+                continue
+            first_swapped = None
+            for index, block in enumerate(d.get("blocks", [])):
+                if block_type and block["type"] != block_type:
+                    continue
+                for poi in block.get("pois", []):
+                    old_id = poi.get("poiId")
+                    option = next((alt for alt in alternatives.get(old_id, []) if alt["poiId"] not in used), None)
+                    if option is None:
+                        continue
+                    poi.update(poiId=option["poiId"], name=option["name"], category=option["category"])
+                    used.add(option["poiId"])
+                    alternatives.pop(old_id, None)
+                    if first_swapped is None:
+                        first_swapped = index
+                    changes.append({
+                        "type": "weather_swap",
+                        "day": d["day"],
+                        "block": block["type"],
+                        "old_poi": old_id,
+                        "new_poi": option["poiId"],
+                        "reason": f"Indoor alternative {option['distanceKm']:.1f} km away"
+                    })
+            if first_swapped is not None and self.itinerary_builder is not None:
+                try:
+                    self._retime_blocks(d, first_swapped)
+                except ValueError:
+                    pass  # Day not from the builder's last build: keep the swaps, times unchanged
+        return changes
+    
+    def _retime_blocks(self, day: Dict, first: int):
+        """
+        Re-time day['blocks'] from index first with the itinerary builder (swapped POIs
+        have their own durations); later blocks move only if the previous one now runs
+        into them. Day travel totals are updated.
+        """
+        previous_end = None
+        for index in range(first, len(day["blocks"])):
+            block = day["blocks"][index]
+            if index > first:
+                if previous_end <= block["time"]["start"]:
+                    break
+                block["time"]["start"] = previous_end
+            visits = [p.get("poiId") for b in day["blocks"][:index] for p in b.get("pois", []) if not p.get("meal")]
+            day["blocks"][index] = self.itinerary_builder.reschedule_block(
+                day["day"], block, from_anchor=index == 0, previous=visits[-1] if visits else None
+            ).model_dump()
+            previous_end = day["blocks"][index]["time"]["end"]
+        day["returnTravelTime"] = self.itinerary_builder.return_travel(day["day"], day["blocks"])
+        day["totalTravelTime"] = sum(b.get("travelTime", 0) for b in day["blocks"]) + day["returnTravelTime"]
+    
+    def _find_unused_poi(self, poi_input: POISearchInput, existing_poi_ids: List[str]):
+        """First ranked POI not already in the itinerary, paging through results if needed"""
+        existing = set(existing_poi_ids)
+        page_input = poi_input
+        while True:
+            poi_results = self.poi_search.search(page_input)
+            for poi in poi_results.pois:
+                if poi.id not in existing:
+                    return poi
+            if not poi_results.nextCursor:
+                return None
+            page_input = poi_input.model_copy(update={"cursor": poi_results.nextCursor})
+    
     def _get_all_poi_ids(self, itinerary: Dict) -> List[str]:
         """Get all POI IDs currently in itinerary"""
         poi_ids = []
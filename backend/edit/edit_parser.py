@@ -16,6 +16,7 @@ class EditParser:
     - "Make Day 2 more relaxed" → EditRequest(day=2, edit_type="pace", value="relaxed")
     - "Swap the Day 1 evening plan" → EditRequest(day=1, block="evening", edit_type="swap")
     - "Add a food place on Day 3" → EditRequest(day=3, edit_type="add", category="food")
+    - "Redo Day 2" → EditRequest(day=2, edit_type="regenerate")
     """
     
     def __init__(self):
@@ -43,7 +44,7 @@ class EditParser:
         Current itinerary has {num_days} days.
         
         Extract:
-        1. edit_type: One of "pace", "swap", "add", "remove", "replace", "reduce_travel", "weather"
+        1. edit_type: One of "pace", "swap", "add", "remove", "replace", "reduce_travel", "weather", "regenerate"
         2. scope: What part to edit - "day", "block", "poi", or "full"
         3. day: Day number (1, 2, 3, etc.) or null if affects all days
         4. block: Block type ("morning", "afternoon", "evening") or null
@@ -52,7 +53,7 @@ class EditParser:
         
         Return JSON:
         {{
-            "edit_type": "pace|swap|add|remove|replace|reduce_travel|weather",
+            "edit_type": "pace|swap|add|remove|replace|reduce_travel|weather|regenerate",
             "scope": "day|block|poi|full",
             "day": number or null,
             "block": "morning|afternoon|evening" or null,
@@ -66,6 +67,8 @@ class EditParser:
         - "Make Day 2 more relaxed" → {{"edit_type": "pace", "scope": "day", "day": 2, "block": null, "value": "relaxed", "category": null, "understood": true}}
         - "Swap the Day 1 evening plan to something indoors" → {{"edit_type": "swap", "scope": "block", "day": 1, "block": "evening", "value": "indoors", "category": null, "understood": true}}
         - "Add one famous local food place" → {{"edit_type": "add", "scope": "full", "day": null, "block": null, "value": "famous local", "category": "food", "understood": true}}
+        - "Redo Day 2 with different places" → {{"edit_type": "regenerate", "scope": "day", "day": 2, "block": null, "value": null, "category": null, "understood": true}}
+        - "It's going to rain on Day 3" → {{"edit_type": "weather", "scope": "day", "day": 3, "block": null, "value": "rain", "category": null, "understood": true}}
         - "Reduce travel time" → {{"edit_type": "reduce_travel", "scope": "full", "day": null, "block": null, "value": null, "category": null, "understood": true}}
         """
         
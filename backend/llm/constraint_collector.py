@@ -212,7 +212,8 @@ class ConstraintCollector:
             "interests": intent.get("interests", []),
             "pace": intent.get("pace", "moderate"),
             "dates": intent.get("dates"),
-            "constraints": intent.get("constraints") or {}
+            "constraints": intent.get("constraints") or {},
+            "cities": intent.get("cities")
         }
         
         return constraints
@@ -63,11 +63,13 @@ class IntentParser:
         4. pace: Travel pace ("relaxed", "moderate", "fast"). Default to "moderate" if not mentioned
         5. dates: Dates if mentioned (optional)
         6. constraints: Any other constraints mentioned (optional)
+        7. cities: For multi-city trips only, the legs in visiting order as [{{"city": "X", "days": N}}]; city is then the first leg and duration the total days
         
         Be flexible with parsing:
         - "city is Jaipur duration is three days" -> {{"city": "Jaipur", "duration": 3}}
         - "3-day trip to Jaipur" -> {{"city": "Jaipur", "duration": 3}}
         - "Plan Jaipur for 3 days" -> {{"city": "Jaipur", "duration": 3}}
+        - "3 days Jaipur, 2 days Udaipur" -> {{"city": "Jaipur", "duration": 5, "cities": [{{"city": "Jaipur", "days": 3}}, {{"city": "Udaipur", "days": 2}}]}}
         
         Return ONLY valid JSON in this exact format:
         {{
@@ -77,6 +79,7 @@ class IntentParser:
             "pace": "relaxed" or "moderate" or "fast",
             "dates": null,
             "constraints": {{}},
+            "cities": null,
             "missing_info": ["list of what's still missing from: city, duration, interests"]
         }}
         
@@ -4,6 +4,22 @@ Simple rule-based intent parser (fallback when LLM quota exceeded)
 import re
 from typing import Dict, Any, List, Optional
 
+# Known cities (can be expanded)
+KNOWN_CITIES = ['jaipur', 'delhi', 'mumbai', 'bangalore', 'goa', 'udaipur', 'agra', 'kolkata', 'chennai', 'hyderabad']
+
+# Number word to digit mapping
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10
+}
+
+# Multi-city legs: "3 days Jaipur", "3 days in Jaipur", "Udaipur for 2 days"
+_LEG_PATTERNS = [
+    (re.compile(r'(\w+)\s*-?\s*days?\s+(?:in\s+|at\s+)?(\w+)'), 1, 2),
+    (re.compile(r'(\w+)\s+(?:for\s+)?(\w+)\s*-?\s*days?'), 2, 1),
+]
+
 
 class SimpleIntentParser:
     """
@@ -35,6 +51,12 @@ class SimpleIntentParser:
         # Extract pace
         pace = self._extract_pace(user_input_lower)
         
+        # Multi-city trip ("3 days Jaipur, 2 days Udaipur"): first city, total days
+        cities = self._extract_cities(user_input_lower)
+        if cities:
+            city = cities[0]["city"]
+            duration = sum(leg["days"] for leg in cities)
+        
         # Determine missing info
         missing_info = []
         if not city:
@@ -51,13 +73,13 @@ class SimpleIntentParser:
             "pace": pace,
             "dates": None,
             "constraints": {},
+            "cities": cities,
             "missing_info": missing_info
         }
     
     def _extract_city(self, text: str) -> Optional[str]:
         """Extract city name from text (voice-friendly: handles 'Jaipur India', 'trip to X')"""
-        # Known cities (can be expanded)
-        known_cities = ['jaipur', 'delhi', 'mumbai', 'bangalore', 'goa', 'udaipur', 'agra', 'kolkata', 'chennai', 'hyderabad']
+        known_cities = KNOWN_CITIES
         # Patterns: "trip to Jaipur", "Jaipur India", "city is Jaipur", "plan Jaipur", "in Jaipur"
         patterns = [
             r'trip\s+to\s+(\w+)',
@@ -82,12 +104,7 @@ class SimpleIntentParser:
     
     def _extract_duration(self, text: str) -> Optional[int]:
         """Extract duration in days from text"""
-        # Number word to digit mapping
-        number_words = {
-            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-            '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10
-        }
+        number_words = NUMBER_WORDS
         
         # Patterns for duration (voice-friendly: "3 day", "3-day", "three days")
         patterns = [
@@ -120,6 +137,20 @@ class SimpleIntentParser:
         
         return None
     
+    def _extract_cities(self, text: str) -> Optional[List[Dict[str, Any]]]:
+        """Extract multi-city legs [{city, days}] in mention order (None unless 2+ cities)"""
+        legs = {}
+        for pattern, days_group, city_group in _LEG_PATTERNS:
+            for match in pattern.finditer(text):
+                city = match.group(city_group)
+                days = NUMBER_WORDS.get(match.group(days_group))
+                if city in KNOWN_CITIES and days and city not in legs:
+                    legs[city] = (match.start(city_group), days)
+        if len(legs) < 2:
+            return None
+        ordered = sorted(legs.items(), key=lambda item: item[1][0])
+        return [{"city": city.capitalize(), "days": days} for city, (_, days) in ordered]
+    
     def _extract_interests(self, text: str) -> List[str]:
         """Extract interests from text"""
         interest_keywords = {
@@ -163,6 +194,7 @@ if __name__ == "__main__":
         "Plan a 3-day trip to Jaipur. I like food and culture.",
         "3 days in Jaipur",
         "Jaipur India two days",
+        "3 days Jaipur, 2 days Udaipur",
     ]
     
     for test_input in test_inputs:
@@ -172,4 +204,5 @@ if __name__ == "__main__":
         print(f"  Duration: {result['duration']}")
         print(f"  Interests: {result['interests']}")
         print(f"  Pace: {result['pace']}")
+        print(f"  Cities: {result['cities']}")
         print(f"  Missing: {result['missing_info']}")
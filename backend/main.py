@@ -1,12 +1,15 @@
 """
 Main FastAPI application for Voice-First Travel Planning Assistant
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 import os
+import asyncio
+import threading
 from dotenv import load_dotenv
 
 # Try to load .env, continue if it fails
@@ -61,9 +64,26 @@ current_state = {
 }
 
 
+# Planning runs in a worker thread so client disconnects can end anytime
+# optimisation early; the lock keeps plans and edits one at a time as before
+pipeline_lock = asyncio.Lock()
+DISCONNECT_POLL_SECONDS = 0.2
+
+
+async def watch_disconnect(http_request: Request, stop: threading.Event):
+    """Set `stop` when the client goes away (or the request finishes)."""
+    while not stop.is_set():
+        if await http_request.is_disconnected():
+            stop.set()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
 # Request/Response Models
 class PlanRequest(BaseModel):
     user_input: str
+    seed: Optional[int] = None  # Same seed + constraints -> same (cacheable) plan; default: per session
+    hotel: Optional[Dict[str, float]] = None  # {lat, lon}: each day starts and ends there
 
 
 class EditRequest(BaseModel):
@@ -101,6 +121,8 @@ async def root():
             "send_email": "/api/send-email",
             "itinerary": "/api/itinerary",
             "reset": "/api/reset",
+            "poi_cache_stats": "/api/cache/stats",
+            "poi_suggest": "/api/pois/suggest?city=&q=",
             "evaluations": "/api/eval/feasibility, /api/eval/edit, /api/eval/grounding, /api/eval/all"
         }
     }
@@ -129,12 +151,21 @@ async def readiness_check():
 
 
 @app.post("/api/plan")
-async def create_plan(request: PlanRequest):
+async def create_plan(request: PlanRequest, http_request: Request):
     """
     Create or continue planning based on voice input
     """
     try:
-        result = pipeline.handle_user_input(request.user_input)
+        stop = threading.Event()
+        async with pipeline_lock:
+            watcher = asyncio.create_task(watch_disconnect(http_request, stop))
+            try:
+                result = await run_in_threadpool(
+                    pipeline.handle_user_input, request.user_input, stop.is_set, request.seed, request.hotel
+                )
+            finally:
+                stop.set()
+                watcher.cancel()
         
         if result["action"] == "itinerary":
             # Store current state (pois used for grounding eval)
@@ -159,10 +190,11 @@ async def edit_plan(request: EditRequest):
                 "message": "No itinerary to edit. Please create a plan first."
             }
         
-        result = pipeline.handle_edit(
-            request.edit_command,
-            current_state["itinerary"]
-        )
+        async with pipeline_lock:
+            result = pipeline.handle_edit(
+                request.edit_command,
+                current_state["itinerary"]
+            )
         
         if result["action"] == "edit_applied":
             current_state["itinerary"] = result["itinerary"]
@@ -205,6 +237,34 @@ async def get_current_itinerary():
     }
 
 
+@app.get("/api/pois/suggest")
+async def suggest_pois(q: str, city: Optional[str] = None, limit: int = 10):
+    """
+    Autocomplete POI names for a city (defaults to the current plan's city)
+    """
+    if not city:
+        city = (pipeline.collected_constraints or {}).get("city") or os.getenv("TARGET_CITY", "Jaipur, India")
+    limit = max(1, min(limit, 50))
+    # The first lookup for a city builds its name index; keep that off the event loop
+    matches = await run_in_threadpool(pipeline.poi_search_mcp.suggest, city, q, limit=limit)
+    return {
+        "city": city,
+        "query": q,
+        "suggestions": [{k: v for k, v in match.items() if k != "row"} for match in matches]
+    }
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """
+    POI search cache statistics (shared by planning and edits) and plan cache statistics
+    """
+    return {
+        "poi_search": pipeline.poi_search_mcp.cache_stats(),
+        "plans": pipeline.plan_cache.stats() if pipeline.plan_cache is not None else None
+    }
+
+
 @app.post("/api/eval/feasibility")
 async def run_feasibility_eval():
     """
@@ -2,14 +2,18 @@
 Itinerary Builder MCP Tool
 """
 from .implementation import ItineraryBuilderMCP
+from .distance_matrix import DistanceMatrix
+from .travel_modes import TravelMode, TRAVEL_MODES
+from .optimizer import OrienteeringSolver, OrienteeringSolution
 from .schema import (
     ItineraryBuilderInput, ItineraryBuilderOutput,
-    TimeWindow, Day, TimeBlock, POIBlock, Reasoning, Decision, Itinerary
+    TimeWindow, Day, TimeBlock, POIBlock, Reasoning, Decision, Itinerary, RainAlternative
 )
 
 __all__ = [
-    'ItineraryBuilderMCP',
+    'ItineraryBuilderMCP', 'DistanceMatrix', 'TravelMode', 'TRAVEL_MODES',
+    'OrienteeringSolver', 'OrienteeringSolution',
     'ItineraryBuilderInput', 'ItineraryBuilderOutput',
     'TimeWindow', 'Day', 'TimeBlock', 'POIBlock',
-    'Reasoning', 'Decision', 'Itinerary'
+    'Reasoning', 'Decision', 'Itinerary', 'RainAlternative'
 ]
@@ -0,0 +1,288 @@
+"""
+Distance Matrix
+All-pairs haversine distances between candidate POIs, computed once with NumPy
+and shared by block assignment, feasibility scoring and edits. Travel times come
+from the fastest allowed travel mode per hop, a road network, or the per-km
+heuristic.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from data_sources.poi_record import POIRecord
+from mcp_tools.poi_search.scoring import EARTH_RADIUS_KM
+from mcp_tools.itinerary_builder.travel_modes import mode_minutes
+
+# Travel time heuristic: ~2 min per km within a city
+TRAVEL_MINUTES_PER_KM = 2.0
+
+# Rows per chunk when filling the matrix (bounds temporaries to CHUNK_ROWS x n)
+CHUNK_ROWS = 512
+
+
+def haversine_cross(
+    lat_a: np.ndarray,
+    lon_a: np.ndarray,
+    lat_b: np.ndarray,
+    lon_b: np.ndarray,
+    dtype=np.float32
+) -> np.ndarray:
+    """Great-circle distance (km) from every point in a to every point in b (len(a) x len(b))."""
+    lat_a = np.radians(np.asarray(lat_a, dtype=np.float64))
+    lon_a = np.radians(np.asarray(lon_a, dtype=np.float64))
+    lat_b = np.radians(np.asarray(lat_b, dtype=np.float64))
+    lon_b = np.radians(np.asarray(lon_b, dtype=np.float64))
+    cos_a, cos_b = np.cos(lat_a), np.cos(lat_b)
+    out = np.empty((lat_a.size, lat_b.size), dtype=dtype)
+    for start in range(0, lat_a.size, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, lat_a.size)
+        dlat = lat_a[start:stop, None] - lat_b[None, :]
+        dlon = lon_a[start:stop, None] - lon_b[None, :]
+        a = np.sin(dlat / 2) ** 2 + cos_a[start:stop, None] * cos_b[None, :] * np.sin(dlon / 2) ** 2
+        out[start:stop] = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return out
+
+
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """
+    Great-circle distance (km) between every pair of points
+
+    Args:
+        lat: Latitudes (degrees)
+        lon: Longitudes (degrees)
+        dtype: Output dtype (float32 halves memory for large candidate sets)
+
+    Returns:
+        Symmetric n x n matrix with a zero diagonal
+    """
+    return haversine_cross(lat, lon, lat, lon, dtype)
+
+
+class DistanceMatrix:
+    """
+    Distance / travel-time lookup over a fixed list of POIs.
+    Row i corresponds to pois[i]; POI IDs map to rows for callers that only
+    hold IDs (edits, explanations).
+
+    With a travel engine (anything exposing travel_minutes_matrix(lat, lon),
+    e.g. data_sources.road_network.RoadNetwork), travel times are road times;
+    pairs the engine cannot route fall back to the per-km heuristic.
+
+    With travel modes (see travel_modes.TRAVEL_MODES), each hop takes the
+    fastest allowed mode and the choice is kept per pair (mode_between).
+
+    With an anchor (the traveller's hotel, (lat, lon)), travel to and from it
+    is modelled alongside the POI rows (from_anchor / to_anchor); it is not a
+    row itself, so rows still map one-to-one onto pois.
+    """
+
+    def __init__(
+        self,
+        pois: Sequence[POIRecord],
+        minutes_per_km: float = TRAVEL_MINUTES_PER_KM,
+        travel_engine=None,
+        modes: Optional[Sequence[str]] = None,
+        anchor: Optional[Tuple[float, float]] = None
+    ):
+        self.ids: List[str] = [poi['id'] for poi in pois]
+        self._row_by_id: Dict[str, int] = {}
+        for row, poi_id in enumerate(self.ids):
+            self._row_by_id.setdefault(poi_id, row)
+        self.minutes_per_km = minutes_per_km
+        self.lat = np.fromiter((poi['coordinates']['lat'] for poi in pois), dtype=np.float64, count=len(pois))
+        self.lon = np.fromiter((poi['coordinates']['lon'] for poi in pois), dtype=np.float64, count=len(pois))
+        self.km = haversine_matrix(self.lat, self.lon)
+        self.travel_engine = travel_engine
+        self.modes = tuple(modes or ())
+        self.anchor = tuple(anchor) if anchor is not None else None
+        self.minutes: Optional[np.ndarray] = None
+        self.mode_index: Optional[np.ndarray] = None
+        self._travel_minutes()
+
+    def _points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordinates of every row, with the anchor (if set) as an extra last point."""
+        if self.anchor is None:
+            return self.lat, self.lon
+        return np.append(self.lat, self.anchor[0]), np.append(self.lon, self.anchor[1])
+
+    def _road_minutes(self, lat_a, lon_a, lat_b, lon_b, square: bool = False) -> np.ndarray:
+        """Engine travel minutes from points a to points b (NaN = unroutable)."""
+        engine = self.travel_engine
+        if square:
+            return np.asarray(engine.travel_minutes_matrix(lat_a, lon_a), dtype=np.float64)
+        if hasattr(engine, 'travel_minutes_cross'):
+            return np.asarray(engine.travel_minutes_cross(lat_a, lon_a, lat_b, lon_b), dtype=np.float64)
+        # Engines with only the square query: ask for both point sets and slice
+        both = engine.travel_minutes_matrix(np.concatenate([lat_a, lat_b]), np.concatenate([lon_a, lon_b]))
+        return np.asarray(both, dtype=np.float64)[:len(lat_a), len(lat_a):]
+
+    def _minutes_block(
+        self,
+        a: Optional[np.ndarray] = None,
+        b: Optional[np.ndarray] = None
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Travel minutes and mode indices from points a to points b (indexes
+        into _points; None = all of them), or (None, None) when neither modes
+        nor a travel engine are set. Self pairs are left to the caller.
+        """
+        if not self.modes and self.travel_engine is None:
+            return None, None
+        lat, lon = self._points()
+        square = a is None
+        if square:
+            a = b = np.arange(lat.size)
+        km = haversine_cross(lat[a], lon[a], lat[b], lon[b])
+        road = None
+        if self.travel_engine is not None and len(self.ids):
+            road = self._road_minutes(lat[a], lon[a], lat[b], lon[b], square)
+        if self.modes:
+            return mode_minutes(km, self.modes, road, zero_diagonal=False)
+        if road is None:
+            return km * self.minutes_per_km, None
+        return np.where(np.isnan(road), km * self.minutes_per_km, road), None
+
+    def _travel_minutes(self):
+        """Travel minutes (and modes) between rows, and to/from the anchor if set."""
+        self._all_minutes, self._all_modes = self._minutes_block()
+        if self._all_minutes is not None:
+            np.fill_diagonal(self._all_minutes, 0.0)
+        self._split_anchor()
+
+    def _split_anchor(self):
+        """Expose row-to-row minutes/modes and the anchor legs from the full point arrays."""
+        n = len(self.ids)
+        minutes, mode_index = self._all_minutes, self._all_modes
+        if self.anchor is None:
+            self.minutes, self.mode_index = minutes, mode_index
+            return
+        self.minutes = minutes[:n, :n] if minutes is not None else None
+        self.mode_index = mode_index[:n, :n] if mode_index is not None else None
+        self.anchor_km = haversine_cross([self.anchor[0]], [self.anchor[1]], self.lat, self.lon)[0]
+        if minutes is None:
+            self.anchor_out = self.anchor_in = self.anchor_km * self.minutes_per_km
+        else:
+            self.anchor_out = minutes[n, :n]
+            self.anchor_in = minutes[:n, n]
+        self._anchor_modes = (mode_index[n, :n], mode_index[:n, n]) if mode_index is not None else None
+
+    def extend(self, pois: Sequence[POIRecord]):
+        """
+        Append rows for more POIs in place, computing only the new distances
+        and travel times (rows 0..n-1 keep their meaning, so routes and IDs stay valid).
+        """
+        if not pois:
+            return
+        n, m = len(self.ids), len(pois)
+        lat = np.fromiter((poi['coordinates']['lat'] for poi in pois), dtype=np.float64, count=m)
+        lon = np.fromiter((poi['coordinates']['lon'] for poi in pois), dtype=np.float64, count=m)
+        cross = haversine_cross(lat, lon, self.lat, self.lon)
+        self.km = np.block([[self.km, cross.T], [cross, haversine_matrix(lat, lon)]])
+        for poi in pois:
+            self._row_by_id.setdefault(poi['id'], len(self.ids))
+            self.ids.append(poi['id'])
+        self.lat = np.concatenate([self.lat, lat])
+        self.lon = np.concatenate([self.lon, lon])
+        if self._all_minutes is None or not n:
+            self._travel_minutes()
+            return
+
+        # Old points (rows, then the anchor) keep their block; only new rows and columns are computed
+        points = n + m + (self.anchor is not None)
+        new = np.arange(n, n + m)
+        old = np.concatenate([np.arange(n), np.arange(n + m, points)])
+        rows, row_modes = self._minutes_block(new, np.arange(points))
+        rows[np.arange(m), new] = 0.0
+        cols, col_modes = self._minutes_block(old, new)
+        minutes = np.empty((points, points), dtype=np.result_type(self._all_minutes, rows, cols))
+        minutes[np.ix_(old, old)] = self._all_minutes
+        minutes[new] = rows
+        minutes[np.ix_(old, new)] = cols
+        self._all_minutes = minutes
+        if self._all_modes is not None:
+            mode_index = np.empty((points, points), dtype=self._all_modes.dtype)
+            mode_index[np.ix_(old, old)] = self._all_modes
+            mode_index[new] = row_modes
+            mode_index[np.ix_(old, new)] = col_modes
+            self._all_modes = mode_index
+        self._split_anchor()
+
+    @classmethod
+    def from_pois(
+        cls,
+        pois: Sequence[POIRecord],
+        travel_engine=None,
+        modes: Optional[Sequence[str]] = None,
+        anchor: Optional[Tuple[float, float]] = None
+    ) -> 'DistanceMatrix':
+        return cls(pois, travel_engine=travel_engine, modes=modes, anchor=anchor)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, poi_id: str) -> int:
+        """Row for a POI ID (-1 if unknown)."""
+        return self._row_by_id.get(poi_id, -1)
+
+    @property
+    def cost(self) -> np.ndarray:
+        """Pairwise cost for route ordering: travel minutes if modelled, else km."""
+        return self.minutes if self.minutes is not None else self.km
+
+    def travel_minutes(self, i: int, j: int) -> int:
+        """Travel time (whole minutes) between rows i and j."""
+        if self.minutes is not None:
+            return int(self.minutes[i, j])
+        return int(float(self.km[i, j]) * self.minutes_per_km)
+
+    def travel_minutes_matrix(self) -> np.ndarray:
+        """Travel times (whole minutes) for every pair of rows."""
+        if self.minutes is not None:
+            return self.minutes.astype(np.int32)
+        return (self.km * self.minutes_per_km).astype(np.int32)
+
+    def mode_between(self, i: int, j: int) -> Optional[str]:
+        """Travel mode chosen for the hop from row i to row j (None without modes)."""
+        if self.mode_index is None:
+            return None
+        return self.modes[self.mode_index[i, j]]
+
+    def from_anchor(self, row: int) -> int:
+        """Travel time (whole minutes) from the anchor to row (0 without an anchor)."""
+        return int(self.anchor_out[row]) if self.anchor is not None else 0
+
+    def to_anchor(self, row: int) -> int:
+        """Travel time (whole minutes) from row back to the anchor (0 without an anchor)."""
+        return int(self.anchor_in[row]) if self.anchor is not None else 0
+
+    def anchor_mode(self, row: int, inbound: bool = False) -> Optional[str]:
+        """Travel mode from the anchor to row (or back, if inbound); None without modes or anchor."""
+        if self.anchor is None or self._anchor_modes is None:
+            return None
+        return self.modes[self._anchor_modes[1 if inbound else 0][row]]
+
+    @property
+    def anchor_cost(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(anchor -> row, row -> anchor) costs in the units of `cost`, or None without an anchor."""
+        if self.anchor is None:
+            return None
+        if self.minutes is None:
+            return self.anchor_km, self.anchor_km
+        return self.anchor_out, self.anchor_in
+
+    def route_minutes_rows(self, rows: Sequence[int]) -> int:
+        """Total travel time along a sequence of rows."""
+        return sum(self.travel_minutes(a, b) for a, b in zip(rows, rows[1:]))
+
+    def distance_between(self, a_id: str, b_id: str) -> Optional[float]:
+        """Distance (km) between two POI IDs, or None if either is unknown."""
+        i, j = self.row_of(a_id), self.row_of(b_id)
+        if i < 0 or j < 0:
+            return None
+        return float(self.km[i, j])
+
+    def route_minutes(self, poi_ids: Sequence[str]) -> Optional[int]:
+        """Total travel time along a sequence of POI IDs (None if any is unknown)."""
+        rows = [self.row_of(poi_id) for poi_id in poi_ids]
+        if any(row < 0 for row in rows):
+            return None
+        return self.route_minutes_rows(rows)
@@ -2,28 +2,86 @@
 Itinerary Builder MCP Implementation
 Builds structured day-wise itineraries from POIs
 """
+import math
 import sys
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict
-from geopy.distance import geodesic
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple, Union
 
 # Add parent directories to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from data_sources.poi_record import POIRecord
+from data_sources.road_network import get_road_network
+from mcp_tools.itinerary_builder.distance_matrix import DistanceMatrix, haversine_cross
+from mcp_tools.itinerary_builder.travel_modes import TRAVEL_MODES, DEFAULT_TRAVEL_MODES
+from mcp_tools.itinerary_builder.meals import MealPlanner, MealSlot, MEAL_SLOTS, MEAL_WALK_MINUTES, split_food
+from mcp_tools.itinerary_builder.rain import RainPlanner
+from mcp_tools.itinerary_builder.routing import plan_day_routes, optimise_route
+from mcp_tools.itinerary_builder.optimizer import (
+    OrienteeringSolver, OrienteeringSolution, Slot, earliest_start, relevance_scores
+)
+from mcp_tools.poi_search.opening_hours import parse_opening_hours
 from mcp_tools.itinerary_builder.schema import (
     ItineraryBuilderInput, ItineraryBuilderOutput,
-    TimeWindow, Day, TimeBlock, POIBlock, Reasoning, Decision, Itinerary
+    TimeWindow, Day, TimeBlock, POIBlock, Reasoning, Decision, Itinerary, RainAlternative
 )
 
+# Upper bound on POIs per time block for each pace
+PACE_MAX_POIS = {'relaxed': 1, 'moderate': 2, 'fast': 3}
+BLOCK_NAMES = ('morning', 'afternoon', 'evening')
+BLOCKS_PER_DAY = len(BLOCK_NAMES)
+
+# Optimal mode considers this many times the greedy-reachable candidates
+OPTIMIZER_CANDIDATE_FACTOR = 2
+
+# Anytime mode: improve on the greedy plan for this long unless constraints set timeBudget
+ANYTIME_BUDGET_SECONDS = 2.0
+
+class MinuteClock:
+    """
+    Integer minute offsets from a day's start, rendered as ISO timestamps.
+    Naive whole-minute bases on the same day are formatted directly, which is
+    several times cheaper than datetime + timedelta + isoformat().
+    """
+    
+    def __init__(self, base: datetime):
+        self.base = base
+        self._fast = base.tzinfo is None and not base.second and not base.microsecond
+        self._prefix = base.date().isoformat() + 'T'
+        self._offset = base.hour * 60 + base.minute
+    
+    def minutes_until(self, iso: str) -> int:
+        return int((datetime.fromisoformat(iso) - self.base).total_seconds() // 60)
+    
+    def hour(self, minutes: int) -> int:
+        return (self._offset + minutes) // 60 % 24
+    
+    def at(self, clock_minutes: int) -> int:
+        """Offset of a wall-clock time (minutes after midnight) on the base day"""
+        return clock_minutes - self._offset
+    
+    def iso(self, minutes: int) -> str:
+        clock = self._offset + minutes
+        if self._fast and 0 <= clock < 24 * 60:
+            return f"{self._prefix}{clock // 60:02d}:{clock % 60:02d}:00"
+        return (self.base + timedelta(minutes=minutes)).isoformat()
+
+
 class ItineraryBuilderMCP:
     """
     Itinerary Builder MCP Tool
     Builds structured day-wise itineraries from candidate POIs
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, travel_engine=None):
+        # Road travel times (ROAD_NETWORK_PATH) if configured; else the per-km heuristic
+        self.travel_engine = travel_engine if travel_engine is not None else get_road_network()
+        # Matrix of the last build (reused by matrix_for when the POIs are unchanged)
+        self.distance_matrix: Optional[DistanceMatrix] = None
+        # Day number -> candidates, time windows, constraints and matrix of the
+        # build that produced it (for rebuilds; legs of a multi-city trip differ)
+        self.builds: Dict[int, Dict[str, Any]] = {}
     
     def build(
         self,
@@ -38,109 +96,117 @@ class ItineraryBuilderMCP:
         Returns:
             ItineraryBuilderOutput with structured itinerary
         """
-        pois = input_data.pois
-        time_windows = input_data.timeWindows
-        constraints = input_data.constraints
+        return self.build_records(
+            input_data.pois,
+            input_data.timeWindows,
+            input_data.constraints
+        )
+    
+    def build_records(
+        self,
+        pois: Sequence[POIRecord],
+        time_windows: List[TimeWindow],
+        constraints: Dict,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> ItineraryBuilderOutput:
+        """
+        Build itinerary from POI records (in-process path, skips input validation)
+        
+        Args:
+            pois: Ranked POI records from POISearchMCP.search_records
+            time_windows: Time windows for each day
+            constraints: maxTravelTimePerDay, pace, preferences, planningMode
+                ('greedy', 'clustered', 'optimal' or 'anytime'), timeBudget (anytime, seconds),
+                travelModes (allowed modes, default walk/auto/car; empty = per-km heuristic only),
+                hotel ({lat, lon}: each day starts there and ends back there),
+                meals (default False; True: restaurants among pois fill lunch/dinner slots instead of sight slots)
+            should_stop: Anytime mode stops improving (keeping the best plan so far) once this returns True
         
+        Returns:
+            ItineraryBuilderOutput with structured itinerary
+        """
         pace = constraints.get('pace', 'moderate')
         max_travel_time = constraints.get('maxTravelTimePerDay', 120)  # minutes
+        planning_mode = constraints.get('planningMode', 'greedy')
+        max_pois = PACE_MAX_POIS.get(pace, PACE_MAX_POIS['fast'])
         
-        # Build itinerary days
-        days = []
-        decisions = []
-        warnings = []
-        
-        poi_index = 0
         total_pois = len(pois)
         
+        # One distance matrix for all days and blocks, over the candidates the
+        # pace cap lets the build reach (POIs are consumed in ranked order);
+        # the optimizer also gets to choose among some lower-ranked ones
+        reachable = len(time_windows) * BLOCKS_PER_DAY * max_pois
+        if planning_mode in ('optimal', 'anytime'):
+            reachable *= OPTIMIZER_CANDIDATE_FACTOR
+        build = self._new_build(pois, time_windows, constraints)
+        pois, food = build['pois'], build['food']
+        matrix = self.matrix_for(pois[:reachable], self.travel_modes(constraints), self.anchor(constraints))
+        build['matrix'] = matrix
+        
         print(f"   📍 Building itinerary with {total_pois} POIs for {len(time_windows)} days")
         
-        for time_window in time_windows:
-            day_num = time_window.day
-            
-            # Calculate available time for each block
-            morning_start = datetime.fromisoformat(time_window.morning['start'])
-            morning_end = datetime.fromisoformat(time_window.morning['end'])
-            afternoon_start = datetime.fromisoformat(time_window.afternoon['start'])
-            afternoon_end = datetime.fromisoformat(time_window.afternoon['end'])
-            evening_start = datetime.fromisoformat(time_window.evening['start'])
-            evening_end = datetime.fromisoformat(time_window.evening['end'])
-            
-            morning_duration = (morning_end - morning_start).total_seconds() / 60
-            afternoon_duration = (afternoon_end - afternoon_start).total_seconds() / 60
-            evening_duration = (evening_end - evening_start).total_seconds() / 60
-            
-            # Build blocks
-            blocks = []
-            total_travel_time = 0
-            current_time = morning_start
-            
-            # Morning block
-            morning_pois = self._assign_pois_to_block(
-                pois[poi_index:],
-                current_time,
-                morning_duration,
-                pace,
-                max_travel_time
-            )
-            poi_index += len(morning_pois['pois'])
-            blocks.append(morning_pois['block'])
-            total_travel_time += morning_pois['travel_time']
-            current_time = morning_pois['end_time']
-            
-            # Afternoon block
-            afternoon_pois = self._assign_pois_to_block(
-                pois[poi_index:],
-                current_time,
-                afternoon_duration,
-                pace,
-                max_travel_time - total_travel_time
-            )
-            poi_index += len(afternoon_pois['pois'])
-            blocks.append(afternoon_pois['block'])
-            total_travel_time += afternoon_pois['travel_time']
-            current_time = afternoon_pois['end_time']
-            
-            # Evening block
-            evening_pois = self._assign_pois_to_block(
-                pois[poi_index:],
-                current_time,
-                evening_duration,
-                pace,
-                max_travel_time - total_travel_time
-            )
-            poi_index += len(evening_pois['pois'])
-            blocks.append(evening_pois['block'])
-            total_travel_time += evening_pois['travel_time']
-            
-            # Calculate feasibility score
-            feasibility_score = self._calculate_feasibility_score(
-                blocks, total_travel_time, max_travel_time
-            )
-            
-            if feasibility_score < 0.7:
-                warnings.append(f"Day {day_num} has high travel time ratio")
-            
-            # Create day
-            day = Day(
-                day=day_num,
-                date=time_window.morning['start'].split('T')[0],
-                blocks=blocks,
-                totalTravelTime=int(total_travel_time),
-                feasibilityScore=feasibility_score
+        greedy_days, greedy_routes = self._build_days(pois, matrix, time_windows, pace, max_travel_time, food=food)
+        metrics = {
+            'planningMode': 'greedy',
+            'totalTravelTime': sum(day.totalTravelTime for day in greedy_days),
+            'routeMinutes': sum(matrix.route_minutes_rows(route) for route in greedy_routes)
+        }
+        days, routes = greedy_days, greedy_routes
+        
+        if planning_mode == 'clustered' and time_windows and len(matrix):
+            # Geographic day groups, each ordered by NN + 2-opt + Or-opt
+            day_routes = plan_day_routes(matrix, len(time_windows), BLOCKS_PER_DAY * max_pois)
+            days, routes = self._build_days(pois, matrix, time_windows, pace, max_travel_time, day_routes, food)
+            metrics.update({
+                'planningMode': 'clustered',
+                'totalTravelTime': sum(day.totalTravelTime for day in days),
+                'routeMinutes': sum(matrix.route_minutes_rows(route) for route in routes),
+                'greedyTotalTravelTime': metrics['totalTravelTime'],
+                'greedyRouteMinutes': metrics['routeMinutes']
+            })
+            metrics['travelTimeSaved'] = metrics['greedyRouteMinutes'] - metrics['routeMinutes']
+            print(f"   🗺️  Clustered routing: {metrics['routeMinutes']} min travel vs {metrics['greedyRouteMinutes']} min greedy")
+        
+        elif planning_mode in ('optimal', 'anytime') and time_windows and len(matrix):
+            # Orienteering with time windows: maximise total search relevance.
+            # Anytime: start from the greedy plan and keep improving until the
+            # time budget runs out or should_stop() fires
+            scores = relevance_scores(pois[:len(matrix)])
+            solve_options = self._solve_options(constraints, self._slot_rows(greedy_days, matrix), should_stop)
+            days, routes, solution = self._build_optimal(
+                pois, matrix, range(len(matrix)), scores, time_windows, max_pois, max_travel_time,
+                constraints, solve_options, MealPlanner(food) if food else None
             )
-            days.append(day)
+            metrics.update({
+                'planningMode': planning_mode,
+                'totalTravelTime': sum(day.totalTravelTime for day in days),
+                'routeMinutes': sum(matrix.route_minutes_rows(route) for route in routes),
+                'objective': solution.objective,
+                'solver': solution.method,
+                'iterations': solution.iterations,
+                'greedyTotalTravelTime': metrics['totalTravelTime'],
+                'greedyRouteMinutes': metrics['routeMinutes'],
+                'greedyObjective': round(sum(scores[row] for route in greedy_routes for row in route), 6)
+            })
+            print(f"   🎯 Optimizer ({solution.method}): objective {metrics['objective']} vs {metrics['greedyObjective']} greedy")
+        
+        decisions = []
+        warnings = []
+        used = 0
+        for day, route in zip(days, routes):
+            if day.feasibilityScore < 0.7:
+                warnings.append(f"Day {day.day} has high travel time ratio")
             
             # Log day creation
-            total_pois_in_day = sum(len(block.pois) for block in blocks)
-            print(f"   ✅ Day {day_num}: {total_pois_in_day} POIs, {len(blocks)} blocks, {poi_index}/{total_pois} POIs used")
+            used += len(route)
+            print(f"   ✅ Day {day.day}: {len(route)} POIs, {len(day.blocks)} blocks, {used}/{total_pois} POIs used")
             
             # Warn if running low on POIs
-            if poi_index >= total_pois and day_num < len(time_windows):
+            if used >= total_pois and day.day < len(time_windows):
                 print(f"   ⚠️  Warning: Running out of POIs! Only {total_pois} POIs for {len(time_windows)} days")
             
             # Add decisions
-            for block in blocks:
+            for block in day.blocks:
                 for poi_block in block.pois:
                     decisions.append(Decision(
                         poiId=poi_block.poiId,
@@ -148,8 +214,9 @@ class ItineraryBuilderMCP:
                         source="osm"
                     ))
         
-        # Create itinerary
-        itinerary = Itinerary(days=days)
+        # Create itinerary, with indoor alternatives for its outdoor POIs
+        self._keep_build(build)
+        itinerary = Itinerary(days=days, rainAlternatives=self.rain_alternatives(days))
         
         # Create reasoning
         reasoning = Reasoning(
@@ -159,72 +226,794 @@ class ItineraryBuilderMCP:
         
         return ItineraryBuilderOutput(
             itinerary=itinerary,
-            reasoning=reasoning
+            reasoning=reasoning,
+            metrics=metrics
         )
     
+    def _build_days(
+        self,
+        pois: Sequence[POIRecord],
+        matrix: DistanceMatrix,
+        time_windows: List[TimeWindow],
+        pace: str,
+        max_travel_time: float,
+        day_routes: Optional[List[List[int]]] = None,
+        food: Sequence[POIRecord] = ()
+    ) -> Tuple[List[Day], List[List[int]]]:
+        """
+        Fill every day's blocks
+        
+        Greedy (no day_routes): each day continues with the next candidates in
+        ranked order. Clustered: day i draws from day_routes[i] in route order.
+        With food POIs, each day also gets lunch and dinner stops.
+        
+        Returns:
+            (days, matrix rows visited per day in visiting order)
+        """
+        days = []
+        routes = []
+        poi_index = 0
+        meals = MealPlanner(food) if food else None
+        for i, time_window in enumerate(time_windows):
+            if day_routes is None:
+                candidates = range(poi_index, len(matrix))
+            else:
+                candidates = day_routes[i] if i < len(day_routes) else []
+            day, route = self._build_day(pois, candidates, matrix, time_window, pace, max_travel_time, meals)
+            poi_index += len(route)
+            days.append(day)
+            routes.append(route)
+        return days, routes
+    
+    def _build_day(
+        self,
+        pois: Sequence[POIRecord],
+        candidates: Sequence[int],
+        matrix: DistanceMatrix,
+        time_window: TimeWindow,
+        pace: str,
+        max_travel_time: float,
+        meals: Optional[MealPlanner] = None
+    ) -> Tuple[Day, List[int]]:
+        """Fill morning/afternoon/evening from candidate rows in order (plus meal stops, with meals)"""
+        clock, windows = self._window_minutes(time_window)
+        
+        # Build blocks (each block starts where the previous one ended)
+        blocks = []
+        route: List[int] = []
+        total_travel_time = 0
+        current = 0
+        for index in range(len(windows)):
+            meal = meals.slot_after(BLOCK_NAMES[index]) if meals else None
+            block_start = current
+            assigned = self._assign_pois_to_block(
+                pois,
+                candidates,
+                len(route),
+                matrix,
+                clock,
+                current,
+                self._block_budget(meal, windows, index),
+                pace,
+                max_travel_time - total_travel_time - self._meal_walks(meals, index),
+                from_anchor=index == 0
+            )
+            route.extend(assigned['rows'])
+            blocks.append(assigned['block'])
+            total_travel_time += assigned['travel_time']
+            current = assigned['end_time']
+            if meal:
+                walk, current = self._add_meal(
+                    assigned['block'], meal, meals, clock, block_start, current, self._meal_origin(matrix, route)
+                )
+                total_travel_time += walk
+        
+        # Back to the hotel after the last visit
+        return_travel = matrix.to_anchor(route[-1]) if route else 0
+        total_travel_time += return_travel
+        
+        # Calculate feasibility score
+        feasibility_score = self._calculate_feasibility_score(
+            blocks, total_travel_time, max_travel_time
+        )
+        
+        day = Day(
+            day=time_window.day,
+            date=time_window.morning['start'].split('T')[0],
+            blocks=blocks,
+            totalTravelTime=int(total_travel_time),
+            returnTravelTime=return_travel,
+            feasibilityScore=feasibility_score
+        )
+        return day, route
+    
+    @staticmethod
+    def _window_minutes(time_window: TimeWindow) -> Tuple[MinuteClock, List[Tuple[int, int]]]:
+        """
+        Day clock and (start, end) minute offsets for each block
+        
+        The schedule core works on these integers; ISO strings are produced
+        only when blocks are emitted.
+        """
+        clock = MinuteClock(datetime.fromisoformat(time_window.morning['start']))
+        windows = [
+            (clock.minutes_until(getattr(time_window, name)['start']), clock.minutes_until(getattr(time_window, name)['end']))
+            for name in BLOCK_NAMES
+        ]
+        return clock, windows
+    
+    @staticmethod
+    def _solve_options(
+        constraints: Dict,
+        initial_routes: List[List[int]],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Solver options for the build's planning mode (builds and day rebuilds
+        share them); anytime starts from initial_routes, the greedy plan
+        """
+        if constraints.get('planningMode') == 'anytime':
+            return {
+                'max_iterations': None,
+                'time_limit': constraints.get('timeBudget', ANYTIME_BUDGET_SECONDS),
+                'initial_routes': initial_routes,
+                'should_stop': should_stop
+            }
+        return {'time_limit': constraints.get('optimizerTimeLimit')}
+    
+    def _build_optimal(
+        self,
+        pois: Sequence[POIRecord],
+        matrix: DistanceMatrix,
+        candidates: Sequence[int],
+        scores: List[float],
+        time_windows: List[TimeWindow],
+        max_pois: int,
+        max_travel_time: float,
+        constraints: Dict,
+        solve_options: Dict,
+        meals: Optional[MealPlanner] = None
+    ) -> Tuple[List[Day], List[List[int]], OrienteeringSolution]:
+        """
+        Choose and schedule POIs among the candidate matrix rows with the
+        orienteering solver (solve_options go to solver.solve, initial_routes
+        as matrix rows); with meals, slots leave room for lunch and dinner stops
+        """
+        slot_starts: List[datetime] = []
+        slots: List[Slot] = []
+        for day_index, time_window in enumerate(time_windows):
+            _, windows = self._window_minutes(time_window)
+            for block_index, name in enumerate(BLOCK_NAMES):
+                start = datetime.fromisoformat(getattr(time_window, name)['start'])
+                budget = self._block_budget(meals.slot_after(name) if meals else None, windows, block_index)
+                week_start = start.weekday() * 24 * 60 + start.hour * 60 + start.minute
+                slot_starts.append(start)
+                slots.append(Slot(day_index, week_start, week_start + budget))
+        
+        # The solver works on positions in candidates; visits are mapped back to matrix rows
+        rows = list(candidates)
+        travel = matrix.travel_minutes_matrix()
+        if len(rows) < len(matrix):
+            travel = travel[rows][:, rows]
+        solver = OrienteeringSolver(
+            travel=travel,
+            durations=[pois[row].get('estimatedDuration', 60) for row in rows],
+            scores=[scores[row] for row in rows],
+            hours=[parse_opening_hours(pois[row].get('openingHours')) for row in rows],
+            slots=slots,
+            max_per_slot=max_pois,
+            max_day_travel=max_travel_time,
+            seed=constraints.get('seed') or 0,
+            start_travel=[matrix.from_anchor(row) for row in rows] if matrix.anchor is not None else None,
+            end_travel=[matrix.to_anchor(row) for row in rows] if matrix.anchor is not None else None,
+            day_reserve=self._meal_walks(meals)
+        )
+        position = {row: k for k, row in enumerate(rows)}
+        if solve_options.get('initial_routes'):
+            solve_options = dict(solve_options, initial_routes=[
+                [position[row] for row in route if row in position] for route in solve_options['initial_routes']
+            ])
+        solution = solver.solve(**solve_options)
+        solution = solution._replace(routes=[
+            [visit._replace(row=rows[visit.row]) for visit in visits] for visits in solution.routes
+        ])
+        
+        days = []
+        routes = []
+        for day_index, time_window in enumerate(time_windows):
+            blocks = []
+            route = []
+            total_travel_time = 0
+            clock = MinuteClock(slot_starts[day_index * BLOCKS_PER_DAY])
+            for block_index, name in enumerate(BLOCK_NAMES):
+                slot_index = day_index * BLOCKS_PER_DAY + block_index
+                slot, start = slots[slot_index], slot_starts[slot_index]
+                visits = solution.routes[slot_index]
+                block_pois = [
+                    POIBlock(
+                        poiId=pois[visit.row]['id'],
+                        name=pois[visit.row].get('name', 'Unknown'),
+                        category=pois[visit.row].get('category', ''),
+                        arrivalTime=(start + timedelta(minutes=visit.arrival - slot.start)).isoformat(),
+                        departureTime=(start + timedelta(minutes=visit.departure - slot.start)).isoformat(),
+                        duration=visit.departure - visit.arrival,
+                        travelMode=(
+                            matrix.mode_between(visits[k - 1].row, visit.row) if k
+                            else matrix.anchor_mode(visit.row) if block_index == 0 else None
+                        )
+                    )
+                    for k, visit in enumerate(visits)
+                ]
+                block_rows = [visit.row for visit in visits]
+                travel = matrix.route_minutes_rows(block_rows)
+                if block_index == 0 and block_rows:
+                    travel += matrix.from_anchor(block_rows[0])
+                end_offset = visits[-1].departure - slot.start if visits else 0
+                blocks.append(TimeBlock(
+                    time={
+                        'start': start.isoformat(),
+                        'end': (start + timedelta(minutes=end_offset)).isoformat()
+                    },
+                    type=name,
+                    pois=block_pois,
+                    travelTime=travel,
+                    totalDuration=end_offset
+                ))
+                route.extend(block_rows)
+                total_travel_time += travel
+                meal = meals.slot_after(name) if meals else None
+                if meal:
+                    block_start = int((start - clock.base).total_seconds() // 60)
+                    walk, _ = self._add_meal(
+                        blocks[-1], meal, meals, clock, block_start, block_start + end_offset,
+                        self._meal_origin(matrix, route)
+                    )
+                    total_travel_time += walk
+            return_travel = matrix.to_anchor(route[-1]) if route else 0
+            total_travel_time += return_travel
+            days.append(Day(
+                day=time_window.day,
+                date=time_window.morning['start'].split('T')[0],
+                blocks=blocks,
+                totalTravelTime=total_travel_time,
+                returnTravelTime=return_travel,
+                feasibilityScore=self._calculate_feasibility_score(blocks, total_travel_time, max_travel_time)
+            ))
+            routes.append(route)
+        return days, routes, solution
+    
+    @staticmethod
+    def _slot_rows(days: List[Day], matrix: DistanceMatrix) -> List[List[int]]:
+        """Matrix rows per block, in visiting order, for days built by the builder"""
+        return [
+            [matrix.row_of(poi_block.poiId) for poi_block in block.pois if poi_block.meal is None]
+            for day in days for block in day.blocks
+        ]
+    
+    @classmethod
+    def _block_budget(cls, meal: Optional[MealSlot], windows: List[Tuple[int, int]], index: int) -> int:
+        """
+        Minutes a block may fill: its template window's length less the meal
+        reserve (builds, optimal slots and rebuilds all use this)
+        """
+        start, end = windows[index]
+        return end - start - cls._meal_reserve(meal, windows, index)
+    
+    @staticmethod
+    def _meal_reserve(meal: Optional[MealSlot], windows: List[Tuple[int, int]], index: int) -> int:
+        """Minutes a block gives up for the meal after it (beyond the gap before the next block)"""
+        if meal is None:
+            return 0
+        gap = windows[index + 1][0] - windows[index][1] if index + 1 < len(windows) else 0
+        return max(0, meal.duration + MEAL_WALK_MINUTES - gap)
+    
+    @staticmethod
+    def _meal_walks(meals: Optional[MealPlanner], first: int = 0) -> int:
+        """Travel minutes held back for walks to the meals after block `first` onwards"""
+        if meals is None:
+            return 0
+        return MEAL_WALK_MINUTES * sum(1 for name in BLOCK_NAMES[first:] if meals.slot_after(name))
+    
+    @staticmethod
+    def _meal_origin(matrix: DistanceMatrix, route: Sequence[int]) -> Optional[Tuple[float, float]]:
+        """Where a meal stop is walked to from: the day's last visit so far, else the hotel"""
+        if route:
+            return float(matrix.lat[route[-1]]), float(matrix.lon[route[-1]])
+        return matrix.anchor
+    
+    @staticmethod
+    def _add_meal(
+        block: TimeBlock,
+        meal: MealSlot,
+        meals: MealPlanner,
+        clock: MinuteClock,
+        block_start: int,
+        ready: int,
+        origin: Optional[Tuple[float, float]]
+    ) -> Tuple[int, int]:
+        """
+        Append a meal stop to a block (times in minutes on the day's clock)
+        
+        Returns:
+            (walking minutes, new end time); (0, ready) if no restaurant is within walking distance
+        """
+        picked = meals.pick(*origin) if origin is not None else None
+        if picked is None:
+            return 0, ready
+        poi, walk = picked
+        arrival = max(ready + walk, clock.at(meal.earliest))
+        departure = arrival + meal.duration
+        block.pois.append(POIBlock(
+            poiId=poi['id'],
+            name=poi.get('name', 'Unknown'),
+            category=poi.get('category', ''),
+            arrivalTime=clock.iso(arrival),
+            departureTime=clock.iso(departure),
+            duration=meal.duration,
+            travelMode='walk',
+            meal=meal.name
+        ))
+        block.time['end'] = clock.iso(departure)
+        block.travelTime += walk
+        block.totalDuration = departure - block_start
+        return walk, departure
+    
+    @staticmethod
+    def travel_modes(constraints: Dict) -> Tuple[str, ...]:
+        """Allowed travel modes from constraints['travelModes'] (unknown names dropped)"""
+        modes = constraints.get('travelModes', DEFAULT_TRAVEL_MODES)
+        return tuple(mode for mode in (modes or ()) if mode in TRAVEL_MODES)
+    
+    @staticmethod
+    def anchor(constraints: Dict) -> Optional[Tuple[float, float]]:
+        """Hotel (lat, lon) from constraints['hotel'] = {lat, lon}, or None if absent or invalid"""
+        hotel = constraints.get('hotel')
+        if not isinstance(hotel, dict):
+            return None
+        try:
+            return float(hotel['lat']), float(hotel['lon'])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def matrix_for(
+        self,
+        pois: Sequence[POIRecord],
+        modes: Sequence[str] = DEFAULT_TRAVEL_MODES,
+        anchor: Optional[Tuple[float, float]] = None
+    ) -> DistanceMatrix:
+        """Distance matrix over pois (reuses the last one when the POI list, modes and anchor are unchanged)"""
+        matrix = self.distance_matrix
+        if matrix is None or matrix.modes != tuple(modes) or matrix.anchor != anchor or len(matrix) != len(pois) or any(
+            poi['id'] != poi_id for poi, poi_id in zip(pois, matrix.ids)
+        ):
+            matrix = DistanceMatrix.from_pois(pois, self.travel_engine, modes, anchor)
+            self.distance_matrix = matrix
+        return matrix
+    
+    def remember_build(
+        self,
+        pois: Sequence[POIRecord],
+        time_windows: List[TimeWindow],
+        constraints: Dict,
+        keep_other_days: bool = False
+    ) -> Tuple[List[POIRecord], List[POIRecord]]:
+        """
+        Keep a build's inputs so its days/blocks can be rebuilt later (see rebuild_day)
+        
+        Args:
+            keep_other_days: Keep the builds of days outside time_windows (the
+                other legs of a multi-city trip); by default they are dropped
+        
+        Returns:
+            (sight POIs, food POIs) as the build uses them
+        """
+        build = self._new_build(pois, time_windows, constraints)
+        self._keep_build(build, keep_other_days)
+        return build['pois'], build['food']
+    
+    def adopt_builds(self, builders: Sequence['ItineraryBuilderMCP']):
+        """Take over the day builds of other builders (e.g. one per leg of a multi-city trip)"""
+        self.builds = {}
+        for builder in builders:
+            self.builds.update(builder.builds)
+    
+    def clear_builds(self):
+        self.builds = {}
+    
+    @staticmethod
+    def _new_build(pois: Sequence[POIRecord], time_windows: List[TimeWindow], constraints: Dict) -> Dict[str, Any]:
+        """
+        Build state for one set of inputs
+        
+        With meals on, restaurants are split off the ranked POIs into 'food'
+        for meal stops, unless that would leave no sights.
+        """
+        pois = list(pois)
+        food: List[POIRecord] = []
+        if constraints.get('meals', False):
+            sights, food = split_food(pois)
+            if sights and food:
+                pois = sights
+            else:
+                food = []
+        return {
+            'pois': pois,
+            'food': food,
+            'time_windows': {time_window.day: time_window for time_window in time_windows},
+            'constraints': constraints,
+            'matrix': None,  # DistanceMatrix over a prefix of pois
+            'rain': None     # RainPlanner, built on first use
+        }
+    
+    def _keep_build(self, build: Dict[str, Any], keep_other_days: bool = False):
+        if not keep_other_days:
+            self.builds = {}
+        for day in build['time_windows']:
+            self.builds[day] = build
+    
+    def rain_alternatives(self, days: Sequence[Union[Day, Dict]]) -> Dict[str, List[RainAlternative]]:
+        """
+        Indoor alternatives for the outdoor POIs scheduled in days, drawn from the
+        candidates of the build each day came from (one indoor index per build)
+        """
+        ids_by_build: Dict[int, Tuple[Dict[str, Any], List[str]]] = {}
+        for day in days:
+            if isinstance(day, Day):
+                number, ids = day.day, [p.poiId for block in day.blocks for p in block.pois]
+            else:
+                number = day.get('day')
+                ids = [p.get('poiId') for block in day.get('blocks', []) for p in block.get('pois', [])]
+            build = self.builds.get(number)
+            if build is not None:
+                ids_by_build.setdefault(id(build), (build, []))[1].extend(ids)
+        alternatives: Dict[str, List[RainAlternative]] = {}
+        for build, ids in ids_by_build.values():
+            if build['rain'] is None:
+                build['rain'] = RainPlanner(build['pois'])
+            alternatives.update(build['rain'].alternatives(ids))
+        return alternatives
+    
+    def rebuild_day(
+        self,
+        day: int,
+        itinerary: Union[Itinerary, Dict],
+        pace: Optional[str] = None
+    ) -> Day:
+        """
+        Rebuild one day, leaving the rest of the itinerary alone
+        
+        Reuses the ranked candidates and distance matrix of the build the day
+        came from (extended only if the unused candidates run short) and its
+        planner: greedy fill, a clustered route, or the orienteering solver.
+        POIs scheduled on other days are excluded; the day's current POIs are tried last.
+        
+        Args:
+            day: Day number to rebuild
+            itinerary: Current itinerary (may already include edits)
+            pace: Pace override for this day
+        
+        Returns:
+            The regenerated Day
+        """
+        build = self._build_of(day)
+        time_window, constraints = build['time_windows'][day], build['constraints']
+        pace = pace or constraints.get('pace', 'moderate')
+        max_travel_time = constraints.get('maxTravelTimePerDay', 120)
+        per_day = BLOCKS_PER_DAY * PACE_MAX_POIS.get(pace, PACE_MAX_POIS['fast'])
+        
+        used_elsewhere, current = self._scheduled_ids(itinerary, day)
+        planning_mode = constraints.get('planningMode', 'greedy')
+        needed = per_day * OPTIMIZER_CANDIDATE_FACTOR if planning_mode in ('optimal', 'anytime') else per_day
+        pois, matrix, rows = self._rebuild_candidates(build, used_elsewhere, current, needed)
+        food = build['food']
+        if planning_mode == 'clustered':
+            candidates = optimise_route(rows[:per_day], matrix.cost, matrix.anchor_cost)
+        else:
+            candidates = rows[:per_day]
+        meals = MealPlanner(food, exclude=used_elsewhere) if food else None
+        rebuilt, _ = self._build_day(pois, candidates, matrix, time_window, pace, max_travel_time, meals)
+        
+        if planning_mode in ('optimal', 'anytime') and rows:
+            # Re-solve the day the way the build planned it, starting from the greedy fill
+            max_pois = PACE_MAX_POIS.get(pace, PACE_MAX_POIS['fast'])
+            solve_options = self._solve_options(constraints, self._slot_rows([rebuilt], matrix))
+            meals = MealPlanner(food, exclude=used_elsewhere) if food else None
+            days, _, _ = self._build_optimal(
+                pois, matrix, rows, relevance_scores(pois[:len(matrix)]), [time_window], max_pois,
+                max_travel_time, constraints, solve_options, meals
+            )
+            rebuilt = days[0]
+        return rebuilt
+    
+    def rebuild_block(
+        self,
+        day: int,
+        block_type: str,
+        itinerary: Union[Itinerary, Dict]
+    ) -> TimeBlock:
+        """
+        Rebuild one block of a day, keeping its start time and the day's other blocks
+        
+        Returns:
+            The regenerated TimeBlock
+        """
+        build = self._build_of(day)
+        time_window, constraints = build['time_windows'][day], build['constraints']
+        if block_type not in BLOCK_NAMES:
+            raise ValueError(f"Unknown block type: {block_type}")
+        pace = constraints.get('pace', 'moderate')
+        max_pois = PACE_MAX_POIS.get(pace, PACE_MAX_POIS['fast'])
+        
+        days = itinerary.model_dump()['days'] if isinstance(itinerary, Itinerary) else itinerary.get('days', [])
+        current_day = next((d for d in days if d.get('day') == day), None)
+        blocks = current_day.get('blocks', []) if current_day else []
+        block = next((b for b in blocks if b.get('type') == block_type), None)
+        other_travel = sum(b.get('travelTime', 0) for b in blocks if b is not block)
+        # A later block with visits ends the day, so its trip back to the hotel is fixed
+        later = blocks[blocks.index(block) + 1:] if block else []
+        ends_day = not any(b.get('pois') for b in later)
+        if not ends_day:
+            other_travel += self.return_travel(day, later)
+        
+        used_elsewhere, _ = self._scheduled_ids(itinerary, day, block_type)
+        current = [p.get('poiId') for p in block.get('pois', [])] if block else []
+        pois, matrix, rows = self._rebuild_candidates(build, used_elsewhere, current, max_pois)
+        
+        food = build['food']
+        meals = MealPlanner(food, exclude=used_elsewhere) if food else None
+        meal = meals.slot_after(block_type) if meals else None
+        
+        clock, windows = self._window_minutes(time_window)
+        index = BLOCK_NAMES.index(block_type)
+        start = clock.minutes_until(block['time']['start']) if block else windows[index][0]
+        assigned = self._assign_pois_to_block(
+            pois, rows, 0, matrix, clock, start,
+            self._block_budget(meal, windows, index), pace,
+            constraints.get('maxTravelTimePerDay', 120) - other_travel - (MEAL_WALK_MINUTES if meal else 0),
+            from_anchor=index == 0,
+            return_leg=ends_day
+        )
+        if meal:
+            self._add_meal(
+                assigned['block'], meal, meals, clock, start, assigned['end_time'],
+                self._meal_origin(matrix, assigned['rows'])
+            )
+        return assigned['block']
+    
+    def reschedule_block(
+        self,
+        day: int,
+        block: Dict,
+        from_anchor: bool = False,
+        previous: Optional[str] = None
+    ) -> TimeBlock:
+        """
+        Re-time a block's stops in their current order from its start time
+        (after POIs were swapped in place)
+        
+        Visits take their records' durations and the fastest allowed mode per
+        hop (from the hotel for the first one, with from_anchor) and, if the
+        build's planner honoured opening hours, wait for opening time; meal stops are walked to from the last visit (the day's
+        `previous` POI ID if the block has none yet) and start no earlier than
+        their slot. POIs the build does not know keep their duration and add no travel.
+        
+        Returns:
+            The re-timed TimeBlock
+        """
+        build = self._build_of(day)
+        constraints = build['constraints']
+        clock, _ = self._window_minutes(build['time_windows'][day])
+        records = {poi['id']: poi for poi in list(build['pois']) + list(build['food'])}
+        stops = block.get('pois', [])
+        visits = [records[p.get('poiId')] for p in stops if not p.get('meal') and p.get('poiId') in records]
+        matrix = DistanceMatrix.from_pois(visits, self.travel_engine, self.travel_modes(constraints), self.anchor(constraints))
+        
+        start = current = clock.minutes_until(block['time']['start'])
+        week_offset = clock.base.weekday() * 24 * 60 + clock.base.hour * 60 + clock.base.minute
+        opening_hours = constraints.get('planningMode') in ('optimal', 'anytime')
+        travel = 0
+        row = -1
+        prev_row = None
+        block_pois = []
+        for stop in stops:
+            poi = records.get(stop.get('poiId'))
+            leg, mode = 0, stop.get('travelMode')
+            if stop.get('meal'):
+                slot = next((meal for meal in MEAL_SLOTS if meal.name == stop['meal']), None)
+                if prev_row is not None or previous not in records:
+                    origin = self._meal_origin(matrix, [prev_row] if prev_row is not None else [])
+                else:
+                    origin = records[previous]['coordinates']['lat'], records[previous]['coordinates']['lon']
+                if poi is not None and origin is not None:
+                    km = haversine_cross([origin[0]], [origin[1]], [poi['coordinates']['lat']], [poi['coordinates']['lon']])
+                    leg = int(math.ceil(float(km[0, 0]) * TRAVEL_MODES['walk'].minutes_per_km))
+                arrival = max(current + leg, clock.at(slot.earliest)) if slot else current + leg
+                duration = stop.get('duration', slot.duration if slot else 60)
+            else:
+                if poi is not None:
+                    row += 1
+                    if prev_row is not None:
+                        leg, mode = matrix.travel_minutes(prev_row, row), matrix.mode_between(prev_row, row)
+                    elif from_anchor:
+                        leg, mode = matrix.from_anchor(row), matrix.anchor_mode(row)
+                    prev_row = row
+                arrival = current + leg
+                duration = poi.get('estimatedDuration', 60) if poi is not None else stop.get('duration', 60)
+                if poi is not None and opening_hours:
+                    opens = earliest_start(parse_opening_hours(poi.get('openingHours')), week_offset + arrival, duration)
+                    arrival = opens - week_offset if opens is not None else arrival
+            current = arrival + duration
+            travel += leg
+            block_pois.append(POIBlock(
+                poiId=stop.get('poiId', ''),
+                name=stop.get('name', ''),
+                category=stop.get('category', ''),
+                arrivalTime=clock.iso(arrival),
+                departureTime=clock.iso(current),
+                duration=duration,
+                travelMode=mode,
+                meal=stop.get('meal')
+            ))
+        
+        return TimeBlock(
+            time={'start': clock.iso(start), 'end': clock.iso(current)},
+            type=block.get('type', ''),
+            pois=block_pois,
+            travelTime=travel,
+            totalDuration=current - start
+        )
+    
+    def return_travel(self, day: int, blocks: Sequence[Dict]) -> int:
+        """Minutes from the last visit (not meal stop) in blocks back to the day's hotel (0 if none or unknown)"""
+        build = self.builds.get(day)
+        matrix = build['matrix'] if build else None
+        ids = [p.get('poiId') for block in blocks for p in block.get('pois', []) if not p.get('meal')]
+        if matrix is None or not ids:
+            return 0
+        row = matrix.row_of(ids[-1])
+        if row >= 0:
+            return matrix.to_anchor(row)
+        # A build candidate beyond the matrix (e.g. a rain swap)
+        poi = next((poi for poi in build['pois'] if poi['id'] == ids[-1]), None)
+        if poi is None or matrix.anchor is None:
+            return 0
+        return DistanceMatrix.from_pois([poi], self.travel_engine, matrix.modes, matrix.anchor).to_anchor(0)
+    
+    def _build_of(self, day: int) -> Dict[str, Any]:
+        if not self.builds:
+            raise ValueError("No previous build to rebuild from")
+        build = self.builds.get(day)
+        if build is None:
+            raise ValueError(f"Day {day} is not part of the last build")
+        return build
+    
+    def _scheduled_ids(
+        self,
+        itinerary: Union[Itinerary, Dict],
+        day: int,
+        block_type: Optional[str] = None
+    ) -> Tuple[set, List[str]]:
+        """(IDs scheduled outside the target day/block, IDs currently in it)"""
+        days = itinerary.model_dump()['days'] if isinstance(itinerary, Itinerary) else itinerary.get('days', [])
+        elsewhere = set()
+        current = []
+        for d in days:
+            for block in d.get('blocks', []):
+                ids = [p.get('poiId') for p in block.get('pois', [])]
+                if d.get('day') == day and (block_type is None or block.get('type') == block_type):
+                    current.extend(ids)
+                else:
+                    elsewhere.update(ids)
+        return elsewhere, current
+    
+    def _rebuild_candidates(
+        self,
+        build: Dict[str, Any],
+        exclude: set,
+        deprioritise: Sequence[str],
+        needed: int
+    ) -> Tuple[Sequence[POIRecord], DistanceMatrix, List[int]]:
+        """
+        Unused candidate rows of a build in ranked order (deprioritised IDs last),
+        growing the build's matrix by the next ranked POIs if fewer than `needed` remain
+        """
+        pois = build['pois']
+        modes = self.travel_modes(build['constraints'])
+        anchor = self.anchor(build['constraints'])
+        matrix = build['matrix']
+        if matrix is None or matrix.modes != modes or matrix.anchor != anchor or len(matrix) > len(pois) or any(
+            pois[row]['id'] != poi_id for row, poi_id in enumerate(matrix.ids)
+        ):
+            matrix = DistanceMatrix.from_pois(pois[:needed], self.travel_engine, modes, anchor)
+            build['matrix'] = matrix
+        
+        last = set(deprioritise)
+        while True:
+            fresh = [row for row, poi_id in enumerate(matrix.ids) if poi_id not in exclude and poi_id not in last]
+            if len(fresh) >= needed or len(matrix) >= len(pois):
+                break
+            matrix.extend(pois[len(matrix):len(matrix) + needed - len(fresh)])
+        retry = [row for row, poi_id in enumerate(matrix.ids) if poi_id in last and poi_id not in exclude]
+        return pois, matrix, fresh + retry
+    
     def _assign_pois_to_block(
         self,
-        available_pois: List[Dict],
-        start_time: datetime,
-        block_duration: float,
+        pois: Sequence[POIRecord],
+        candidates: Sequence[int],
+        first: int,
+        matrix: DistanceMatrix,
+        clock: MinuteClock,
+        start: int,
+        block_duration: int,
         pace: str,
-        max_travel_time: float
+        max_travel_time: float,
+        from_anchor: bool = False,
+        return_leg: bool = True
     ) -> Dict:
-        """Assign POIs to a time block"""
-        block_pois = []
-        current_time = start_time
-        total_travel_time = 0
+        """
+        Assign POIs to a time block, taking candidate rows (indexes into pois)
+        in order from candidates[first]
         
+        Times are integer minutes on the day's clock; 'end_time' is returned the same way.
+        With from_anchor, the first POI is reached from the matrix's anchor (hotel);
+        with return_leg, the trip back to it from each POI counts against max_travel_time
+        (the POI may end the day).
+        """
         # Adjust POI count based on pace
-        if pace == 'relaxed':
-            max_pois = 1
-        elif pace == 'moderate':
-            max_pois = 2
-        else:  # fast
-            max_pois = 3
-        
-        prev_coords = None
-        
-        for poi in available_pois[:max_pois]:
-            # Calculate travel time
-            travel_time = 0
-            if prev_coords:
-                poi_coords = (
-                    poi['coordinates']['lat'],
-                    poi['coordinates']['lon']
-                )
-                distance_km = geodesic(prev_coords, poi_coords).kilometers
-                travel_time = int(distance_km * 2)  # ~2 min per km (heuristic)
+        max_pois = PACE_MAX_POIS.get(pace, PACE_MAX_POIS['fast'])
+        
+        current = start
+        total_travel_time = 0
+        prev_row = None
+        rows = []
+        visits = []
+        
+        for k in range(first, min(first + max_pois, len(candidates))):
+            row = candidates[k]
+            # Travel time from the matrix (fastest allowed mode for the hop)
+            if prev_row is not None:
+                travel_time = matrix.travel_minutes(prev_row, row)
+            else:
+                travel_time = matrix.from_anchor(row) if from_anchor else 0
             
-            if total_travel_time + travel_time > max_travel_time:
+            back = matrix.to_anchor(row) if return_leg else 0
+            if total_travel_time + travel_time + back > max_travel_time:
                 break
             
             # POI duration
-            poi_duration = poi.get('estimatedDuration', 60)
+            poi_duration = pois[row].get('estimatedDuration', 60)
             
             # Check if fits in block
-            if (current_time - start_time).total_seconds() / 60 + travel_time + poi_duration > block_duration:
+            if current - start + travel_time + poi_duration > block_duration:
                 break
             
             # Add POI
-            arrival = current_time + timedelta(minutes=travel_time)
-            departure = arrival + timedelta(minutes=poi_duration)
-            
-            block_pois.append(POIBlock(
-                poiId=poi['id'],
-                name=poi.get('name', 'Unknown'),
-                category=poi.get('category', ''),
-                arrivalTime=arrival.isoformat(),
-                departureTime=departure.isoformat(),
-                duration=poi_duration
-            ))
-            
-            current_time = departure
+            arrival = current + travel_time
+            current = arrival + poi_duration
+            if prev_row is not None:
+                mode = matrix.mode_between(prev_row, row)
+            else:
+                mode = matrix.anchor_mode(row) if from_anchor else None
+            visits.append((row, mode, arrival, current))
             total_travel_time += travel_time
-            prev_coords = (poi['coordinates']['lat'], poi['coordinates']['lon'])
+            prev_row = row
+            rows.append(row)
+        
+        block_pois = [
+            POIBlock(
+                poiId=pois[row]['id'],
+                name=pois[row].get('name', 'Unknown'),
+                category=pois[row].get('category', ''),
+                arrivalTime=clock.iso(arrival),
+                departureTime=clock.iso(departure),
+                duration=departure - arrival,
+                travelMode=mode
+            )
+            for row, mode, arrival, departure in visits
+        ]
         
         # Determine block type from start time
-        hour = start_time.hour
+        hour = clock.hour(start)
         if hour < 12:
             block_type = 'morning'
         elif hour < 17:
@@ -234,20 +1023,21 @@ class ItineraryBuilderMCP:
         
         block = TimeBlock(
             time={
-                'start': start_time.isoformat(),
-                'end': current_time.isoformat()
+                'start': clock.iso(start),
+                'end': clock.iso(current)
             },
             type=block_type,
             pois=block_pois,
             travelTime=int(total_travel_time),
-            totalDuration=int((current_time - start_time).total_seconds() / 60)
+            totalDuration=current - start
         )
         
         return {
             'block': block,
             'pois': block_pois,
+            'rows': rows,
             'travel_time': total_travel_time,
-            'end_time': current_time
+            'end_time': current
         }
     
     def _calculate_feasibility_score(
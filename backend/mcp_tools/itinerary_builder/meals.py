@@ -0,0 +1,79 @@
+"""
+Meal Slots
+Lunch and dinner stops chosen during the build: food POIs are kept out of the
+sightseeing fill and indexed on a coarse lat/lon grid, and each meal slot takes
+the best-ranked restaurant among the k nearest within walking distance of the
+POI before it (or the hotel)
+"""
+import math
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from data_sources.poi_record import POIRecord
+from mcp_tools.itinerary_builder.spatial_index import GridIndex
+from mcp_tools.itinerary_builder.travel_modes import TRAVEL_MODES
+
+# OSM amenity subcategories that are places to eat
+FOOD_SUBCATEGORIES = frozenset({'restaurant', 'cafe', 'fast_food', 'food_court'})
+
+
+class MealSlot(NamedTuple):
+    name: str           # 'lunch' / 'dinner'
+    after_block: str    # Eaten after this block's visits
+    duration: int       # Minutes
+    earliest: int       # Earliest start, minutes after midnight
+
+
+MEAL_SLOTS: Tuple[MealSlot, ...] = (
+    MealSlot('lunch', 'morning', 60, 12 * 60),
+    MealSlot('dinner', 'evening', 60, 18 * 60 + 30),
+)
+
+# Longest walk to a meal (km) and the nearest restaurants considered per slot
+MEAL_WALK_KM = 1.0
+MEAL_NEIGHBOURS = 8
+
+# Walking time reserved with each meal (at most MEAL_WALK_KM on foot)
+MEAL_WALK_MINUTES = int(math.ceil(MEAL_WALK_KM * TRAVEL_MODES['walk'].minutes_per_km))
+
+
+def is_food(poi: POIRecord) -> bool:
+    """True for restaurants, cafes and the like (metadata.subcategory)."""
+    return (poi.get('metadata') or {}).get('subcategory', '') in FOOD_SUBCATEGORIES
+
+
+def split_food(pois: Sequence[POIRecord]) -> Tuple[List[POIRecord], List[POIRecord]]:
+    """(sights, food POIs), each in the given (ranked) order."""
+    sights, food = [], []
+    for poi in pois:
+        (food if is_food(poi) else sights).append(poi)
+    return sights, food
+
+
+class MealPlanner:
+    """Picks a restaurant per meal slot, never the same one twice in a trip."""
+
+    def __init__(self, food: Sequence[POIRecord], exclude: Iterable[str] = ()):
+        self.index = GridIndex(food, MEAL_WALK_KM)
+        self.used = set(exclude)
+
+    def slot_after(self, block: str) -> Optional[MealSlot]:
+        return next((meal for meal in MEAL_SLOTS if meal.after_block == block), None)
+
+    def pick(self, lat: float, lon: float) -> Optional[Tuple[POIRecord, int]]:
+        """
+        Best-ranked unused restaurant among the k nearest within walking distance
+
+        Returns:
+            (food POI, walking minutes) or None if none is close enough
+        """
+        nearby = [
+            (i, km) for i, km in self.index.nearest(lat, lon, MEAL_NEIGHBOURS)
+            if self.index.pois[i]['id'] not in self.used
+        ]
+        if not nearby:
+            return None
+        # Lower index = better ranked by POI search
+        i, km = min(nearby)
+        poi = self.index.pois[i]
+        self.used.add(poi['id'])
+        return poi, int(math.ceil(km * TRAVEL_MODES['walk'].minutes_per_km))
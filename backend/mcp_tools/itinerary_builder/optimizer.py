@@ -0,0 +1,498 @@
+"""
+Orienteering Optimizer
+Chooses and orders POIs to maximise total score subject to block windows,
+visit durations, opening hours, per-block pace caps and a daily travel budget
+(orienteering problem with time windows). Small instances are solved exactly
+by branch and bound; larger ones by large-neighbourhood search (LNS), which can
+also run "anytime": from a given starting plan until a deadline or stop signal.
+"""
+import time
+import random
+import itertools
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+from mcp_tools.poi_search.opening_hours import Intervals, WEEK_MINUTES
+
+# Instances with at most this many candidates are solved exactly
+EXACT_MAX_CANDIDATES = 10
+# Branch-and-bound node budget before falling back to LNS
+EXACT_NODE_LIMIT = 200000
+# Branch-and-bound nodes between deadline / should_stop checks
+EXACT_POLL_NODES = 1000
+
+LNS_ITERATIONS = 400
+# Share of visits removed per destroy step (at least 1)
+LNS_DESTROY_SHARE = 0.3
+# Unvisited POIs (best first) offered to each repair, besides the removed ones
+LNS_REPAIR_POOL = 30
+# Probability of accepting a non-improving neighbour
+LNS_ACCEPT_WORSE = 0.05
+
+
+class Slot(NamedTuple):
+    """One time block: [start, end) in week minutes (Monday 00:00 = 0)"""
+    day: int
+    start: int
+    end: int
+
+
+class Visit(NamedTuple):
+    row: int
+    arrival: int   # week minutes (after any wait for opening)
+    departure: int
+
+
+class OrienteeringSolution(NamedTuple):
+    """Visits per slot, objective (total score) and how it was found"""
+    routes: List[List[Visit]]
+    objective: float
+    travel_minutes: int
+    method: str       # 'exact', 'exact-partial' (stopped before the search finished) or 'lns'
+    iterations: int   # B&B nodes or LNS iterations
+
+
+def earliest_start(intervals: Optional[Intervals], arrival: int, duration: int) -> Optional[int]:
+    """
+    Earliest visit start >= arrival that stays open for `duration` minutes
+
+    Args:
+        intervals: Weekly opening intervals (None = unknown, always open)
+        arrival: Arrival time in week minutes (may exceed one week)
+
+    Returns:
+        Start time in the same week numbering as arrival, or None if closed
+    """
+    if intervals is None:
+        return arrival
+    base = (arrival // WEEK_MINUTES) * WEEK_MINUTES
+    t = arrival - base
+    for start, end in intervals:
+        begin = max(t, start)
+        if begin + duration <= end:
+            return base + begin
+    return None
+
+
+class OrienteeringSolver:
+    """
+    Orienteering with time windows over a fixed candidate set.
+    Rows index durations/scores/hours and the travel-minute matrix; slots are
+    the trip's blocks in chronological order.
+    """
+
+    def __init__(
+        self,
+        travel: np.ndarray,
+        durations: Sequence[int],
+        scores: Sequence[float],
+        hours: Sequence[Optional[Intervals]],
+        slots: Sequence[Slot],
+        max_per_slot: int,
+        max_day_travel: float,
+        seed: int = 0,
+        start_travel: Optional[Sequence[int]] = None,
+        end_travel: Optional[Sequence[int]] = None,
+        day_reserve: int = 0
+    ):
+        """
+        Args:
+            travel: n x n travel minutes
+            durations: Visit minutes per row
+            scores: Score per row (objective is their sum over visited rows)
+            hours: Opening intervals per row (None = unknown, always open)
+            slots: Time blocks in chronological order
+            max_per_slot: Pace cap (POIs per block)
+            max_day_travel: Travel-minute budget per day (blocks plus the trip back to base)
+            seed: Seed for LNS randomisation
+            start_travel: Minutes from the day's base (hotel) to each row, charged
+                to the first visit of each day's first slot
+            end_travel: Minutes from each row back to the base, charged to the
+                day's last visit
+            day_reserve: Travel minutes per day held back from max_day_travel
+                (e.g. walks to meal stops scheduled around the solution)
+        """
+        # Nested lists: scalar lookups in the inner loops are much cheaper than on ndarrays
+        self.travel = np.asarray(travel, dtype=np.int64).tolist()
+        self.durations = list(durations)
+        self.scores = [float(s) for s in scores]
+        self.hours = list(hours)
+        self.slots = list(slots)
+        self.max_per_slot = max_per_slot
+        self.max_day_travel = max_day_travel
+        self.seed = seed
+        self.n = len(self.durations)
+        self._by_score = sorted(range(self.n), key=lambda row: (-self.scores[row], row))
+        self._day_slots = {}
+        for i, slot in enumerate(self.slots):
+            self._day_slots.setdefault(slot.day, []).append(i)
+        # First-visit legs per slot (only a day's first slot starts at the base)
+        self._start_legs = {}
+        if start_travel is not None:
+            legs = np.asarray(start_travel, dtype=np.int64).tolist()
+            self._start_legs = {self.slots[indexes[0]]: legs for indexes in self._day_slots.values()}
+        self.end_travel = np.asarray(end_travel, dtype=np.int64).tolist() if end_travel is not None else None
+        self.day_reserve = day_reserve
+
+    # ----- Feasibility -----
+
+    def schedule(self, slot: Slot, rows: Sequence[int]) -> Optional[Tuple[List[Visit], int]]:
+        """Visits and travel minutes for rows in order within a slot, or None if infeasible."""
+        if len(rows) > self.max_per_slot:
+            return None
+        t = slot.start
+        travel = 0
+        prev = None
+        visits = []
+        start_legs = self._start_legs.get(slot)
+        for row in rows:
+            if prev is not None:
+                leg = self.travel[prev][row]
+            else:
+                leg = start_legs[row] if start_legs is not None else 0
+            begin = earliest_start(self.hours[row], t + leg, self.durations[row])
+            if begin is None:
+                return None
+            end = begin + self.durations[row]
+            if end > slot.end:
+                return None
+            visits.append(Visit(row, begin, end))
+            travel += leg
+            t = end
+            prev = row
+        return visits, travel
+
+    def _travel_if_feasible(self, slot: Slot, rows: Sequence[int]) -> Optional[int]:
+        """Travel minutes for rows in order within a slot, or None if infeasible (no Visit objects)."""
+        if len(rows) > self.max_per_slot:
+            return None
+        t = slot.start
+        travel = 0
+        prev = None
+        durations, hours, matrix = self.durations, self.hours, self.travel
+        start_legs = self._start_legs.get(slot)
+        for row in rows:
+            if prev is not None:
+                leg = matrix[prev][row]
+            else:
+                leg = start_legs[row] if start_legs is not None else 0
+            intervals = hours[row]
+            begin = t + leg if intervals is None else earliest_start(intervals, t + leg, durations[row])
+            if begin is None:
+                return None
+            t = begin + durations[row]
+            if t > slot.end:
+                return None
+            travel += leg
+            prev = row
+        return travel
+
+    def _day_travel_ok(
+        self,
+        routes: List[List[int]],
+        travel_by_slot: List[int],
+        slot_index: int,
+        new_route: Sequence[int],
+        new_travel: int
+    ) -> bool:
+        """Whether the slot's day stays within budget with new_route in the slot (trip back to base included)."""
+        total = self.day_reserve
+        last = None
+        for i in self._day_slots[self.slots[slot_index].day]:
+            route = new_route if i == slot_index else routes[i]
+            total += new_travel if i == slot_index else travel_by_slot[i]
+            if route:
+                last = route[-1]
+        if last is not None and self.end_travel is not None:
+            total += self.end_travel[last]
+        return total <= self.max_day_travel
+
+    def _fit_day(self, routes: List[List[int]], travel_by_slot: List[int], day: int):
+        """Drop the day's last visit until it is within budget (removals can move the trip back to base)."""
+        filled = [i for i in self._day_slots[day] if routes[i]]
+        while filled:
+            i = filled[-1]
+            if self._day_travel_ok(routes, travel_by_slot, i, routes[i], travel_by_slot[i]):
+                return
+            routes[i].pop()
+            travel_by_slot[i] = self._travel_if_feasible(self.slots[i], routes[i]) or 0
+            if not routes[i]:
+                filled.pop()
+
+    def _objective(self, routes: List[List[int]]) -> float:
+        return sum(self.scores[row] for route in routes for row in route)
+
+    def _key(self, routes: List[List[int]], travel_by_slot: List[int]) -> Tuple[float, int]:
+        """Higher is better: score first, then less travel."""
+        return (round(self._objective(routes), 9), -sum(travel_by_slot))
+
+    # ----- Exact (branch and bound) -----
+
+    def _solve_exact(
+        self,
+        deadline: Optional[float] = None,
+        initial_routes: Optional[Sequence[Sequence[int]]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Optional[Tuple[List[List[int]], int, bool]]:
+        """
+        Best routes by depth-first branch and bound: (routes, nodes, complete).
+        None if the node budget runs out; at the deadline or should_stop, the
+        best routes so far (at least the feasible part of initial_routes).
+        """
+        slots = self.slots
+        best_routes: List[List[int]] = [[] for _ in slots]
+        best = [(-1.0, 0)]
+        if initial_routes:
+            seeded: List[List[int]] = [[] for _ in slots]
+            seeded_travel = [0] * len(slots)
+            self._seed_routes(initial_routes, seeded, seeded_travel)
+            best_routes, best[0] = seeded, self._key(seeded, seeded_travel)
+        nodes = [0]
+        stopped = [False]
+        routes: List[List[int]] = [[] for _ in slots]
+        travel_by_slot = [0] * len(slots)
+        used = [False] * self.n
+
+        def bound(slot_index: int, score: float) -> float:
+            room = self.max_per_slot - len(routes[slot_index]) + self.max_per_slot * (len(slots) - slot_index - 1)
+            extra = 0.0
+            for row in self._by_score:
+                if room <= 0:
+                    break
+                if not used[row]:
+                    extra += self.scores[row]
+                    room -= 1
+            return score + extra
+
+        def dfs(slot_index: int, score: float):
+            nodes[0] += 1
+            if nodes[0] > EXACT_NODE_LIMIT:
+                raise TimeoutError
+            if nodes[0] % EXACT_POLL_NODES == 0 and (
+                (deadline is not None and time.monotonic() >= deadline)
+                or (should_stop is not None and should_stop())
+            ):
+                stopped[0] = True
+                raise TimeoutError
+            key = (round(score, 9), -sum(travel_by_slot))
+            if key > best[0]:
+                best[0] = key
+                for i, route in enumerate(routes):
+                    best_routes[i] = list(route)
+            if slot_index >= len(slots) or bound(slot_index, score) <= best[0][0] + 1e-12:
+                return
+            route = routes[slot_index]
+            for row in self._by_score:
+                if used[row]:
+                    continue
+                travel = self._travel_if_feasible(slots[slot_index], route + [row])
+                if travel is None or not self._day_travel_ok(routes, travel_by_slot, slot_index, route + [row], travel):
+                    continue
+                previous_travel = travel_by_slot[slot_index]
+                used[row] = True
+                route.append(row)
+                travel_by_slot[slot_index] = travel
+                dfs(slot_index, score + self.scores[row])
+                route.pop()
+                travel_by_slot[slot_index] = previous_travel
+                used[row] = False
+            # Close this slot and move on
+            dfs(slot_index + 1, score)
+
+        try:
+            dfs(0, 0.0)
+        except TimeoutError:
+            if not stopped[0]:
+                return None
+        return best_routes, nodes[0], not stopped[0]
+
+    # ----- LNS -----
+
+    def _insert_best(self, routes: List[List[int]], travel_by_slot: List[int], row: int) -> bool:
+        """Insert row where it adds the least travel (False if it fits nowhere)."""
+        best = None
+        for slot_index, slot in enumerate(self.slots):
+            route = routes[slot_index]
+            if len(route) >= self.max_per_slot:
+                continue
+            busy = self.durations[row] + sum(self.durations[r] for r in route)
+            if busy > slot.end - slot.start:
+                continue
+            for pos in range(len(route) + 1):
+                candidate = route[:pos] + [row] + route[pos:]
+                travel = self._travel_if_feasible(slot, candidate)
+                if travel is None:
+                    continue
+                added = travel - travel_by_slot[slot_index]
+                if best is not None and added >= best[0]:
+                    continue
+                if self._day_travel_ok(routes, travel_by_slot, slot_index, candidate, travel):
+                    best = (added, slot_index, pos, travel)
+        if best is None:
+            return False
+        _, slot_index, pos, travel = best
+        routes[slot_index].insert(pos, row)
+        travel_by_slot[slot_index] = travel
+        return True
+
+    def _repair(self, routes: List[List[int]], travel_by_slot: List[int], offered: Sequence[int]):
+        """Greedy insertion of offered rows, best score first."""
+        visited = {row for route in routes for row in route}
+        for row in sorted(set(offered) - visited, key=lambda r: (-self.scores[r], r)):
+            self._insert_best(routes, travel_by_slot, row)
+
+    def _destroy(self, routes: List[List[int]], travel_by_slot: List[int], rng: random.Random) -> List[int]:
+        """Remove visits (random, lowest-score or a whole slot); returns removed rows."""
+        visits = [(i, row) for i, route in enumerate(routes) for row in route]
+        if not visits:
+            return []
+        count = max(1, int(len(visits) * LNS_DESTROY_SHARE))
+        operator = rng.random()
+        if operator < 0.4:
+            chosen = rng.sample(visits, min(count, len(visits)))
+        elif operator < 0.7:
+            chosen = sorted(visits, key=lambda v: (self.scores[v[1]], rng.random()))[:count]
+        else:
+            slot_index = rng.choice([i for i, route in enumerate(routes) if route])
+            chosen = [(slot_index, row) for row in routes[slot_index]]
+        removed = []
+        for slot_index, row in chosen:
+            routes[slot_index].remove(row)
+            removed.append(row)
+        for slot_index in {slot_index for slot_index, _ in chosen}:
+            travel = self._travel_if_feasible(self.slots[slot_index], routes[slot_index])
+            travel_by_slot[slot_index] = travel or 0
+        for day in {self.slots[slot_index].day for slot_index, _ in chosen}:
+            self._fit_day(routes, travel_by_slot, day)
+        return removed
+
+    def _seed_routes(
+        self,
+        initial_routes: Sequence[Sequence[int]],
+        routes: List[List[int]],
+        travel_by_slot: List[int]
+    ):
+        """Start from a given plan, keeping each slot's rows in order while they stay feasible."""
+        used = set()
+        for slot_index, rows in enumerate(initial_routes[:len(self.slots)]):
+            for row in rows:
+                if row in used or not 0 <= row < self.n:
+                    continue
+                route = routes[slot_index] + [row]
+                travel = self._travel_if_feasible(self.slots[slot_index], route)
+                if travel is not None and self._day_travel_ok(routes, travel_by_slot, slot_index, route, travel):
+                    routes[slot_index] = route
+                    travel_by_slot[slot_index] = travel
+                    used.add(row)
+
+    def _solve_lns(
+        self,
+        max_iterations: Optional[int],
+        deadline: Optional[float],
+        initial_routes: Optional[Sequence[Sequence[int]]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Tuple[List[List[int]], int]:
+        rng = random.Random(self.seed)
+        routes: List[List[int]] = [[] for _ in self.slots]
+        travel_by_slot = [0] * len(self.slots)
+        if initial_routes:
+            self._seed_routes(initial_routes, routes, travel_by_slot)
+        self._repair(routes, travel_by_slot, self._by_score)
+
+        best = ([list(r) for r in routes], list(travel_by_slot))
+        best_key = self._key(routes, travel_by_slot)
+        current_key = best_key
+        iterations = 0
+        steps = itertools.count(1) if max_iterations is None else range(1, max_iterations + 1)
+        for iterations in steps:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if should_stop is not None and should_stop():
+                break
+            trial = [list(r) for r in routes]
+            trial_travel = list(travel_by_slot)
+            removed = self._destroy(trial, trial_travel, rng)
+            visited = {row for route in trial for row in route}
+            pool = [row for row in self._by_score if row not in visited][:LNS_REPAIR_POOL]
+            # Removed rows go last so the neighbourhood actually changes
+            self._repair(trial, trial_travel, [row for row in pool if row not in removed])
+            self._repair(trial, trial_travel, removed)
+            key = self._key(trial, trial_travel)
+            if key > current_key or rng.random() < LNS_ACCEPT_WORSE:
+                routes, travel_by_slot, current_key = trial, trial_travel, key
+            if key > best_key:
+                best = ([list(r) for r in trial], list(trial_travel))
+                best_key = key
+        return best[0], iterations
+
+    # ----- Entry point -----
+
+    def solve(
+        self,
+        max_iterations: Optional[int] = LNS_ITERATIONS,
+        time_limit: Optional[float] = None,
+        initial_routes: Optional[Sequence[Sequence[int]]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> OrienteeringSolution:
+        """
+        Solve the instance
+
+        Anytime use: pass a starting plan, max_iterations=None and a time
+        limit and/or should_stop; LNS improves on the plan until either fires
+        and returns the best found so far.
+
+        Args:
+            max_iterations: LNS iteration cap (None: until time_limit / should_stop)
+            time_limit: Optional wall-clock limit in seconds (exact search or LNS)
+            initial_routes: Optional starting rows per slot (infeasible visits are dropped)
+            should_stop: Optional callback polled once per LNS iteration
+                (every EXACT_POLL_NODES nodes of an exact search)
+
+        Returns:
+            OrienteeringSolution (exact when the instance is small enough)
+        """
+        if max_iterations is None and time_limit is None and should_stop is None:
+            raise ValueError("Unbounded LNS needs a time_limit or should_stop")
+        deadline = time.monotonic() + time_limit if time_limit is not None else None
+        exact = (
+            self._solve_exact(deadline, initial_routes, should_stop)
+            if self.n <= EXACT_MAX_CANDIDATES else None
+        )
+        if exact is not None:
+            routes, iterations, complete = exact
+            method = 'exact' if complete else 'exact-partial'
+        else:
+            routes, iterations = self._solve_lns(max_iterations, deadline, initial_routes, should_stop)
+            method = 'lns'
+
+        visits = []
+        travel = 0
+        for slot, route in zip(self.slots, routes):
+            result = self.schedule(slot, route)
+            visits.append(result[0] if result else [])
+            travel += result[1] if result else 0
+        return OrienteeringSolution(
+            routes=visits,
+            objective=round(sum(self.scores[v.row] for route in visits for v in route), 6),
+            travel_minutes=travel,
+            method=method,
+            iterations=iterations
+        )
+
+
+def rank_scores(count: int) -> List[float]:
+    """Scores for a ranked list: 1.0 for the best, decreasing linearly to 0.5."""
+    if count <= 1:
+        return [1.0] * count
+    return [1.0 - 0.5 * i / (count - 1) for i in range(count)]
+
+
+def relevance_scores(pois: Sequence[Dict]) -> List[float]:
+    """
+    Search relevance per POI (metadata 'relevance', from RelevanceScorer);
+    falls back to rank_scores when any POI lacks one (e.g. mock data)
+    """
+    scores = [(poi.get('metadata') or {}).get('relevance') for poi in pois]
+    if any(score is None for score in scores):
+        return rank_scores(len(pois))
+    return [float(score) for score in scores]
@@ -0,0 +1,69 @@
+"""
+Rain Contingency
+Nearby indoor alternatives for every outdoor POI in a plan, precomputed at
+build time (indoor from tag features, nearest via the grid index), so weather
+swaps and "what if it rains?" answers are lookups
+"""
+from typing import Dict, Iterable, List, Sequence
+
+from data_sources.poi_record import POIRecord
+from mcp_tools.poi_search.feature_table import is_indoor
+from mcp_tools.itinerary_builder.meals import is_food
+from mcp_tools.itinerary_builder.spatial_index import GridIndex
+from mcp_tools.itinerary_builder.schema import RainAlternative
+
+# Alternatives kept per outdoor POI, how far away they may be and how many neighbours are examined
+RAIN_ALTERNATIVES = 3
+RAIN_MAX_KM = 3.0
+RAIN_NEIGHBOURS = 12
+
+
+def is_indoor_record(poi: POIRecord) -> bool:
+    """Indoor test for a search record (same features as the POI search `indoor` mask)."""
+    metadata = poi.get('metadata') or {}
+    return is_indoor((metadata.get('subcategory') or '').lower(), metadata.get('tags') or {})
+
+
+class RainPlanner:
+    """
+    Indoor candidates of a build, indexed for nearest-alternative lookups.
+    Restaurants and cafes are indoors but are meal stops, not sights, so
+    they are never offered.
+    """
+
+    def __init__(self, pool: Sequence[POIRecord]):
+        self.by_id: Dict[str, POIRecord] = {poi['id']: poi for poi in pool}
+        self.index = GridIndex([poi for poi in pool if is_indoor_record(poi) and not is_food(poi)], RAIN_MAX_KM)
+
+    def alternatives(self, scheduled_ids: Iterable[str]) -> Dict[str, List[RainAlternative]]:
+        """
+        Indoor alternatives for each scheduled outdoor POI, nearest first
+
+        POIs already in the plan are never offered; POIs outside the pool (e.g.
+        meal stops, edits) and indoor ones get no entry.
+        """
+        scheduled_ids = list(scheduled_ids)
+        taken = set(scheduled_ids)
+        result: Dict[str, List[RainAlternative]] = {}
+        for poi_id in scheduled_ids:
+            poi = self.by_id.get(poi_id)
+            if poi is None or is_indoor_record(poi):
+                continue
+            coordinates = poi['coordinates']
+            options = [
+                RainAlternative(
+                    poiId=alt['id'],
+                    name=alt.get('name', 'Unknown'),
+                    category=alt.get('category', ''),
+                    distanceKm=round(km, 2),
+                    estimatedDuration=alt.get('estimatedDuration', 60)
+                )
+                for alt, km in (
+                    (self.index.pois[i], km)
+                    for i, km in self.index.nearest(coordinates['lat'], coordinates['lon'], RAIN_NEIGHBOURS)
+                )
+                if alt['id'] not in taken
+            ][:RAIN_ALTERNATIVES]
+            if options:
+                result[poi_id] = options
+        return result
@@ -0,0 +1,192 @@
+"""
+Routing
+Geographic day clustering (capacity-balanced k-means) and intra-day route
+ordering (nearest neighbour + 2-opt + Or-opt) over the builder's distance matrix.
+With an anchor (hotel), routes are ordered as round trips from and back to it.
+"""
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+from mcp_tools.itinerary_builder.distance_matrix import DistanceMatrix
+
+KMEANS_ITERATIONS = 12
+OR_OPT_MAX_SEGMENT = 3
+IMPROVEMENT_EPS = 1e-9
+
+
+def balanced_clusters(lat: np.ndarray, lon: np.ndarray, k: int, capacity: int) -> List[List[int]]:
+    """
+    Split points into k geographic groups of at most `capacity` points
+
+    Capacity-constrained k-means on an equirectangular projection: each round
+    assigns (point, centre) pairs in order of distance while centres have room,
+    then moves centres to their members' mean. Seeding is farthest-point from
+    point 0, so results are deterministic and the first (best-ranked) point
+    anchors a cluster. Points that do not fit (n > k * capacity) are left out.
+
+    Returns:
+        k lists of point indices (ascending), possibly empty
+    """
+    n = len(lat)
+    if n == 0 or k <= 0:
+        return [[] for _ in range(max(k, 0))]
+    pts = np.column_stack((
+        (np.asarray(lon, dtype=np.float64) - np.mean(lon)) * np.cos(np.radians(np.mean(lat))),
+        np.asarray(lat, dtype=np.float64)
+    ))
+
+    centers = [pts[0]]
+    nearest = np.linalg.norm(pts - pts[0], axis=1)
+    for _ in range(1, min(k, n)):
+        far = int(np.argmax(nearest))
+        centers.append(pts[far])
+        nearest = np.minimum(nearest, np.linalg.norm(pts - pts[far], axis=1))
+    while len(centers) < k:
+        centers.append(pts[0])
+    centers = np.array(centers)
+
+    labels = np.full(n, -1)
+    to_place = min(n, k * capacity)
+    for _ in range(KMEANS_ITERATIONS):
+        dist = np.linalg.norm(pts[:, None, :] - centers[None, :, :], axis=2)
+        new_labels = np.full(n, -1)
+        sizes = np.zeros(k, dtype=np.int64)
+        placed = 0
+        for flat in np.argsort(dist, axis=None, kind='stable'):
+            point, cluster = divmod(int(flat), k)
+            if new_labels[point] < 0 and sizes[cluster] < capacity:
+                new_labels[point] = cluster
+                sizes[cluster] += 1
+                placed += 1
+                if placed == to_place:
+                    break
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for cluster in range(k):
+            members = pts[labels == cluster]
+            if len(members):
+                centers[cluster] = members.mean(axis=0)
+
+    return [np.flatnonzero(labels == cluster).tolist() for cluster in range(k)]
+
+
+# (cost from the anchor to each row, cost from each row back to it)
+AnchorCost = Optional[Tuple[np.ndarray, np.ndarray]]
+
+
+def route_length(route: Sequence[int], km: np.ndarray, anchor: AnchorCost = None) -> float:
+    """Length (km) of an open path visiting rows in order (plus the legs from/to the anchor)."""
+    length = float(sum(km[a, b] for a, b in zip(route, route[1:])))
+    if anchor is not None and route:
+        length += float(anchor[0][route[0]]) + float(anchor[1][route[-1]])
+    return length
+
+
+def nearest_neighbour_route(rows: Sequence[int], km: np.ndarray, anchor: AnchorCost = None) -> List[int]:
+    """Open path from rows[0] (or the row closest to the anchor), always moving to the closest unvisited row."""
+    if not rows:
+        return []
+    first = min(rows, key=lambda row: (anchor[0][row], row)) if anchor is not None else rows[0]
+    remaining = [row for row in rows if row != first]
+    route = [first]
+    while remaining:
+        last = route[-1]
+        nxt = min(remaining, key=lambda row: (km[last, row], row))
+        remaining.remove(nxt)
+        route.append(nxt)
+    return route
+
+
+def two_opt(route: List[int], km: np.ndarray, anchor: AnchorCost = None) -> List[int]:
+    """
+    Reverse sub-paths while that shortens the open path (first improvement)
+
+    With asymmetric costs (e.g. one-way streets) a reversed segment's own
+    legs change too, so their difference is added to the boundary edges'.
+    """
+    route = list(route)
+    n = len(route)
+    start_cost, end_cost = anchor if anchor is not None else (None, None)
+    symmetric = np.allclose(km, km.T, equal_nan=True)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                if i > 0:
+                    before, new_before = km[route[i - 1], route[i]], km[route[i - 1], route[j]]
+                elif start_cost is not None:
+                    before, new_before = start_cost[route[i]], start_cost[route[j]]
+                else:
+                    before = new_before = 0.0
+                if j < n - 1:
+                    after, new_after = km[route[j], route[j + 1]], km[route[i], route[j + 1]]
+                elif end_cost is not None:
+                    after, new_after = end_cost[route[j]], end_cost[route[i]]
+                else:
+                    after = new_after = 0.0
+                inner = 0.0 if symmetric else float(sum(
+                    km[route[k + 1], route[k]] - km[route[k], route[k + 1]] for k in range(i, j)
+                ))
+                if new_before + new_after + inner < before + after - IMPROVEMENT_EPS:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    return route
+
+
+def or_opt(route: List[int], km: np.ndarray, anchor: AnchorCost = None) -> List[int]:
+    """Move segments of 1..OR_OPT_MAX_SEGMENT stops elsewhere while that shortens the path."""
+    route = list(route)
+    best = route_length(route, km, anchor)
+    improved = True
+    while improved:
+        improved = False
+        for size in range(1, min(OR_OPT_MAX_SEGMENT, len(route) - 1) + 1):
+            for start in range(len(route) - size + 1):
+                segment = route[start:start + size]
+                rest = route[:start] + route[start + size:]
+                for pos in range(len(rest) + 1):
+                    if pos == start:
+                        continue
+                    candidate = rest[:pos] + segment + rest[pos:]
+                    length = route_length(candidate, km, anchor)
+                    if length < best - IMPROVEMENT_EPS:
+                        route, best, improved = candidate, length, True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return route
+
+
+def optimise_route(rows: Sequence[int], km: np.ndarray, anchor: AnchorCost = None) -> List[int]:
+    """Nearest-neighbour start, then 2-opt and Or-opt until neither improves."""
+    route = nearest_neighbour_route(rows, km, anchor)
+    if len(route) < 2 or (len(route) < 3 and anchor is None):
+        return route
+    length = route_length(route, km, anchor)
+    while True:
+        route = or_opt(two_opt(route, km, anchor), km, anchor)
+        new_length = route_length(route, km, anchor)
+        if new_length >= length - IMPROVEMENT_EPS:
+            return route
+        length = new_length
+
+
+def plan_day_routes(matrix: DistanceMatrix, days: int, per_day: int) -> List[List[int]]:
+    """
+    Cluster the matrix's POIs into `days` geographic groups and order each one
+
+    Days are ordered by their best-ranked POI (lowest row), so the strongest
+    picks still come first; each day's route starts from its best-ranked POI,
+    or with an anchor, is the shortest round trip from and back to it.
+    Routes are ordered by travel minutes when the matrix has them, else by km.
+
+    Returns:
+        Ordered matrix rows per day
+    """
+    clusters = balanced_clusters(matrix.lat, matrix.lon, days, per_day)
+    clusters.sort(key=lambda rows: rows[0] if rows else len(matrix))
+    return [optimise_route(rows, matrix.cost, matrix.anchor_cost) for rows in clusters]
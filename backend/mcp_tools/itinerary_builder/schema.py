@@ -3,7 +3,7 @@ Itinerary Builder MCP Tool Schema
 Strict input/output schemas for Itinerary Builder MCP
 """
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 
 class TimeWindow(BaseModel):
@@ -19,7 +19,7 @@ class ItineraryBuilderInput(BaseModel):
     timeWindows: List[TimeWindow] = Field(..., description="Time windows for each day")
     constraints: Dict = Field(
         ...,
-        description="Constraints: maxTravelTimePerDay (minutes), pace (relaxed/moderate/fast), preferences (dict)"
+        description="Constraints: maxTravelTimePerDay (minutes), pace (relaxed/moderate/fast), preferences (dict), planningMode (greedy/clustered/optimal/anytime), seed and optimizerTimeLimit (seconds) for optimal, timeBudget (seconds, default 2) for anytime (improves the greedy plan until the budget runs out), travelModes (walk/auto/car), hotel ({lat, lon} base each day starts and ends at), meals (bool, default false: lunch/dinner stops at restaurants)"
     )
 
 class POIBlock(BaseModel):
@@ -30,11 +30,13 @@ class POIBlock(BaseModel):
     arrivalTime: str = Field(..., description="Arrival time (ISO8601)")
     departureTime: str = Field(..., description="Departure time (ISO8601)")
     duration: int = Field(..., description="Duration in minutes")
+    travelMode: Optional[str] = Field(default=None, description="Mode used to get here from the previous POI, or from the hotel for a day's first POI ('walk', 'auto', 'car'); None if not modelled")
+    meal: Optional[str] = Field(default=None, description="'lunch' or 'dinner' for meal stops; None for sights")
 
 class TimeBlock(BaseModel):
     """Time block (morning/afternoon/evening)"""
     time: Dict = Field(..., description="Time window: {start: ISO8601, end: ISO8601}")
-    type: str = Field(..., description="Block type: 'morning', 'afternoon', or 'evening'")
+    type: str = Field(..., description="Block type: 'morning', 'afternoon', 'evening', or 'transfer' (multi-city)")
     pois: List[POIBlock] = Field(..., description="POIs in this block")
     travelTime: int = Field(..., description="Total travel time in minutes")
     totalDuration: int = Field(..., description="Total duration of block in minutes")
@@ -43,8 +45,10 @@ class Day(BaseModel):
     """Day in itinerary"""
     day: int = Field(..., description="Day number")
     date: str = Field(..., description="Date (ISO8601)")
+    city: Optional[str] = Field(default=None, description="City for multi-city trips ('A → B' on transfer days)")
     blocks: List[TimeBlock] = Field(..., description="Time blocks for the day")
     totalTravelTime: int = Field(..., description="Total travel time for the day in minutes")
+    returnTravelTime: int = Field(default=0, description="Minutes from the day's last POI back to the hotel (included in totalTravelTime)")
     feasibilityScore: float = Field(..., ge=0, le=1, description="Feasibility score (0-1)")
 
 class Decision(BaseModel):
@@ -58,11 +62,27 @@ class Reasoning(BaseModel):
     decisions: List[Decision] = Field(..., description="Decisions made")
     warnings: List[str] = Field(default_factory=list, description="Warnings about the itinerary")
 
+class RainAlternative(BaseModel):
+    """Indoor POI that can replace an outdoor one if it rains"""
+    poiId: str = Field(..., description="POI ID")
+    name: str = Field(..., description="POI name")
+    category: str = Field(..., description="POI category")
+    distanceKm: float = Field(..., description="Straight-line distance from the outdoor POI (km)")
+    estimatedDuration: int = Field(..., description="Visit duration in minutes")
+
 class Itinerary(BaseModel):
     """Itinerary structure"""
     days: List[Day] = Field(..., description="Days in the itinerary")
+    rainAlternatives: Dict[str, List[RainAlternative]] = Field(
+        default_factory=dict,
+        description="Indoor alternatives per outdoor POI ID in the plan, nearest first"
+    )
 
 class ItineraryBuilderOutput(BaseModel):
     """Output schema for Itinerary Builder MCP"""
     itinerary: Itinerary = Field(..., description="Structured itinerary")
     reasoning: Reasoning = Field(..., description="Reasoning for decisions")
+    metrics: Dict = Field(
+        default_factory=dict,
+        description="Build metrics: planningMode, totalTravelTime, routeMinutes (day-long travel incl. between blocks); clustered builds add greedy* baselines and travelTimeSaved; optimal and anytime builds add objective, solver, iterations and greedyObjective"
+    )
@@ -0,0 +1,57 @@
+"""
+Spatial Index
+Uniform lat/lon grid over POI records for k-nearest-neighbour queries within a
+radius (meal stops, rain alternatives); a query only examines the cells its
+radius can reach
+"""
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from data_sources.poi_record import POIRecord
+from mcp_tools.itinerary_builder.distance_matrix import haversine_cross
+
+_KM_PER_DEGREE = 111.32
+
+
+class GridIndex:
+    """
+    k-nearest-neighbour lookup over a fixed list of POIs.
+    Points are bucketed into square cells of cell_km; pick cell_km close to the
+    usual query radius so a query touches the 3 x 3 cells around it.
+    """
+
+    def __init__(self, pois: Sequence[POIRecord], cell_km: float):
+        self.pois = list(pois)
+        self.cell_km = cell_km
+        self.lat = np.fromiter((p['coordinates']['lat'] for p in self.pois), dtype=np.float64, count=len(self.pois))
+        self.lon = np.fromiter((p['coordinates']['lon'] for p in self.pois), dtype=np.float64, count=len(self.pois))
+        mid_lat = float(np.mean(self.lat)) if len(self.pois) else 0.0
+        self._lat_step = cell_km / _KM_PER_DEGREE
+        self._lon_step = self._lat_step / max(math.cos(math.radians(mid_lat)), 0.01)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (lat, lon) in enumerate(zip(self.lat, self.lon)):
+            self._cells.setdefault(self._cell(lat, lon), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.pois)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self._lat_step)), int(math.floor(lon / self._lon_step))
+
+    def nearest(self, lat: float, lon: float, k: int, max_km: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Up to k (index into pois, km) pairs nearest first, within max_km (default cell_km)."""
+        max_km = self.cell_km if max_km is None else max_km
+        reach = max(1, int(math.ceil(max_km / self.cell_km)))
+        row, col = self._cell(lat, lon)
+        candidates = [
+            i
+            for dr in range(-reach, reach + 1) for dc in range(-reach, reach + 1)
+            for i in self._cells.get((row + dr, col + dc), ())
+        ]
+        if not candidates:
+            return []
+        rows = np.asarray(candidates)
+        km = haversine_cross([lat], [lon], self.lat[rows], self.lon[rows])[0]
+        order = np.argsort(km, kind='stable')[:k]
+        return [(int(rows[j]), float(km[j])) for j in order if km[j] <= max_km]
@@ -0,0 +1,78 @@
+"""
+Travel Modes
+Per-mode travel-time models (walk, auto-rickshaw, car) and the vectorised
+fastest-mode choice for every hop of a distance matrix
+"""
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+
+class TravelMode(NamedTuple):
+    minutes_per_km: float     # Moving time per straight-line km (or per road-network minute factor)
+    overhead_minutes: float   # Hailing / booking / parking per hop
+    max_km: float             # Longest straight-line hop for this mode (inf = any)
+    on_road: bool             # Uses road-network times when a network is configured
+
+
+TRAVEL_MODES: Dict[str, TravelMode] = {
+    # ~5 km/h on foot; only for short hops (old-city lanes)
+    'walk': TravelMode(minutes_per_km=12.0, overhead_minutes=0.0, max_km=1.5, on_road=False),
+    # ~25 km/h in traffic plus finding and agreeing a fare
+    'auto': TravelMode(minutes_per_km=2.4, overhead_minutes=8.0, max_km=float('inf'), on_road=True),
+    # ~30 km/h plus waiting for a cab / parking
+    'car': TravelMode(minutes_per_km=2.0, overhead_minutes=10.0, max_km=float('inf'), on_road=True),
+}
+
+DEFAULT_TRAVEL_MODES: Tuple[str, ...] = ('walk', 'auto', 'car')
+
+# Road-network minutes are for a car; autos are this much slower on the same roads
+AUTO_ROAD_FACTOR = 1.2
+
+
+def mode_minutes(
+    km: np.ndarray,
+    modes: Sequence[str],
+    road_minutes: Optional[np.ndarray] = None,
+    zero_diagonal: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fastest-mode travel minutes for every hop
+
+    Args:
+        km: n x n straight-line distances
+        modes: Allowed mode names (keys of TRAVEL_MODES)
+        road_minutes: Optional n x n road-network driving minutes (NaN = unroutable)
+        zero_diagonal: Zero the diagonal (off for rectangular blocks, e.g. matrix extensions)
+
+    Returns:
+        (n x n minutes, n x n index into `modes` of the chosen mode); the
+        diagonal is zero minutes. A mode's max_km is waived for hops no
+        allowed mode covers (e.g. walk-only trips)
+    """
+    km = np.asarray(km, dtype=np.float32)
+    best = np.full(km.shape, np.inf, dtype=np.float32)
+    choice = np.zeros(km.shape, dtype=np.int8)
+    fallback = np.full(km.shape, np.inf, dtype=np.float32)
+    fallback_choice = np.zeros(km.shape, dtype=np.int8)
+    for index, name in enumerate(modes):
+        mode = TRAVEL_MODES[name]
+        if mode.on_road and road_minutes is not None:
+            factor = AUTO_ROAD_FACTOR if name == 'auto' else 1.0
+            moving = np.where(np.isnan(road_minutes), km * mode.minutes_per_km, road_minutes * factor)
+        else:
+            moving = km * mode.minutes_per_km
+        minutes = (moving + mode.overhead_minutes).astype(np.float32)
+        if np.isfinite(mode.max_km):
+            faster = minutes < fallback
+            fallback[faster] = minutes[faster]
+            fallback_choice[faster] = index
+            minutes[km > mode.max_km] = np.inf
+        better = minutes < best
+        best[better] = minutes[better]
+        choice[better] = index
+    uncovered = np.isinf(best)
+    best[uncovered] = fallback[uncovered]
+    choice[uncovered] = fallback_choice[uncovered]
+    if zero_diagonal:
+        np.fill_diagonal(best, 0.0)
+    return best, choice
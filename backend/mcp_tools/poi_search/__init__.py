@@ -3,5 +3,11 @@ POI Search MCP Tool
 """
 from .implementation import POISearchMCP
 from .schema import POISearchInput, POISearchOutput, POI
+from .feature_table import POIFeatureTable
+from .scoring import RelevanceScorer
+from .name_index import POINameIndex, POI_NAME_ALIASES
 
-__all__ = ['POISearchMCP', 'POISearchInput', 'POISearchOutput', 'POI']
+__all__ = [
+    'POISearchMCP', 'POISearchInput', 'POISearchOutput', 'POI',
+    'POIFeatureTable', 'RelevanceScorer', 'POINameIndex', 'POI_NAME_ALIASES'
+]
@@ -0,0 +1,112 @@
+"""
+POI Search Cache
+Process-wide TTL + LRU cache of ranked search candidates, shared by planning and edits
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def make_search_key(
+    city: str,
+    interests: List[str],
+    constraints: Dict,
+    seed: Optional[int] = None,
+    source: str = "osm"
+) -> str:
+    """
+    Normalised cache key for a search
+
+    City is case/whitespace-insensitive, interests are order-insensitive and
+    constraints are serialised with sorted keys.
+    """
+    city_key = " ".join((city or "").lower().split())
+    interest_key = sorted({(i or "").strip().lower() for i in interests if i})
+    constraint_key = json.dumps(constraints or {}, sort_keys=True, default=str)
+    return json.dumps([source, city_key, interest_key, constraint_key, seed])
+
+
+class SearchCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and hit/miss statistics
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 900):
+        """
+        Args:
+            max_entries: Maximum number of cached searches (least recently used evicted first)
+            ttl_seconds: Lifetime of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached value or None (counts a hit or miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (stats are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+_shared_cache: Optional[SearchCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> SearchCache:
+    """Process-wide search cache (size/TTL from POI_CACHE_SIZE / POI_CACHE_TTL)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchCache(
+                max_entries=int(os.getenv("POI_CACHE_SIZE", "128")),
+                ttl_seconds=float(os.getenv("POI_CACHE_TTL", "900"))
+            )
+        return _shared_cache
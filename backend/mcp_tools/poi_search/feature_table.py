@@ -0,0 +1,306 @@
+"""
+POI Feature Table
+Derived POI features computed once at ingest and exposed as boolean NumPy
+masks, so constraint combinations resolve with vectorised ops instead of
+per-POI string scans
+"""
+import re
+from typing import List, Dict, Iterable, Optional
+import numpy as np
+
+from data_sources.poi_record import RawPOI, POIRecord
+from data_sources.popularity import popularity_prior, get_priors
+from mcp_tools.poi_search.opening_hours import parse_opening_hours, OpeningHoursIndex, Intervals
+
+# Interest -> OSM top-level categories
+INTEREST_CATEGORIES = {
+    'food': ['amenity'],
+    'culture': ['tourism', 'historic'],
+    'history': ['historic', 'tourism'],
+    'shopping': ['shop', 'amenity'],
+    'nature': ['leisure', 'natural'],
+    'religion': ['amenity'],
+    'architecture': ['historic', 'tourism'],
+    'entertainment': ['leisure', 'amenity'],
+    'sports': ['leisure', 'sport'],
+    'art': ['tourism', 'amenity']
+}
+
+# Duration estimates (minutes) by keyword; first match in subcategory or tags wins
+DURATION_BY_KEYWORD = {
+    'palace': 120,
+    'fort': 180,
+    'museum': 90,
+    'temple': 60,
+    'market': 120,
+    'park': 60,
+    'monument': 45,
+    'restaurant': 90,
+    'cafe': 30
+}
+DEFAULT_DURATION = 60
+
+# Subcategories that are indoors even without an explicit `indoor` tag
+INDOOR_SUBCATEGORIES = frozenset({
+    'museum', 'gallery', 'arts_centre', 'theatre', 'cinema', 'planetarium',
+    'aquarium', 'library', 'place_of_worship', 'mall', 'department_store',
+    'restaurant', 'cafe', 'food_court'
+})
+
+# Values of the OSM `indoor` tag that mark a POI as indoors (indoor=no marks it outdoors)
+INDOOR_TAG_VALUES = frozenset({'yes', 'room', 'area'})
+
+# Well-known POI names (curated/RAG) that rank higher when present
+CURATED_NAMES = frozenset({
+    "amer fort", "amber fort", "hawa mahal", "city palace", "nahargarh fort",
+    "jaigarh fort", "jal mahal", "jantar mantar", "albert hall museum",
+    "birla mandir", "galtaji temple", "johari bazaar", "bapu bazaar",
+    "chokhi dhani", "rambagh palace", "sisodia rani garden", "central park",
+    "ram niwas garden", "tripolia bazaar", "govind dev ji temple"
+})
+
+# Price levels: 0 free, 1 cheap, 2 moderate, 3 expensive (amount bounds in local currency)
+PRICE_LEVEL_BOUNDS = ((200, 1), (1000, 2))
+MAX_PRICE_LEVEL = 3
+_AMOUNT_RE = re.compile(r'(\d+(?:[.,]\d+)?)')
+
+# Duration classes: (name, upper bound exclusive)
+DURATION_CLASSES = (('short', 60), ('medium', 120), ('long', None))
+
+
+def _tag_text(poi: Dict) -> str:
+    """Lowercased tag dump (computed once per POI)."""
+    return str(poi.get('tags', {})).lower()
+
+
+def is_indoor(subcategory: str, tags: Dict) -> bool:
+    """Indoor from the `indoor` tag's value if set (yes/room/area vs no), else the (lowercased) subcategory."""
+    value = str(tags.get('indoor', '')).lower()
+    if value:
+        return value in INDOOR_TAG_VALUES
+    return subcategory in INDOOR_SUBCATEGORIES
+
+
+def estimate_duration(subcategory: str, tag_text: str) -> int:
+    """Estimate visit duration in minutes from subcategory and lowercased tag text."""
+    subcategory = subcategory.lower()
+    for key, duration in DURATION_BY_KEYWORD.items():
+        if key in subcategory or key in tag_text:
+            return duration
+    return DEFAULT_DURATION
+
+
+def price_level(tags: Dict) -> Optional[int]:
+    """
+    Price level from OSM fee/charge/price/stars tags (None if unknown)
+    
+    fee=no is free, a parsable charge/price amount is bucketed by
+    PRICE_LEVEL_BOUNDS, hotel stars map to moderate/expensive, and a bare
+    fee=yes counts as cheap.
+    """
+    fee = str(tags.get('fee', '')).strip().lower()
+    if fee == 'no':
+        return 0
+    for key in ('charge', 'price', 'fee'):
+        match = _AMOUNT_RE.search(str(tags.get(key, '')))
+        if match:
+            amount = float(match.group(1).replace(',', ''))
+            if amount == 0:
+                return 0
+            for bound, level in PRICE_LEVEL_BOUNDS:
+                if amount <= bound:
+                    return level
+            return MAX_PRICE_LEVEL
+    stars = _AMOUNT_RE.search(str(tags.get('stars', '')))
+    if stars:
+        return MAX_PRICE_LEVEL if float(stars.group(1)) >= 4 else 2
+    if fee == 'yes':
+        return 1
+    return None
+
+
+def duration_class(duration: int) -> str:
+    """Bucket a duration into short/medium/long."""
+    for name, upper in DURATION_CLASSES:
+        if upper is None or duration < upper:
+            return name
+    return DURATION_CLASSES[-1][0]
+
+
+class POIFeatureTable:
+    """
+    Column store of derived POI features.
+    Row i corresponds to pois[i]; each boolean feature is a read-only bool
+    array (mask) of length size, True where the POI has the feature.
+    Tables are built once per city candidate set and shared between searches.
+    """
+
+    def __init__(self, pois: List[RawPOI], priors: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            pois: Raw POIs
+            priors: POI ID -> popularity prior (defaults to the offline priors
+                from POI_POPULARITY_PATH; POIs without one are scored from their tags)
+        """
+        self.pois = pois
+        self.size = len(pois)
+        self.durations: List[int] = []
+        self.subcategory_codes: List[int] = []
+        self.subcategories: List[str] = []
+        self._subcategory_index: Dict[str, int] = {}
+        self._row_by_id: Dict[str, int] = {}
+        self._feature_rows: Dict[str, List[int]] = {}
+        self.opening_hours: List[Optional[Intervals]] = []
+        self._hours_index: Optional[OpeningHoursIndex] = None
+        self._records: Dict[int, POIRecord] = {}
+        priors = get_priors() if priors is None else priors
+        lats: List[float] = []
+        lons: List[float] = []
+        popularity: List[float] = []
+
+        for i, poi in enumerate(pois):
+            self._ingest(i, poi)
+            coords = poi.get('coordinates', {})
+            lats.append(float(coords.get('lat', 0.0)))
+            lons.append(float(coords.get('lon', 0.0)))
+            prior = priors.get(poi.get('id', ''))
+            popularity.append(popularity_prior(poi.get('tags', {})) if prior is None else prior)
+
+        self._masks: Dict[str, np.ndarray] = {}
+        for feature, rows in self._feature_rows.items():
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows] = True
+            mask.flags.writeable = False
+            self._masks[feature] = mask
+        self._feature_rows.clear()
+        self._empty = np.zeros(self.size, dtype=bool)
+        self._empty.flags.writeable = False
+
+        self.lat = np.array(lats, dtype=np.float64)
+        self.lon = np.array(lons, dtype=np.float64)
+        self.popularity = np.array(popularity, dtype=np.float64)
+
+    @classmethod
+    def from_pois(cls, pois: List[RawPOI], priors: Optional[Dict[str, float]] = None) -> 'POIFeatureTable':
+        return cls(pois, priors)
+
+    def _ingest(self, i: int, poi: RawPOI):
+        """Compute all features for one POI."""
+        tags = poi.get('tags', {}) or {}
+        tag_text = _tag_text(poi)
+        category = poi.get('category', '')
+        subcategory = (poi.get('subcategory') or '').lower()
+
+        self._row_by_id.setdefault(poi.get('id', ''), i)
+
+        duration = estimate_duration(subcategory, tag_text)
+        self.durations.append(duration)
+        self._set('duration:' + duration_class(duration), i)
+
+        code = self._subcategory_index.get(subcategory)
+        if code is None:
+            code = len(self.subcategories)
+            self._subcategory_index[subcategory] = code
+            self.subcategories.append(subcategory)
+        self.subcategory_codes.append(code)
+        self._set('subcategory:' + subcategory, i)
+        self._set('category:' + category, i)
+
+        if is_indoor(subcategory, tags):
+            self._set('indoor', i)
+        if str(tags.get('wheelchair', '')).lower() in ('yes', 'limited', 'designated'):
+            self._set('wheelchair', i)
+        if tags.get('opening_hours'):
+            self._set('opening_hours', i)
+        self.opening_hours.append(parse_opening_hours(tags.get('opening_hours')))
+        level = price_level(tags)
+        self._set('price:unknown' if level is None else f'price:{level}', i)
+        if tags.get('wikidata') or tags.get('wikipedia'):
+            self._set('wiki', i)
+        if (poi.get('name') or '').strip().lower() in CURATED_NAMES:
+            self._set('curated', i)
+
+        for interest, categories in INTEREST_CATEGORIES.items():
+            if category in categories:
+                self._set('interest:' + interest, i)
+
+    def _set(self, feature: str, row: int):
+        self._feature_rows.setdefault(feature, []).append(row)
+
+    @property
+    def all_mask(self) -> np.ndarray:
+        """Mask with every row set (a new, writable array)."""
+        return np.ones(self.size, dtype=bool)
+
+    def bitmap(self, feature: str) -> np.ndarray:
+        """Read-only mask for a feature (e.g. 'indoor', 'interest:food', 'category:tourism')."""
+        return self._masks.get(feature, self._empty)
+
+    def any_of(self, features: Iterable[str]) -> np.ndarray:
+        """OR of several feature masks (a new array)."""
+        mask = np.zeros(self.size, dtype=bool)
+        for feature in features:
+            mask |= self.bitmap(feature)
+        return mask
+
+    @property
+    def hours_index(self) -> OpeningHoursIndex:
+        """Opening-hours interval index (built on first use)."""
+        if self._hours_index is None:
+            self._hours_index = OpeningHoursIndex(self.opening_hours)
+        return self._hours_index
+
+    def within_budget(self, max_level: int) -> np.ndarray:
+        """Mask of POIs priced at or below max_level (unknown prices always pass)."""
+        return self.any_of(
+            ['price:unknown'] + [f'price:{level}' for level in range(max_level + 1)]
+        )
+
+    def features(self) -> List[str]:
+        """Names of all features with at least one POI."""
+        return sorted(self._masks)
+
+    @staticmethod
+    def indices(mask: np.ndarray) -> List[int]:
+        """Row indices set in a mask, in ascending order."""
+        return np.flatnonzero(mask).tolist()
+
+    def select(self, mask: np.ndarray) -> List[RawPOI]:
+        """POIs set in mask, in ingest order."""
+        return [self.pois[i] for i in self.indices(mask)]
+
+    @staticmethod
+    def count(mask: np.ndarray) -> int:
+        return int(np.count_nonzero(mask))
+
+    def row_of(self, poi_id: str) -> int:
+        """Row index for a POI ID (-1 if unknown)."""
+        return self._row_by_id.get(poi_id, -1)
+
+    def record(self, row: int) -> POIRecord:
+        """Search-result record for a row (built once, then shared; treat as read-only)."""
+        record = self._records.get(row)
+        if record is None:
+            poi = self.pois[row]
+            tags = poi.get('tags', {}) or {}
+            record = POIRecord(
+                id=poi['id'],
+                name=poi['name'],
+                category=poi['category'],
+                coordinates=poi['coordinates'],
+                estimatedDuration=self.durations[row],
+                openingHours=tags.get('opening_hours'),
+                source='osm',
+                metadata={
+                    'subcategory': poi.get('subcategory', ''),
+                    'tags': tags
+                }
+            )
+            self._records[row] = record
+        return record
+
+    def duration_of(self, row: int) -> int:
+        return self.durations[row]
+
+    def subcategory_of(self, row: int) -> str:
+        return self.subcategories[self.subcategory_codes[row]]
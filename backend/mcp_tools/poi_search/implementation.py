@@ -4,15 +4,55 @@ Searches OpenStreetMap for Points of Interest
 """
 import sys
 import os
-import random
+import json
+import base64
+import hashlib
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple
+import numpy as np
 
 # Add parent directories to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from data_sources.osm_client import OSMClient
-from mcp_tools.poi_search.schema import POISearchInput, POISearchOutput, POI
+from data_sources.osm_client import OSMClient, FALLBACK_SOURCE
+from data_sources.poi_record import POIRecord, POIRecordPage
+from data_sources.synthetic_city import SyntheticCity
+from mcp_tools.poi_search.schema import POISearchInput, POISearchOutput, POI, Budget
+from mcp_tools.poi_search.feature_table import POIFeatureTable, INTEREST_CATEGORIES
+from mcp_tools.poi_search.scoring import RelevanceScorer, haversine_km
+from mcp_tools.poi_search.opening_hours import resolve_time_window
+from mcp_tools.poi_search.name_index import POINameIndex, NAMED_LOOKUP_SCORE
+from mcp_tools.poi_search.cache import SearchCache, get_shared_cache, make_search_key
+
+# Budget -> highest acceptable POI price level (see feature_table.price_level)
+BUDGET_PRICE_LEVELS = {
+    Budget.LOW: 1,
+    Budget.MEDIUM: 2,
+    Budget.HIGH: 3
+}
+
+# Candidates fetched per search; callers page through them with cursors
+CANDIDATE_LIMIT = 200
+
+
+def _encode_cursor(key: str, offset: int) -> str:
+    """Opaque cursor: offset into the ranked candidates of the search identified by key"""
+    payload = json.dumps({"k": hashlib.sha1(key.encode()).hexdigest()[:16], "o": offset})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str, key: str) -> int:
+    """Offset encoded in a cursor; raises ValueError if it belongs to a different search"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        offset = int(payload["o"])
+        digest = payload["k"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if digest != hashlib.sha1(key.encode()).hexdigest()[:16] or offset < 0:
+        raise ValueError("Cursor does not belong to this search")
+    return offset
+
 
 class POISearchMCP:
     """
@@ -20,161 +60,287 @@ class POISearchMCP:
     Searches OpenStreetMap for Points of Interest based on city, interests, and constraints
     """
     
-    def __init__(self, use_mock: bool = False):
+    def __init__(
+        self,
+        use_mock: bool = False,
+        cache: Optional[SearchCache] = None,
+        synthetic: Optional[SyntheticCity] = None,
+        candidate_limit: int = CANDIDATE_LIMIT
+    ):
         """
         Initialize POI Search MCP
         
         Args:
             use_mock: If True, use mock data instead of real API (for testing)
+            cache: Search result cache (defaults to the process-wide shared cache)
+            synthetic: Generated city to search instead of OSM (benchmarks)
+            candidate_limit: Candidates fetched per search
         """
-        self.osm_client = OSMClient(use_mock=use_mock)
+        self.osm_client = OSMClient(use_mock=use_mock, synthetic=synthetic)
+        self.candidate_limit = candidate_limit
+        self.scorer = RelevanceScorer()
+        self.cache = cache if cache is not None else get_shared_cache()
     
     def search(
         self,
         input_data: POISearchInput
     ) -> POISearchOutput:
         """
-        Search for POIs
+        Search for POIs (MCP boundary: returns validated POI models)
+        
+        Args:
+            input_data: POISearchInput with city, interests, constraints
+        
+        Returns:
+            POISearchOutput with one page of ranked POIs; pass nextCursor back
+            as input_data.cursor to get the following page
+        """
+        page = self.search_records(input_data)
+        return POISearchOutput(
+            pois=[POI(**record) for record in page.pois],
+            totalFound=page.totalFound,
+            queryTime=datetime.now().isoformat(),
+            nextCursor=page.nextCursor
+        )
+    
+    def search_records(self, input_data: POISearchInput) -> POIRecordPage:
+        """
+        Search for POIs, returning plain typed records (in-process fast path)
+        
+        Records are shared with the search cache; callers must not mutate them.
         
         Args:
             input_data: POISearchInput with city, interests, constraints
         
         Returns:
-            POISearchOutput with ranked POIs
+            POIRecordPage with one page of ranked POI records
+        """
+        key = self._search_key(input_data)
+        offset = 0
+        if input_data.cursor:
+            offset = _decode_cursor(input_data.cursor, key)
+        
+        table, ranked_rows, scores = self._search_candidates(input_data, key)
+        ranked = list(zip(ranked_rows, scores))
+        
+        # Keep only POIs open during the requested day/block (unknown hours pass)
+        windows = resolve_time_window(input_data.timeWindow) if input_data.timeWindow else None
+        if windows is not None:
+            open_mask = table.hours_index.open_during_any(windows)
+            ranked = [(row, score) for row, score in ranked if open_mask[row]]
+        
+        page_end = offset + input_data.pageSize
+        return POIRecordPage(
+            pois=[self._scored_record(table, row, score) for row, score in ranked[offset:page_end]],
+            totalFound=len(ranked),
+            nextCursor=_encode_cursor(key, page_end) if page_end < len(ranked) else None
+        )
+    
+    @staticmethod
+    def _scored_record(table: POIFeatureTable, row: int, score: float) -> POIRecord:
+        """A row's record with this search's relevance score in its metadata (the shared record is not touched)"""
+        record = table.record(row)
+        return {**record, 'metadata': {**record['metadata'], 'relevance': round(score, 6)}}
+    
+    def _to_poi(self, table: POIFeatureTable, row: int) -> POI:
+        """Convert a feature-table row to the POI output schema"""
+        return POI(**table.record(row))
+    
+    def _search_key(self, input_data: POISearchInput) -> str:
+        """Cache key for the candidate set of a search (paging/time window excluded)"""
+        return make_search_key(
+            input_data.city, input_data.interests, input_data.constraints,
+            seed=input_data.seed,
+            source=f"{self.osm_client.source}:{self.candidate_limit}"
+        )
+    
+    def _search_candidates(
+        self,
+        input_data: POISearchInput,
+        key: Optional[str] = None
+    ) -> Tuple[POIFeatureTable, List[int], List[float]]:
+        """
+        Fetch, filter and rank candidates, memoised in the shared search cache
+        
+        Returns:
+            (feature table, ranked row indices, their relevance scores)
         """
         city = input_data.city
         interests = input_data.interests
         constraints = input_data.constraints
         
-        # Map interests to OSM categories
-        category_mapping = {
-            'food': ['amenity'],
-            'culture': ['tourism', 'historic'],
-            'history': ['historic', 'tourism'],
-            'shopping': ['shop', 'amenity'],
-            'nature': ['leisure', 'natural'],
-            'religion': ['amenity'],
-            'architecture': ['historic', 'tourism'],
-            'entertainment': ['leisure', 'amenity'],
-            'sports': ['leisure', 'sport'],
-            'art': ['tourism', 'amenity']
-        }
-        
-        # Get categories to search
-        categories_to_search = []
+        key = key or self._search_key(input_data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Candidates and their features, shared by every search over the same set
+        table = self._feature_table(city, self.search_categories(interests))
+        
+        # Reference point for maxDistance and the ranking distance term
+        reference = self._reference_point(city, constraints)
+        
+        # Filter by constraints (fall back to unfiltered only if constraints remove everything)
+        mask = self._apply_constraints(table, constraints, reference)
+        if not mask.any():
+            mask = table.all_mask
+        
+        # Rank POIs (deterministic unless a seed is given)
+        ranked_rows, scores = self._rank_pois(table, table.indices(mask), interests, input_data.seed, reference)
+        
+        if not self._is_fallback(table):
+            self.cache.put(key, (table, ranked_rows, scores))
+        return table, ranked_rows, scores
+    
+    @staticmethod
+    def search_categories(interests: List[str]) -> List[str]:
+        """OSM categories fetched for a set of interests (sorted; searches with the same ones share candidates)"""
+        categories = set()
         for interest in interests:
-            if interest.lower() in category_mapping:
-                categories_to_search.extend(category_mapping[interest.lower()])
+            categories.update(INTEREST_CATEGORIES.get(interest.lower(), ()))
+        # Default categories if no mapping found
+        return sorted(categories) if categories else ['amenity', 'historic', 'tourism']
+    
+    def _feature_table(self, city: str, categories: List[str]) -> POIFeatureTable:
+        """
+        Feature table of a city's candidates in the given OSM categories,
+        fetched and built once, then memoised in the search cache (constraints,
+        seeds and paging only select and rank its rows). Mock data served
+        because Overpass failed is never cached, so the next search retries.
+        """
+        key = "table:" + make_search_key(city, categories, {}, source=f"{self.osm_client.source}:{self.candidate_limit}")
+        table = self.cache.get(key)
+        if table is None:
+            pois_raw = self.osm_client.search_pois(city=city, categories=categories, limit=self.candidate_limit)
+            table = POIFeatureTable.from_pois(pois_raw)
+            if not self._is_fallback(table):
+                self.cache.put(key, table)
+        return table
+    
+    @staticmethod
+    def _is_fallback(table: POIFeatureTable) -> bool:
+        """True if any of the table's POIs are mock stand-ins for a failed Overpass search"""
+        return any(poi.get('source') == FALLBACK_SOURCE for poi in table.pois)
+    
+    def suggest(self, city: str, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Autocomplete POI names in a city
         
-        # Remove duplicates
-        categories_to_search = list(set(categories_to_search))
+        The name index is built once per city from the city's full candidate set
+        and kept in the search cache, so repeat lookups are pure in-memory work.
         
-        if not categories_to_search:
-            # Default categories if no mapping found
-            categories_to_search = ['tourism', 'amenity', 'historic']
+        Args:
+            city: City name
+            query: Partial or spoken POI name
+            limit: Maximum number of suggestions
         
-        # Search OSM
-        pois_raw = self.osm_client.search_pois(
-            city=city,
-            categories=categories_to_search,
-            limit=50
-        )
+        Returns:
+            [{id, name, category, score}] best first
+        """
+        _, _, index = self._name_index(city)
+        return index.suggest(query, limit=limit)
+    
+    def find_by_name(self, city: str, name: str, exclude: Iterable[str] = ()) -> Optional[POI]:
+        """
+        Resolve a spoken/typed POI name (e.g. "Albert Hall") to a POI in the city
         
-        # Filter by constraints (fall back to unfiltered only if constraints remove everything)
-        filtered_pois = self._apply_constraints(pois_raw, constraints)
-        if not filtered_pois and pois_raw:
-            filtered_pois = pois_raw
-        
-        # Rank POIs (prefer known names for better RAG match, then shuffle for variety)
-        ranked_pois = self._rank_pois(filtered_pois, interests, city)
-        
-        # Convert to POI schema
-        pois = []
-        for poi_data in ranked_pois[:40]:  # Return more POIs for variety
-            poi = POI(
-                id=poi_data['id'],
-                name=poi_data['name'],
-                category=poi_data['category'],
-                coordinates=poi_data['coordinates'],
-                estimatedDuration=self._estimate_duration(poi_data),
-                openingHours=poi_data.get('tags', {}).get('opening_hours'),
-                source='osm',
-                metadata={
-                    'subcategory': poi_data.get('subcategory', ''),
-                    'tags': poi_data.get('tags', {})
-                }
-            )
-            pois.append(poi)
+        Only exact name or alias matches count, so a generic word ("museum",
+        "palace") never resolves to one specific landmark.
         
-        return POISearchOutput(
-            pois=pois,
-            totalFound=len(ranked_pois),
-            queryTime=datetime.now().isoformat()
-        )
+        Args:
+            exclude: POI IDs to skip (e.g. already in the itinerary)
+        
+        Returns:
+            Best match or None
+        """
+        table, ranked_rows, index = self._name_index(city)
+        match = index.lookup(name, min_score=NAMED_LOOKUP_SCORE, exclude=exclude)
+        if match is None:
+            return None
+        return self._to_poi(table, ranked_rows[match["row"]])
     
-    def _apply_constraints(self, pois: List[Dict], constraints: Dict) -> List[Dict]:
-        """Apply constraints to filter POIs"""
-        filtered = pois
+    def _name_index(self, city: str) -> Tuple[POIFeatureTable, List[int], POINameIndex]:
+        """Per-city name index over all candidates (memoised in the search cache)"""
+        input_data = POISearchInput(city=city, interests=[], constraints={})
+        key = 'names:' + self._search_key(input_data)
+        entry = self.cache.get(key)
+        if entry is None:
+            table, ranked_rows, _ = self._search_candidates(input_data)
+            index = POINameIndex([table.pois[row] for row in ranked_rows])
+            entry = (table, ranked_rows, index)
+            if not self._is_fallback(table):
+                self.cache.put(key, entry)
+        return entry
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics of the search cache"""
+        return self.cache.stats()
+    
+    def _reference_point(self, city: str, constraints: Dict) -> Optional[Dict]:
+        """Hotel coordinates from constraints, else the geocoded city centre (None if neither)"""
+        hotel = constraints.get('hotel')
+        if isinstance(hotel, dict) and hotel.get('lat') is not None and hotel.get('lon') is not None:
+            return {'lat': float(hotel['lat']), 'lon': float(hotel['lon'])}
+        return self.osm_client.get_city_center(city)
+    
+    def _apply_constraints(
+        self,
+        table: POIFeatureTable,
+        constraints: Dict,
+        reference: Optional[Dict] = None
+    ) -> np.ndarray:
+        """Apply constraints; returns a mask of the POIs that pass"""
+        mask = table.all_mask
+        
+        # Spatial prefilter: one vectorised distance pass over all candidates
+        max_distance = constraints.get('maxDistance')
+        if max_distance and table.size:
+            if reference:
+                ref_lat, ref_lon = reference['lat'], reference['lon']
+            else:
+                ref_lat, ref_lon = float(np.median(table.lat)), float(np.median(table.lon))
+            distances = haversine_km(table.lat, table.lon, ref_lat, ref_lon)
+            mask &= distances <= float(max_distance)
+        
+        # Filter by budget (OSM fee/charge/price tags; unknown prices pass)
+        budget = constraints.get('budget')
+        if budget:
+            try:
+                level = BUDGET_PRICE_LEVELS[Budget(str(budget).lower())]
+                mask &= table.within_budget(level)
+            except ValueError:
+                pass
         
         # Filter by indoor/outdoor
         if constraints.get('indoorOnly'):
-            # This is a simple heuristic - in real implementation, would check tags
-            filtered = [p for p in filtered if 'indoor' in str(p.get('tags', {})).lower()]
+            mask &= table.bitmap('indoor')
         
         # Filter by accessibility (if specified)
         if constraints.get('accessibility'):
-            # Check for wheelchair accessible tags
-            filtered = [p for p in filtered if 'wheelchair' in str(p.get('tags', {})).lower()]
-        
-        return filtered
-    
-    # Well-known POI names (curated/RAG) to rank higher when present
-    _PREFERRED_NAMES = frozenset({
-        "amer fort", "amber fort", "hawa mahal", "city palace", "nahargarh fort",
-        "jaigarh fort", "jal mahal", "jantar mantar", "albert hall museum",
-        "birla mandir", "galtaji temple", "johari bazaar", "bapu bazaar",
-        "chokhi dhani", "rambagh palace", "sisodia rani garden", "central park",
-        "ram niwas garden", "tripolia bazaar", "govind dev ji temple"
-    })
-    
-    def _rank_pois(self, pois: List[Dict], interests: List[str], city: str = "") -> List[Dict]:
-        """Rank: prefer known POI names (better RAG match), then shuffle for variety."""
-        preferred = []
-        rest = []
-        for p in pois:
-            name = (p.get("name") or "").strip().lower()
-            if name in self._PREFERRED_NAMES:
-                preferred.append(p)
-            else:
-                rest.append(p)
-        random.shuffle(preferred)
-        random.shuffle(rest)
-        return preferred + rest
-    
-    def _estimate_duration(self, poi_data: Dict) -> int:
-        """Estimate visit duration in minutes"""
-        category = poi_data.get('category', '')
-        subcategory = poi_data.get('subcategory', '')
-        
-        # Duration estimates based on category
-        duration_map = {
-            'palace': 120,
-            'fort': 180,
-            'museum': 90,
-            'temple': 60,
-            'market': 120,
-            'park': 60,
-            'monument': 45,
-            'restaurant': 90,
-            'cafe': 30
-        }
-        
-        for key, duration in duration_map.items():
-            if key in subcategory.lower() or key in str(poi_data.get('tags', {})).lower():
-                return duration
-        
-        # Default duration
-        return 60
+            mask &= table.bitmap('wheelchair')
+        
+        # Filter by OSM category or subcategory (e.g. 'historic', 'museum')
+        wanted = constraints.get('category')
+        if wanted:
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            names = [w.lower() for w in wanted]
+            mask &= table.any_of(
+                [f'category:{n}' for n in names] + [f'subcategory:{n}' for n in names]
+            )
+        
+        return mask
+    
+    def _rank_pois(
+        self,
+        table: POIFeatureTable,
+        rows: List[int],
+        interests: List[str],
+        seed: Optional[int] = None,
+        reference: Optional[Dict] = None
+    ) -> Tuple[List[int], List[float]]:
+        """Rank by weighted relevance score (interests, popularity prior, curated names, distance, hours); returns (rows, scores)."""
+        return self.scorer.rank(table, rows, interests, center=reference, seed=seed)
 
 
 # Test function
@@ -0,0 +1,217 @@
+"""
+POI Name Index
+In-memory prefix trie + trigram index over POI names, name:en/alt_name variants
+and curated aliases, for autocomplete and voice-edit name lookup
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+# POI name aliases: OSM / display names -> RAG canonical names (for better RAG matching)
+POI_NAME_ALIASES = {
+    "amber fort": "Amer Fort",
+    "amer fort": "Amer Fort",
+    "palace of winds": "Hawa Mahal",
+    "hawa mahal": "Hawa Mahal",
+    "city palace": "City Palace",
+    "jantar mantar": "Jantar Mantar",
+    "jal mahal": "Jal Mahal",
+    "water palace": "Jal Mahal",
+    "nahargarh": "Nahargarh Fort",
+    "nahargarh fort": "Nahargarh Fort",
+    "jaigarh": "Jaigarh Fort",
+    "jaigarh fort": "Jaigarh Fort",
+    "albert hall": "Albert Hall Museum",
+    "albert hall museum": "Albert Hall Museum",
+    "birla mandir": "Birla Mandir",
+    "lakshmi narayan temple": "Birla Mandir",
+    "galtaji": "Galtaji Temple",
+    "galtaji temple": "Galtaji Temple",
+    "monkey temple": "Galtaji Temple",
+    "govind dev ji": "Govind Dev Ji Temple",
+    "govind dev ji temple": "Govind Dev Ji Temple",
+    "johari bazaar": "Johari Bazaar",
+    "johari bazar": "Johari Bazaar",
+    "bapu bazaar": "Bapu Bazaar",
+    "bapu bazar": "Bapu Bazaar",
+    "tripolia bazaar": "Tripolia Bazaar",
+    "tripolia bazar": "Tripolia Bazaar",
+    "chokhi dhani": "Chokhi Dhani",
+    "rambagh palace": "Rambagh Palace",
+    "sisodia rani garden": "Sisodia Rani Garden",
+    "sisodia rani": "Sisodia Rani Garden",
+    "central park": "Central Park",
+    "ram niwas garden": "Ram Niwas Garden",
+    "ram niwas": "Ram Niwas Garden",
+    "laxmi mishthan bhandar": "Jaipur Food Guide",
+    "lmb": "Jaipur Food Guide",
+    "rawat mishthan": "Jaipur Food Guide",
+}
+
+# Tags holding alternative names
+NAME_TAGS = ('name', 'name:en', 'alt_name', 'old_name', 'short_name', 'official_name')
+
+# Match scores (trigram similarity is in [0, 1])
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+WORD_PREFIX_SCORE = 1.5
+
+# Minimum trigram similarity for a fuzzy suggestion / a confident lookup
+MIN_TRIGRAM_SIMILARITY = 0.3
+MIN_LOOKUP_SCORE = 0.6
+
+# Lookups that act on a POI (voice edits) need an exact name or alias match:
+# a single generic word ("palace") prefix-matches specific landmarks
+NAMED_LOOKUP_SCORE = EXACT_SCORE
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM_RE.sub(' ', text).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Padded character trigrams of a normalised string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ('children', 'rows')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.rows: Set[int] = set()
+
+
+class POINameIndex:
+    """
+    Name lookup over a list of POIs.
+    Every variant (name, name:en, alt names, aliases) is inserted into a trie
+    whose nodes hold the rows reachable below them, so a prefix query is one
+    walk of len(query) steps; each word suffix is inserted too so "hall"
+    finds "Albert Hall Museum". A trigram index catches misspellings.
+    Rows keep the order of the input list, which breaks ties.
+    """
+
+    def __init__(self, pois: List[Dict], aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pois: POI dicts (ideally in ranked order)
+            aliases: alias -> canonical name map (defaults to POI_NAME_ALIASES)
+        """
+        self.pois = pois
+        aliases = POI_NAME_ALIASES if aliases is None else aliases
+        self._root = _TrieNode()
+        self._full: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._variants: List[List[str]] = []
+
+        # canonical (normalised) -> aliases (normalised)
+        alias_groups: Dict[str, Set[str]] = {}
+        for alias, canonical in aliases.items():
+            group = alias_groups.setdefault(normalize_name(canonical), set())
+            group.add(normalize_name(alias))
+
+        for row, poi in enumerate(pois):
+            variants = set()
+            tags = poi.get('tags', {}) or {}
+            for raw in [poi.get('name', '')] + [tags.get(t, '') for t in NAME_TAGS]:
+                for part in str(raw or '').split(';'):
+                    if normalize_name(part):
+                        variants.add(normalize_name(part))
+            for variant in list(variants):
+                canonical = normalize_name(aliases.get(variant, ''))
+                if canonical:
+                    variants.add(canonical)
+                    variants |= alias_groups.get(canonical, set())
+                variants |= alias_groups.get(variant, set())
+            self._variants.append(sorted(variants))
+            for variant in variants:
+                self._add(variant, row)
+
+    def _add(self, variant: str, row: int):
+        self._full.setdefault(variant, set()).add(row)
+        words = variant.split()
+        for start in range(len(words)):
+            node = self._root
+            for ch in ' '.join(words[start:]):
+                node = node.children.setdefault(ch, _TrieNode())
+                node.rows.add(row)
+        for gram in trigrams(variant):
+            self._trigrams.setdefault(gram, set()).add(row)
+
+    def _prefix_rows(self, prefix: str) -> Set[int]:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.rows
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Ranked name matches for a (partial) query
+
+        Returns:
+            [{id, name, category, score, row}] best first (row indexes the input list)
+        """
+        q = normalize_name(query)
+        if not q:
+            return []
+        scores: Dict[int, float] = {}
+
+        def bump(rows, score):
+            for row in rows:
+                if score > scores.get(row, 0.0):
+                    scores[row] = score
+
+        bump(self._full.get(q, ()), EXACT_SCORE)
+        for row in self._prefix_rows(q):
+            whole = any(v.startswith(q) for v in self._variants[row])
+            bump((row,), PREFIX_SCORE if whole else WORD_PREFIX_SCORE)
+
+        if len(scores) < limit:
+            q_grams = trigrams(q)
+            counts: Dict[int, int] = {}
+            for gram in q_grams:
+                for row in self._trigrams.get(gram, ()):
+                    counts[row] = counts.get(row, 0) + 1
+            for row, common in counts.items():
+                similarity = common / len(q_grams)
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    bump((row,), similarity)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {
+                "id": self.pois[row].get('id'),
+                "name": self.pois[row].get('name'),
+                "category": self.pois[row].get('category', ''),
+                "score": round(score, 3),
+                "row": row
+            }
+            for row, score in ranked
+        ]
+
+    def lookup(
+        self,
+        name: str,
+        min_score: float = MIN_LOOKUP_SCORE,
+        exclude: Iterable[str] = ()
+    ) -> Optional[Dict]:
+        """
+        Best match for a spoken/typed POI name, or None if nothing matches
+        confidently (POIs whose id is in exclude are skipped)
+        """
+        exclude = set(exclude)
+        for match in self.suggest(name, limit=len(exclude) + 1):
+            if match["score"] < min_score:
+                break
+            if match["id"] not in exclude:
+                return match
+        return None
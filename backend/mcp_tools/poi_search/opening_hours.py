@@ -0,0 +1,265 @@
+"""
+Opening Hours
+Compiles OSM `opening_hours` strings into weekly interval sets and indexes them
+so "which POIs are open during this window" resolves with a bisect and a few
+bitmap ANDs
+"""
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+DAYS = ('mo', 'tu', 'we', 'th', 'fr', 'sa', 'su')
+
+# Block hours used by the planner's time windows (minutes from midnight)
+BLOCK_HOURS = {
+    'morning': (9 * 60, 12 * 60),
+    'afternoon': (13 * 60, 17 * 60),
+    'evening': (18 * 60, 21 * 60)
+}
+
+# Approximation used for sunrise/sunset events
+SUNRISE = 6 * 60
+SUNSET = 18 * 60
+
+Intervals = Tuple[Tuple[int, int], ...]
+
+_DAY_RANGE_RE = re.compile(r'\b(mo|tu|we|th|fr|sa|su)\b(?:\[[^\]]*\])?(?:\s*-\s*\b(mo|tu|we|th|fr|sa|su)\b)?')
+_TIME_RE = r'(\d{1,2}):(\d{2})|(sunrise)|(sunset)'
+_TIME_RANGE_RE = re.compile(rf'(?:{_TIME_RE})\s*-\s*(?:{_TIME_RE})\+?')
+_HOLIDAY_RE = re.compile(r'\b(ph|sh)\b')
+_CLOCK_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})(?::\d{2})?\s*$')
+
+
+def _to_minutes(hour, minute, sunrise, sunset) -> int:
+    if sunrise:
+        return SUNRISE
+    if sunset:
+        return SUNSET
+    return int(hour) * 60 + int(minute)
+
+
+def _parse_days(rule: str) -> Optional[List[int]]:
+    """Weekdays selected by a rule (None if the rule has no weekday selector)."""
+    days = []
+    for match in _DAY_RANGE_RE.finditer(rule):
+        first = DAYS.index(match.group(1))
+        last = DAYS.index(match.group(2)) if match.group(2) else first
+        day = first
+        while True:
+            if day not in days:
+                days.append(day)
+            if day == last:
+                break
+            day = (day + 1) % 7
+    return days or None
+
+
+def _parse_times(rule: str) -> List[Tuple[int, int]]:
+    """Daily time ranges of a rule as (start, end) minutes; end may exceed 24:00."""
+    ranges = []
+    for m in _TIME_RANGE_RE.finditer(rule):
+        start = _to_minutes(m.group(1), m.group(2), m.group(3), m.group(4))
+        end = _to_minutes(m.group(5), m.group(6), m.group(7), m.group(8))
+        if end <= start:
+            end += DAY_MINUTES  # Wraps past midnight
+        ranges.append((start, end))
+    return ranges
+
+
+def _merge(intervals: List[Tuple[int, int]]) -> Intervals:
+    """Sort and merge overlapping/touching intervals."""
+    merged: List[List[int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return tuple((s, e) for s, e in merged)
+
+
+@lru_cache(maxsize=4096)
+def parse_opening_hours(value: Optional[str]) -> Optional[Intervals]:
+    """
+    Compile an OSM opening_hours string into weekly intervals
+
+    Supports the common subset: `24/7`, weekday ranges/lists (`Mo-Fr`, `Sa,Su`),
+    comma-separated time ranges, ranges past midnight, `sunrise`/`sunset`
+    (approximated), `off`/`closed`, and later rules overriding earlier ones.
+    Holiday-only rules (PH/SH) are ignored.
+
+    Args:
+        value: Raw opening_hours tag value
+
+    Returns:
+        Sorted, merged (start, end) tuples in minutes from Monday 00:00,
+        or None if the value is missing or could not be understood
+    """
+    if not value:
+        return None
+    text = value.strip().lower()
+    if text == '24/7':
+        return ((0, WEEK_MINUTES),)
+
+    per_day: List[Optional[List[Tuple[int, int]]]] = [None] * 7
+    understood = False
+    for rule in re.split(r';|\|\|', text):
+        rule = rule.strip()
+        if not rule:
+            continue
+        days = _parse_days(rule)
+        if days is None and _HOLIDAY_RE.search(rule):
+            continue  # Holiday-only rule
+        closed = bool(re.search(r'\b(off|closed)\b', rule))
+        times = [] if closed else _parse_times(rule)
+        if '24/7' in rule:
+            times = [(0, DAY_MINUTES)]
+        if not closed and not times:
+            continue
+        understood = True
+        for day in (days if days is not None else range(7)):
+            per_day[day] = list(times)  # Later rules override earlier ones
+
+    if not understood:
+        return None
+
+    intervals = []
+    for day, times in enumerate(per_day):
+        for start, end in times or []:
+            start += day * DAY_MINUTES
+            end += day * DAY_MINUTES
+            if end > WEEK_MINUTES:
+                # Sunday night spilling into Monday morning
+                intervals.append((start, WEEK_MINUTES))
+                intervals.append((0, end - WEEK_MINUTES))
+            else:
+                intervals.append((start, end))
+    return _merge(intervals)
+
+
+def is_open(intervals: Optional[Intervals], start: int, end: int) -> bool:
+    """True if [start, end) (week minutes) lies inside one opening interval; unknown hours count as open."""
+    if intervals is None:
+        return True
+    i = bisect_right(intervals, (start, WEEK_MINUTES + 1)) - 1
+    return i >= 0 and intervals[i][0] <= start and end <= intervals[i][1]
+
+
+def _clock_minutes(value) -> int:
+    """Minutes from midnight for an 'HH:MM' string (24:00 allowed); ValueError if malformed."""
+    match = _CLOCK_RE.match(str(value))
+    if not match:
+        raise ValueError(f"expected HH:MM, got {value!r}")
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if minute >= 60 or hour * 60 + minute > DAY_MINUTES:
+        raise ValueError(f"not a time of day: {value!r}")
+    return hour * 60 + minute
+
+
+def resolve_time_window(time_window: Dict) -> Optional[List[Tuple[int, int]]]:
+    """
+    Turn a POISearchInput.timeWindow into week-minute windows
+
+    Accepts {block, start?, end?, date?, weekday?, day?}. The weekday comes from
+    `date` (ISO8601) or `weekday` (0-6 or 'mo'..'su'); trip day numbers alone do
+    not fix a weekday, so every weekday is returned and callers OR the results.
+    An end before the start runs past midnight into the next day (Sunday night
+    windows end past WEEK_MINUTES; OpeningHoursIndex wraps them into Monday).
+
+    Returns:
+        Windows as (start, end) week minutes, or None (no time filter, with a
+        warning) if the window is malformed
+    """
+    try:
+        block = (time_window.get('block') or '').lower()
+        start, end = BLOCK_HOURS.get(block, (0, DAY_MINUTES))
+        if time_window.get('start') and time_window.get('end'):
+            start, end = _clock_minutes(time_window['start']), _clock_minutes(time_window['end'])
+            if start == end:
+                raise ValueError(f"empty window {time_window['start']}-{time_window['end']}")
+            if end < start:
+                end += DAY_MINUTES
+
+        weekday = None
+        if time_window.get('date'):
+            weekday = datetime.fromisoformat(str(time_window['date'])).weekday()
+        elif time_window.get('weekday') is not None:
+            raw = time_window['weekday']
+            weekday = DAYS.index(str(raw).lower()[:2]) if isinstance(raw, str) else int(raw) % 7
+    except (TypeError, ValueError) as e:
+        print(f"   ⚠️  Ignoring invalid timeWindow {time_window}: {e}")
+        return None
+
+    days = [weekday] if weekday is not None else range(7)
+    return [(d * DAY_MINUTES + start, d * DAY_MINUTES + end) for d in days]
+
+
+class OpeningHoursIndex:
+    """
+    Weekly interval index over a set of POIs.
+    The week is cut into elementary segments at every opening/closing boundary;
+    each segment stores a bitmap of POIs open throughout it. A window query
+    bisects to its first segment and ANDs the bitmaps of the segments it spans,
+    so its cost does not grow with the number of POIs; masks come back as
+    boolean arrays over rows. POIs with unknown hours are always reported open.
+    """
+
+    def __init__(self, hours: List[Optional[Intervals]]):
+        """
+        Args:
+            hours: Parsed intervals per POI row (None = unknown)
+        """
+        self.size = len(hours)
+        self.unknown = 0
+        events: Dict[int, int] = {}  # boundary -> XOR of rows toggled there
+        for row, intervals in enumerate(hours):
+            bit = 1 << row
+            if intervals is None:
+                self.unknown |= bit
+                continue
+            for start, end in intervals:
+                events[start] = events.get(start, 0) ^ bit
+                events[end] = events.get(end, 0) ^ bit
+
+        self.boundaries: List[int] = sorted(set(events) | {0, WEEK_MINUTES})
+        self.segments: List[int] = []
+        current = 0
+        for boundary in self.boundaries[:-1]:
+            current ^= events.get(boundary, 0)
+            self.segments.append(current)
+
+    def _bitmap(self, start: int, end: int) -> int:
+        """Bitmap of POIs with known hours open for the whole [start, end) window."""
+        if end > WEEK_MINUTES:
+            # Sunday night into Monday: both parts must be open
+            return self._bitmap(start, WEEK_MINUTES) & self._bitmap(0, end - WEEK_MINUTES)
+        if end <= start:
+            return 0
+        first = bisect_right(self.boundaries, start) - 1
+        last = bisect_left(self.boundaries, end)
+        mask = -1
+        for segment in self.segments[max(first, 0):last]:
+            mask &= segment
+            if not mask:
+                break
+        return mask if mask != -1 else 0
+
+    def _mask(self, bitmap: int) -> np.ndarray:
+        """Boolean row mask for a bitmap (unknown hours included)."""
+        raw = (bitmap | self.unknown).to_bytes((self.size + 7) // 8, 'little')
+        return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little')[:self.size].astype(bool)
+
+    def open_during(self, start: int, end: int) -> np.ndarray:
+        """Mask of POIs open for the whole [start, end) window (week minutes)."""
+        return self._mask(self._bitmap(start, end))
+
+    def open_during_any(self, windows: List[Tuple[int, int]]) -> np.ndarray:
+        """Mask of POIs open for the whole of at least one window."""
+        bitmap = 0
+        for start, end in windows:
+            bitmap |= self._bitmap(start, end)
+        return self._mask(bitmap)
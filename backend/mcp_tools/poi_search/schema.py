@@ -18,11 +18,20 @@ class POISearchInput(BaseModel):
     interests: List[str] = Field(..., max_items=10, description="List of interests (e.g., ['food', 'culture', 'history'])")
     constraints: Dict = Field(
         default_factory=dict,
-        description="Constraints: maxDistance (km), accessibility (bool), budget (low/medium/high), indoorOnly (bool)"
+        description="Constraints: maxDistance (km from hotel or city centre), hotel ({lat, lon}), accessibility (bool), budget (low/medium/high), indoorOnly (bool), category (str or list of OSM categories/subcategories)"
     )
     timeWindow: Optional[Dict] = Field(
         None,
-        description="Optional time window: {day: int, block: 'morning'|'afternoon'|'evening'}"
+        description="Optional time window: {day: int, block: 'morning'|'afternoon'|'evening', date?: ISO8601, weekday?: 0-6, start?: 'HH:MM', end?: 'HH:MM' (an end before the start runs past midnight)}; only POIs open throughout it are returned"
+    )
+    seed: Optional[int] = Field(
+        None,
+        description="Optional seed for the ranking diversity term; omit for fully deterministic ranking"
+    )
+    pageSize: int = Field(40, ge=1, le=200, description="Number of POIs per page")
+    cursor: Optional[str] = Field(
+        None,
+        description="Cursor from a previous POISearchOutput.nextCursor to fetch the next page"
     )
 
 class POI(BaseModel):
@@ -41,3 +50,4 @@ class POISearchOutput(BaseModel):
     pois: List[POI] = Field(..., description="List of POIs")
     totalFound: int = Field(..., description="Total number of POIs found")
     queryTime: str = Field(..., description="Query timestamp in ISO8601 format")
+    nextCursor: Optional[str] = Field(None, description="Cursor for the next page (None on the last page)")
@@ -0,0 +1,157 @@
+"""
+POI Relevance Scoring
+Weighted, vectorised relevance score over a candidate set with a stable top-k
+"""
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+from mcp_tools.poi_search.feature_table import POIFeatureTable
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Weight per score component
+DEFAULT_WEIGHTS = {
+    'interest': 3.0,       # share of requested interests the POI's category serves
+    'popularity': 2.5,     # offline popularity prior (wiki/heritage/attraction tags, sitelinks)
+    'curated': 1.0,        # known/curated name (better RAG grounding)
+    'distance': 1.5,       # closeness to the city centre / candidate cluster
+    'opening_hours': 0.5,  # opening hours known
+    'diversity': 0.75      # seeded random jitter (only applied when a seed is given)
+}
+
+# Distance at which the distance component halves (km)
+DISTANCE_SCALE_KM = 5.0
+
+
+def haversine_km(lat: np.ndarray, lon: np.ndarray, ref_lat: float, ref_lon: float) -> np.ndarray:
+    """Great-circle distance (km) from every (lat, lon) to a reference point."""
+    lat_r = np.radians(lat)
+    ref_lat_r = np.radians(ref_lat)
+    dlat = lat_r - ref_lat_r
+    dlon = np.radians(lon - ref_lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_r) * np.cos(ref_lat_r) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class RelevanceScorer:
+    """
+    Scores candidate POIs with a weighted sum of per-POI features.
+    Without a seed the ranking is fully deterministic; with a seed a bounded
+    diversity term reshuffles near-ties reproducibly.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+
+    def score(
+        self,
+        table: POIFeatureTable,
+        rows: List[int],
+        interests: List[str],
+        center: Optional[Dict] = None,
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Score the given rows of a feature table
+
+        Args:
+            table: POI feature table
+            rows: Candidate row indices
+            interests: User interests
+            center: Optional reference point {lat, lon}; defaults to the candidates' median
+            seed: Optional seed for the diversity term
+
+        Returns:
+            Score per row (same order as rows)
+        """
+        idx = np.asarray(rows, dtype=np.int64)
+        if idx.size == 0:
+            return np.zeros(0)
+        w = self.weights
+
+        # Interest match: fraction of requested interests served
+        wanted = [i.lower() for i in interests if i]
+        if wanted:
+            matched = np.zeros(table.size)
+            for interest in wanted:
+                matched += table.bitmap('interest:' + interest)
+            interest = matched[idx] / len(wanted)
+        else:
+            interest = np.zeros(idx.size)
+
+        curated = table.bitmap('curated')[idx]
+        popularity = table.popularity[idx]
+        hours = table.bitmap('opening_hours')[idx]
+
+        lat = table.lat[idx]
+        lon = table.lon[idx]
+        if center and center.get('lat') is not None and center.get('lon') is not None:
+            ref_lat, ref_lon = float(center['lat']), float(center['lon'])
+        else:
+            ref_lat, ref_lon = float(np.median(lat)), float(np.median(lon))
+        closeness = 1.0 / (1.0 + haversine_km(lat, lon, ref_lat, ref_lon) / DISTANCE_SCALE_KM)
+
+        scores = (
+            w['interest'] * interest
+            + w['popularity'] * popularity
+            + w['curated'] * curated
+            + w['distance'] * closeness
+            + w['opening_hours'] * hours
+        )
+
+        if seed is not None and w['diversity']:
+            rng = np.random.default_rng(seed)
+            scores = scores + w['diversity'] * rng.random(idx.size)
+
+        return scores
+
+    def top_k(
+        self,
+        table: POIFeatureTable,
+        rows: List[int],
+        interests: List[str],
+        k: Optional[int] = None,
+        center: Optional[Dict] = None,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        Rank rows by score (ties broken by row index) and return the best k
+
+        Returns:
+            Row indices, best first
+        """
+        return self.rank(table, rows, interests, k=k, center=center, seed=seed)[0]
+
+    def rank(
+        self,
+        table: POIFeatureTable,
+        rows: List[int],
+        interests: List[str],
+        k: Optional[int] = None,
+        center: Optional[Dict] = None,
+        seed: Optional[int] = None
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Same ranking as top_k, with the scores
+
+        Returns:
+            (row indices best first, their scores)
+        """
+        idx = np.asarray(rows, dtype=np.int64)
+        if idx.size == 0:
+            return [], []
+        scores = self.score(table, rows, interests, center=center, seed=seed)
+
+        if k is not None and k < idx.size:
+            # Partition first so only the k best are fully sorted
+            part = np.argpartition(-scores, k - 1)[:k]
+            # Include everything tied with the k-th score so the cut is stable
+            cutoff = scores[part].min()
+            part = np.flatnonzero(scores >= cutoff)
+            order = part[np.lexsort((idx[part], -scores[part]))][:k]
+        else:
+            order = np.lexsort((idx, -scores))
+
+        return idx[order].tolist(), scores[order].tolist()
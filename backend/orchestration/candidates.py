@@ -0,0 +1,225 @@
+"""
+Best-of-K Itinerary Candidates
+Builds K candidate itineraries with different planning strategies and seeds in
+a process pool, scores each (symbolic feasibility, travel time, interest
+coverage) and keeps the best, plus runners-up as alternatives.
+"""
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Any, Sequence
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.poi_record import POIRecord
+from mcp_tools.poi_search.feature_table import INTEREST_CATEGORIES
+from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP
+from mcp_tools.itinerary_builder.schema import ItineraryBuilderOutput, TimeWindow
+from symbolic.feasibility_engine import FeasibilityEngine
+
+# Candidate 0 is the request itself (its planning mode and seed, ranked order);
+# later candidates cycle through the other strategies with seeds derived from
+# the request seed, and from the second round on also reshuffle near-ties
+CANDIDATE_STRATEGIES = ('clustered', 'optimal', 'greedy')
+
+# Seeded candidates jitter each POI's rank by up to this many places
+RANK_JITTER = 3.0
+
+CANDIDATE_SCORE_WEIGHTS = {
+    'feasibility': 0.5,   # FeasibilityEngine overall score
+    'travel': 0.25,       # 1 - travel time / travel budget
+    'coverage': 0.25      # share of requested interests with a scheduled POI
+}
+
+MAX_CANDIDATE_WORKERS = 4
+MAX_ALTERNATIVES = 2
+
+# Per-process builder, so workers keep their road network / matrix between tasks
+_worker_builder: Optional[ItineraryBuilderMCP] = None
+
+# Process-wide candidate pool, shared by all requests
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _candidate_pool() -> ProcessPoolExecutor:
+    """The shared pool (started on first use, at most MAX_CANDIDATE_WORKERS processes)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(MAX_CANDIDATE_WORKERS, os.cpu_count() or 1))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next request starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def candidate_seed(seed: int, index: int) -> int:
+    """Seed of candidate `index` for a request seed (the request's own for candidate 0)."""
+    if index == 0:
+        return seed
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+
+def candidate_specs(count: int, constraints: Dict) -> List[Dict[str, Any]]:
+    """
+    Planning mode, seed and rank seed for each of `count` candidates
+
+    Candidate 0 keeps the requested planning mode and seed (the single-build
+    plan); rankSeed 0 keeps the ranked order.
+    """
+    requested = constraints.get('planningMode', 'greedy')
+    strategies = (requested,) + tuple(s for s in CANDIDATE_STRATEGIES if s != requested)
+    n = len(strategies)
+    seed = int(constraints.get('seed') or 0)
+    specs = []
+    for i in range(max(1, count)):
+        derived = candidate_seed(seed, i)
+        specs.append({
+            'planningMode': strategies[i % n],
+            'seed': derived,
+            'rankSeed': derived if i >= n else 0
+        })
+    return specs
+
+
+def perturb_ranking(pois: Sequence[POIRecord], seed: int) -> List[POIRecord]:
+    """Ranked POIs with near-ties reshuffled reproducibly (seed 0: unchanged)."""
+    if not seed:
+        return list(pois)
+    rng = np.random.default_rng(seed)
+    keys = np.arange(len(pois)) + rng.uniform(0, RANK_JITTER, len(pois))
+    return [pois[i] for i in np.argsort(keys, kind='stable')]
+
+
+def _build_candidate(
+    pois: Sequence[POIRecord],
+    time_windows: List[TimeWindow],
+    constraints: Dict,
+    spec: Dict[str, Any]
+) -> Dict:
+    """Process-pool task: build one candidate and return it as plain data."""
+    global _worker_builder
+    if _worker_builder is None:
+        _worker_builder = ItineraryBuilderMCP()
+    output = _worker_builder.build_records(
+        perturb_ranking(pois, spec['rankSeed']),
+        time_windows,
+        {**constraints, **spec}
+    )
+    return output.model_dump()
+
+
+def score_candidate(
+    output: ItineraryBuilderOutput,
+    constraints: Dict,
+    interests: Sequence[str],
+    pois: Sequence[POIRecord],
+    engine: Optional[FeasibilityEngine] = None
+) -> Dict[str, float]:
+    """
+    Score one candidate
+
+    Returns:
+        Component scores in [0, 1] and their weighted 'total'
+    """
+    engine = engine or FeasibilityEngine()
+    itinerary = output.itinerary.model_dump()
+    days = itinerary['days']
+    feasibility = engine.evaluate(itinerary, {'pace': constraints.get('pace', 'moderate')})['overall_score']
+
+    budget = max(1, len(days)) * constraints.get('maxTravelTimePerDay', 120)
+    travel = 1.0 - min(1.0, sum(day['totalTravelTime'] for day in days) / budget)
+
+    category_of = {poi['id']: poi.get('category', '') for poi in pois}
+    scheduled = {
+        category_of.get(poi_block['poiId'], '')
+        for day in days for block in day['blocks'] for poi_block in block['pois']
+    }
+    wanted = [i.lower() for i in interests if i.lower() in INTEREST_CATEGORIES]
+    coverage = (
+        sum(1 for i in wanted if scheduled & set(INTEREST_CATEGORIES[i])) / len(wanted)
+        if wanted else 1.0
+    )
+
+    w = CANDIDATE_SCORE_WEIGHTS
+    scores = {'feasibility': feasibility, 'travel': travel, 'coverage': coverage}
+    scores['total'] = round(sum(w[key] * value for key, value in scores.items()), 4)
+    return scores
+
+
+def build_best_of_k(
+    pois: Sequence[POIRecord],
+    time_windows: List[TimeWindow],
+    constraints: Dict,
+    interests: Sequence[str],
+    count: int,
+    budget_seconds: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build up to `count` candidates within a wall-clock budget and rank them
+
+    Candidates run on the shared process pool. Those still queued when the
+    budget expires are cancelled and running ones are ignored; if none has
+    finished by then, the first one to finish is used (and if every worker
+    failed, the default candidate is built in-process).
+
+    Returns:
+        [{'output', 'spec', 'scores'}] best first
+    """
+    specs = candidate_specs(count, constraints)
+    pois = list(pois)
+    started = time.perf_counter()
+    results = []
+
+    if len(specs) == 1:
+        results.append((specs[0], _build_candidate(pois, time_windows, constraints, specs[0])))
+    else:
+        pool = _candidate_pool()
+        try:
+            futures = {
+                pool.submit(_build_candidate, pois, time_windows, constraints, spec): spec
+                for spec in specs
+            }
+            done, pending = wait(futures, timeout=budget_seconds)
+            if not done:
+                done, pending = wait(futures, return_when=FIRST_COMPLETED)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                try:
+                    results.append((futures[future], future.result()))
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"   ⚠️  Candidate {futures[future]} failed: {e}")
+        except BrokenProcessPool as e:
+            print(f"   ⚠️  Candidate pool failed: {e}")
+            _discard_pool(pool)
+        if not results:
+            results.append((specs[0], _build_candidate(pois, time_windows, constraints, specs[0])))
+
+    engine = FeasibilityEngine()
+    ranked = []
+    for spec, dumped in results:
+        output = ItineraryBuilderOutput(**dumped)
+        ranked.append({
+            'output': output,
+            'spec': spec,
+            'scores': score_candidate(output, constraints, interests, pois, engine)
+        })
+    # Ties go to the earlier candidate (the default strategy first)
+    ranked.sort(key=lambda c: (-c['scores']['total'], specs.index(c['spec'])))
+    print(f"   🏁 Best of {len(ranked)}/{len(specs)} candidates in {time.perf_counter() - started:.2f}s: "
+          f"{ranked[0]['spec'] if ranked else None}")
+    return ranked
@@ -0,0 +1,195 @@
+"""
+Plan Cache
+Disk-backed memo of complete plan results (SQLite, survives restarts), keyed by
+normalised constraints, seed, trip start date and a data snapshot version, so
+repeated or popular requests ("3 days Jaipur, culture, relaxed") return instantly
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+# Bump when planning logic changes in ways that invalidate stored plans
+PLAN_CACHE_VERSION = 6
+
+# Constraint fields that determine a plan (anything else, e.g. missing_info, is ignored)
+PLAN_KEY_FIELDS = (
+    'city', 'cities', 'duration', 'interests', 'pace', 'dates', 'constraints',
+    'planningMode', 'candidates', 'candidateBudget', 'timeBudget', 'travelModes', 'hotel', 'meals'
+)
+
+# Opt-in (PLAN_CACHE=on or a PLAN_CACHE_PATH); by default plans live in the
+# user cache directory, never in the source tree
+DEFAULT_PLAN_CACHE_PATH = os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'travel-planner', 'plan_cache.sqlite'
+)
+
+
+def _normalise(value: Any) -> Any:
+    """Case/whitespace-insensitive strings, order-insensitive string lists, sorted dicts."""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        items = [_normalise(v) for v in value]
+        return sorted(items) if all(isinstance(v, str) for v in items) else items
+    return value
+
+
+def _plan_fields(constraints: Dict) -> Dict[str, Any]:
+    """Normalised PLAN_KEY_FIELDS that are set"""
+    return {key: _normalise(constraints.get(key)) for key in PLAN_KEY_FIELDS if constraints.get(key) is not None}
+
+
+def constraints_seed(constraints: Dict) -> int:
+    """Deterministic default planning seed: same normalised constraints, same seed (and cache key)"""
+    return zlib.crc32(json.dumps(_plan_fields(constraints), sort_keys=True, default=str).encode())
+
+
+def make_plan_key(
+    constraints: Dict,
+    seed: Optional[int],
+    start_date: str,
+    snapshot: str
+) -> str:
+    """
+    Cache key for a plan
+
+    Args:
+        constraints: Collected constraints (only PLAN_KEY_FIELDS count)
+        seed: Planning seed (explicit, or constraints_seed)
+        start_date: Resolved trip start date (plans without dates start tomorrow)
+        snapshot: Data snapshot version (see data_snapshot_version)
+    """
+    return json.dumps(
+        [PLAN_CACHE_VERSION, snapshot, start_date, seed, _plan_fields(constraints)], sort_keys=True, default=str
+    )
+
+
+def data_snapshot_version(source: str) -> str:
+    """
+    Version of the data plans are built from: the POI source, PLAN_DATA_VERSION
+    (bump after re-ingesting) and the modification times of the precomputed
+    popularity priors and road network
+    """
+    parts = [source, os.getenv('PLAN_DATA_VERSION', '')]
+    for env in ('POI_POPULARITY_PATH', 'ROAD_NETWORK_PATH'):
+        path = os.getenv(env)
+        try:
+            parts.append(f"{int(os.path.getmtime(path))}" if path else '')
+        except OSError:
+            parts.append('missing')
+    return ':'.join(parts)
+
+
+class PlanCache:
+    """
+    Thread-safe SQLite store of JSON plan results with TTL and LRU eviction
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            path: SQLite file (":memory:" for a process-local cache)
+            max_entries: Maximum stored plans (least recently used evicted first)
+            ttl_seconds: Lifetime of a plan in seconds
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored plan or None (counts a hit or miss)."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM plans WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] + self.ttl_seconds < now:
+                if row is not None:
+                    self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE plans SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict):
+        """Store a plan, evicting the least recently used ones if full."""
+        now = time.time()
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._db.execute(
+                "DELETE FROM plans WHERE key IN ("
+                "SELECT key FROM plans ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM plans")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+_shared_cache: Optional[PlanCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_plan_cache() -> Optional[PlanCache]:
+    """
+    Process-wide plan cache, or None unless enabled with PLAN_CACHE=on or a
+    PLAN_CACHE_PATH (size/TTL from PLAN_CACHE_SIZE / PLAN_CACHE_TTL; also None
+    if the file cannot be opened)
+    """
+    global _shared_cache
+    path = os.getenv("PLAN_CACHE_PATH")
+    if not path and os.getenv("PLAN_CACHE", "").lower() not in ("1", "on", "true", "yes"):
+        return None
+    path = path or DEFAULT_PLAN_CACHE_PATH
+    with _shared_lock:
+        if _shared_cache is None:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                _shared_cache = PlanCache(
+                    path,
+                    max_entries=int(os.getenv("PLAN_CACHE_SIZE", "1000")),
+                    ttl_seconds=float(os.getenv("PLAN_CACHE_TTL", str(7 * 24 * 3600)))
+                )
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Plan cache disabled ({path}): {e}")
+                return None
+        return _shared_cache
@@ -4,10 +4,11 @@ Hybrid LLM + Symbolic architecture
 """
 import os
 import sys
-import random
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from geopy.distance import geodesic
 
 # Add parent directories to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,8 +17,15 @@ from llm.intent_parser import IntentParser
 from llm.constraint_collector import ConstraintCollector
 from mcp_tools.poi_search.implementation import POISearchMCP
 from mcp_tools.poi_search.schema import POISearchInput
-from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP
-from mcp_tools.itinerary_builder.schema import ItineraryBuilderInput, TimeWindow
+from mcp_tools.poi_search.name_index import POI_NAME_ALIASES
+from mcp_tools.itinerary_builder.implementation import ItineraryBuilderMCP, PACE_MAX_POIS
+from mcp_tools.itinerary_builder.meals import FOOD_SUBCATEGORIES, is_food
+from mcp_tools.itinerary_builder.schema import (
+    ItineraryBuilderOutput, TimeWindow, Day, TimeBlock, Itinerary, Reasoning
+)
+from data_sources.poi_record import POIRecord
+from orchestration.candidates import build_best_of_k, perturb_ranking, MAX_ALTERNATIVES
+from orchestration.plan_cache import get_plan_cache, make_plan_key, data_snapshot_version, constraints_seed
 from rag.vector_store import VectorStore
 from rag.rag_loader import RAGLoader
 from rag.explanation_generator import ExplanationGenerator
@@ -32,46 +40,28 @@ if os.path.exists(env_path):
 else:
     load_dotenv()
 
-# POI name aliases: OSM / display names -> RAG canonical names (for better RAG matching)
-POI_NAME_ALIASES = {
-    "amber fort": "Amer Fort",
-    "amer fort": "Amer Fort",
-    "palace of winds": "Hawa Mahal",
-    "hawa mahal": "Hawa Mahal",
-    "city palace": "City Palace",
-    "jantar mantar": "Jantar Mantar",
-    "jal mahal": "Jal Mahal",
-    "water palace": "Jal Mahal",
-    "nahargarh": "Nahargarh Fort",
-    "nahargarh fort": "Nahargarh Fort",
-    "jaigarh": "Jaigarh Fort",
-    "jaigarh fort": "Jaigarh Fort",
-    "albert hall": "Albert Hall Museum",
-    "albert hall museum": "Albert Hall Museum",
-    "birla mandir": "Birla Mandir",
-    "lakshmi narayan temple": "Birla Mandir",
-    "galtaji": "Galtaji Temple",
-    "galtaji temple": "Galtaji Temple",
-    "monkey temple": "Galtaji Temple",
-    "govind dev ji": "Govind Dev Ji Temple",
-    "govind dev ji temple": "Govind Dev Ji Temple",
-    "johari bazaar": "Johari Bazaar",
-    "johari bazar": "Johari Bazaar",
-    "bapu bazaar": "Bapu Bazaar",
-    "bapu bazar": "Bapu Bazaar",
-    "tripolia bazaar": "Tripolia Bazaar",
-    "tripolia bazar": "Tripolia Bazaar",
-    "chokhi dhani": "Chokhi Dhani",
-    "rambagh palace": "Rambagh Palace",
-    "sisodia rani garden": "Sisodia Rani Garden",
-    "sisodia rani": "Sisodia Rani Garden",
-    "central park": "Central Park",
-    "ram niwas garden": "Ram Niwas Garden",
-    "ram niwas": "Ram Niwas Garden",
-    "laxmi mishthan bhandar": "Jaipur Food Guide",
-    "lmb": "Jaipur Food Guide",
-    "rawat mishthan": "Jaipur Food Guide",
-}
+# "greedy" fills days in ranked order; "clustered" (geographic day groups + route
+# ordering, reporting travel saved vs greedy), "optimal" and "anytime" are opt-in
+# through planningMode
+DEFAULT_PLANNING_MODE = "greedy"
+
+# Best-of-K: candidate itineraries per build (1 = single build) and their time budget
+DEFAULT_CANDIDATES = 1
+DEFAULT_CANDIDATE_BUDGET_SECONDS = 5.0
+
+# Restaurants fetched per city for lunch/dinner stops (when meals are turned on)
+MEAL_CANDIDATES = 100
+
+# Multi-city trips: concurrent per-city pipelines and inter-city transfer days
+MAX_CITY_WORKERS = 4
+TRANSFER_SPEED_KMH = 60           # Average intercity road speed
+TRANSFER_ROAD_FACTOR = 1.3        # Road distance / straight-line distance
+TRANSFER_FALLBACK_MINUTES = 360   # When a city could not be located
+
+# handle_user_input arguments that apply to one request, never stored for later turns
+REQUEST_ONLY_KEYS = ("seed", "hotel")
+TRANSFER_MAX_COMFORTABLE_MINUTES = 480
+TRANSFER_DEPARTURE_HOUR = 9
 
 def _normalize_poi_name_for_rag(raw_name: str) -> str:
     """Normalize POI name for RAG lookup: strip OSM ID prefix, apply aliases."""
@@ -102,18 +92,31 @@ class PlanningPipeline:
         self.rag_loader = RAGLoader()
         self.explanation_generator = ExplanationGenerator()
         self.edit_parser = EditParser()
-        self.edit_applier = EditApplier(use_mock_data=use_mock_data)
+        self.edit_applier = EditApplier(use_mock_data=use_mock_data, itinerary_builder=self.itinerary_builder_mcp)
+        # Complete plans memoised on disk (None unless enabled, see get_plan_cache)
+        self.plan_cache = get_plan_cache()
         
         # Conversation state
         self.conversation_history: List[Dict] = []
         self.collected_constraints: Optional[Dict] = None
     
-    def handle_user_input(self, user_input: str) -> Dict[str, Any]:
+    def handle_user_input(
+        self,
+        user_input: str,
+        should_stop: Optional[Callable[[], bool]] = None,
+        seed: Optional[int] = None,
+        hotel: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
         """
         Handle user voice input
         
         Args:
             user_input: User's spoken request
+            should_stop: Polled by anytime planning; True ends optimisation early
+                (e.g. the client disconnected) with the best plan so far
+            seed: Planning seed for this request (same seed + constraints = same plan;
+                default: derived from the constraints)
+            hotel: Where the traveller stays ({lat, lon}); days start and end there
         
         Returns:
             Response dictionary with action and data
@@ -124,7 +127,7 @@ class PlanningPipeline:
         # Merge with existing constraints if we have any
         if self.collected_constraints:
             # Update existing constraints with new information
-            for key in ['city', 'duration', 'interests', 'pace', 'dates']:
+            for key in ['city', 'duration', 'interests', 'pace', 'dates', 'cities']:
                 if intent.get(key) and not self.collected_constraints.get(key):
                     self.collected_constraints[key] = intent[key]
                 elif intent.get(key):
@@ -185,12 +188,24 @@ class PlanningPipeline:
                 "message": "Unexpected constraint collection result"
             }
         
-        # Step 3: Generate itinerary
-        return self._generate_itinerary(constraints)
+        # Step 3: Generate itinerary (seed/hotel apply to this request only, not later turns)
+        request = dict(constraints)
+        if seed is not None:
+            request["seed"] = seed
+        if hotel is not None:
+            request["hotel"] = hotel
+        return self._generate_itinerary(request, should_stop)
     
-    def _generate_itinerary(self, constraints: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_itinerary(
+        self,
+        constraints: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
         """
-        Generate itinerary from constraints
+        Generate itinerary from constraints, memoised in the plan cache
+        
+        Plans are keyed by normalised constraints, seed, trip start date and
+        data snapshot; anytime runs cut short by should_stop are not stored.
         
         Args:
             constraints: Collected constraints
@@ -198,220 +213,123 @@ class PlanningPipeline:
         Returns:
             Response with itinerary or error
         """
+        key = None
+        if self.plan_cache is not None:
+            key = make_plan_key(
+                constraints,
+                self._plan_seed(constraints),
+                self._create_time_windows(1, constraints.get("dates"))[0].morning["start"][:10],
+                data_snapshot_version(self.poi_search_mcp.osm_client.source)
+            )
+            cached = self.plan_cache.get(key)
+            if cached is not None:
+                print("⚡ Plan cache hit")
+                self._restore_plan_state(constraints, cached)
+                return {**cached, "cached": True}
+        
+        # Plans built on mock stand-ins for a failed Overpass search are not stored
+        fallbacks = self.poi_search_mcp.osm_client.fallbacks
+        result = self._plan_itinerary(constraints, should_stop)
+        if (
+            key is not None and result.get("action") == "itinerary" and not (should_stop and should_stop())
+            and self.poi_search_mcp.osm_client.fallbacks == fallbacks
+        ):
+            self.plan_cache.put(key, result)
+        return result
+    
+    def _restore_plan_state(self, constraints: Dict[str, Any], result: Dict[str, Any]):
+        """Pipeline/builder state for a plan served from the cache, so edits work as after a fresh build"""
+        self.collected_constraints = self._session_constraints(constraints)
+        pace = constraints.get("pace", "moderate")
+        if result.get("cities"):
+            # One build per leg, from that leg's slice of the POI list (as after a fresh build)
+            legs = result["cities"]
+            pois = result.get("pois", [])
+            offset = 0
+            for i, (leg, windows) in enumerate(zip(legs, self._leg_time_windows(legs, constraints))):
+                count = leg.get("poiCount", 0)
+                self.itinerary_builder_mcp.remember_build(
+                    pois[offset:offset + count],
+                    windows,
+                    self._builder_constraints(pace, {**constraints, "hotel": leg.get("hotel")}),
+                    keep_other_days=i > 0
+                )
+                offset += count
+            return
+        self.itinerary_builder_mcp.remember_build(
+            result.get("pois", []),
+            self._create_time_windows(constraints.get("duration", 3), constraints.get("dates")),
+            self._builder_constraints(pace, constraints)
+        )
+    
+    @staticmethod
+    def _session_constraints(constraints: Dict[str, Any]) -> Dict[str, Any]:
+        """Constraints kept for later turns, without per-request keys (see REQUEST_ONLY_KEYS)"""
+        return {key: value for key, value in constraints.items() if key not in REQUEST_ONLY_KEYS}
+    
+    def _plan_seed(self, constraints: Dict[str, Any]) -> int:
+        """Explicit planning seed (constraints or preferences), else one derived from the constraints"""
+        seed = constraints.get("seed")
+        if seed is None:
+            seed = (constraints.get("constraints") or {}).get("seed")
+        try:
+            return int(seed) if seed is not None else constraints_seed(constraints)
+        except (TypeError, ValueError):
+            return constraints_seed(constraints)
+    
+    def _plan_itinerary(
+        self,
+        constraints: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """Search, build and enrich an itinerary (uncached)"""
         try:
+            legs = self._city_legs(constraints)
+            if len(legs) > 1:
+                return self._generate_multi_city_itinerary(constraints, legs, should_stop)
+            
             city = constraints.get("city") or os.getenv("TARGET_CITY", "Jaipur, India")
             interests = constraints.get("interests", [])
             duration = constraints.get("duration", 3)
             pace = constraints.get("pace", "moderate")
             
             # Step 1: Search POIs (POI Search MCP)
-            poi_input = POISearchInput(
-                city=city,
-                interests=interests,
-                constraints=constraints.get("constraints") or {}
-            )
+            pois = self._search_city_pois(city, interests, constraints, duration, pace)
             
-            poi_results = self.poi_search_mcp.search(poi_input)
-            
-            if len(poi_results.pois) == 0:
+            if not pois:
                 return {
                     "action": "error",
                     "message": "Could not find any points of interest. Please try a different city or interests."
                 }
             
             # Step 2: Load travel guidance (RAG)
-            print(f"📖 Loading RAG data for {city.split(',')[0].strip()}...")
-            rag_stats = self.rag_loader.load_city_data(city.split(',')[0].strip())  # Load city data into RAG
-            print(f"   ✅ Loaded {rag_stats.get('total_documents', 0)} documents into RAG")
-            
-            # Check vector store stats
-            vector_stats = self.rag_loader.get_stats()
-            print(f"   📦 Vector store has {vector_stats.get('document_count', 0)} total documents")
+            self._load_city_rag(city)
             
             # Step 3: Create time windows
             time_windows = self._create_time_windows(duration, constraints.get("dates"))
             
-            # Step 4: Build itinerary (Itinerary Builder MCP)
-            pois_dict = [
-                poi.model_dump() if hasattr(poi, 'model_dump') else poi.dict()
-                for poi in poi_results.pois
-            ]
-            # Shuffle to avoid same fixed order every request
-            random.shuffle(pois_dict)
-            
-            itinerary_input = ItineraryBuilderInput(
-                pois=pois_dict,
-                timeWindows=time_windows,
-                constraints={
-                    "maxTravelTimePerDay": 120,
-                    "pace": pace,
-                    "preferences": constraints.get("constraints") or {}
-                }
-            )
-            
-            itinerary_result = self.itinerary_builder_mcp.build(itinerary_input)
+            # Step 4: Build itinerary (Itinerary Builder MCP), best of K candidates if requested
+            candidates = self._build_city_candidates(pois, time_windows, pace, constraints, should_stop)
+            itinerary_result = candidates[0]["output"]
             
             # Step 5: Enrich itinerary with RAG data
-            rag_citations = []
-            rag_descriptions = {}
-            
-            # Check if vector store has data
-            vector_stats = self.rag_loader.get_stats()
-            total_docs = vector_stats.get('document_count', 0)
-            print(f"   🔍 Vector store has {total_docs} documents available for querying")
-            
-            if total_docs == 0:
-                print(f"   ⚠️  Warning: Vector store is empty! RAG data may not have loaded correctly.")
-            else:
-                # Query RAG for each POI in the itinerary to get descriptions and citations
-                for day in itinerary_result.itinerary.days:
-                    for block in day.blocks:
-                        for poi_block in block.pois:
-                            poi_name = poi_block.name or poi_block.poiId
-                            # Normalize for RAG: use canonical name (e.g. Amber Fort -> Amer Fort)
-                            canonical_name = _normalize_poi_name_for_rag(poi_name)
-                            search_names = [poi_name, canonical_name]
-                            search_names = list(dict.fromkeys([s for s in search_names if s]))
-                            
-                            # Query RAG for this POI - try multiple query variations
-                            city_name = city.split(',')[0].strip()
-                            rag_results = None
-                            
-                            # Try 1: Full descriptive query (try canonical name first)
-                            for name in search_names:
-                                rag_query = f"What is {name} in {city_name}? Why should tourists visit?"
-                                rag_results = self.rag_loader.vector_store.query(
-                                    query_text=rag_query,
-                                    n_results=3
-                                )
-                                if rag_results:
-                                    break
-                            
-                            # Try 2: Simple query with POI and city
-                            if not rag_results:
-                                for name in search_names:
-                                    simple_query = f"{name} {city_name}"
-                                    rag_results = self.rag_loader.vector_store.query(
-                                        query_text=simple_query,
-                                        n_results=3
-                                    )
-                                    if rag_results:
-                                        break
-                            
-                            # Try 3: Just POI name
-                            if not rag_results:
-                                for name in search_names:
-                                    rag_results = self.rag_loader.vector_store.query(
-                                        query_text=name,
-                                        n_results=3
-                                    )
-                                    if rag_results:
-                                        break
-                            
-                            # Try 4: Search in metadata by POI name (exact match in metadata)
-                            if not rag_results:
-                                try:
-                                    all_results = self.rag_loader.vector_store.query(
-                                        query_text=city_name,
-                                        n_results=50
-                                    )
-                                    rag_results = []
-                                    poi_name_lower = poi_name.lower()
-                                    canonical_lower = canonical_name.lower() if canonical_name else ""
-                                    for result in all_results:
-                                        result_poi_name = result.get("metadata", {}).get("poi_name", "").lower()
-                                        if (poi_name_lower in result_poi_name or result_poi_name in poi_name_lower or
-                                            (canonical_lower and (canonical_lower in result_poi_name or result_poi_name in canonical_lower))):
-                                            rag_results.append(result)
-                                            if len(rag_results) >= 3:
-                                                break
-                                except Exception as e:
-                                    print(f"   ⚠️  Error in metadata search: {e}")
-                            
-                            # Try 5: Query with "tourist attraction" / "things to see" for better semantic match
-                            if not rag_results:
-                                for name in search_names:
-                                    for template in [
-                                        f"tourist attraction {name} {city_name}",
-                                        f"things to see {name} {city_name}",
-                                    ]:
-                                        rag_results = self.rag_loader.vector_store.query(
-                                            query_text=template,
-                                            n_results=3
-                                        )
-                                        if rag_results:
-                                            break
-                                    if rag_results:
-                                        break
-                            # Try 6: POI name variations (short names, no Fort/Palace suffix)
-                            if not rag_results:
-                                for name in search_names:
-                                    for variation in [name, name.lower(), name.replace(" ", "").lower(),
-                                                     name.replace("Fort", "").strip(), name.replace("Palace", "").strip()]:
-                                        if not variation:
-                                            continue
-                                        rag_results = self.rag_loader.vector_store.query(
-                                            query_text=variation,
-                                            n_results=3
-                                        )
-                                        if rag_results:
-                                            break
-                                    if rag_results:
-                                        break
-                            
-                            if rag_results:
-                                print(f"   ✅ Found RAG data for {poi_name}: {len(rag_results)} results")
-                                # Prefer result that explicitly mentions this POI (metadata poi_name or text)
-                                best = rag_results[0]
-                                poi_lower = (canonical_name or poi_name).lower()
-                                for r in rag_results:
-                                    meta_poi = (r.get("metadata") or {}).get("poi_name", "").lower()
-                                    if meta_poi and (poi_lower in meta_poi or meta_poi in poi_lower):
-                                        best = r
-                                        break
-                                    if poi_lower and poi_lower in (r.get("text") or "").lower()[:200]:
-                                        best = r
-                                        break
-                                # Store description from best-matching RAG result (280 chars for quality)
-                                rag_descriptions[poi_block.poiId] = best["text"][:280] + ("..." if len(best["text"]) > 280 else "")
-                                
-                                # Collect citations
-                                for result in rag_results:
-                                    citation = {
-                                        "poi": poi_name,
-                                        "text": result["text"][:100] + "...",
-                                        "source": result["metadata"].get("source", "unknown"),
-                                        "section": result["metadata"].get("section", "unknown"),
-                                        "url": result["metadata"].get("url", "")
-                                    }
-                                    # Avoid duplicate citations by checking source + poi combination
-                                    is_duplicate = any(
-                                        c.get("poi") == citation["poi"] and 
-                                        c.get("source") == citation["source"] and
-                                        c.get("section") == citation["section"]
-                                        for c in rag_citations
-                                    )
-                                    if not is_duplicate:
-                                        rag_citations.append(citation)
-                            else:
-                                print(f"   ⚠️  No RAG data found for {poi_name}")
-                
-                print(f"   📚 Collected {len(rag_citations)} RAG citations total")
+            rag_citations, rag_descriptions = self._enrich_with_rag(itinerary_result.itinerary, city)
             
             # Step 6: Store constraints for this itinerary
-            self.collected_constraints = constraints
+            self.collected_constraints = self._session_constraints(constraints)
             
             # Return success with RAG data and POI list (for grounding eval and API state)
-            pois_for_state = [
-                p.model_dump() if hasattr(p, 'model_dump') else p.dict()
-                for p in poi_results.pois
-            ]
             return {
                 "action": "itinerary",
                 "itinerary": itinerary_result.itinerary.model_dump() if hasattr(itinerary_result.itinerary, 'model_dump') else itinerary_result.itinerary.dict(),
                 "reasoning": itinerary_result.reasoning.model_dump() if hasattr(itinerary_result.reasoning, 'model_dump') else itinerary_result.reasoning.dict(),
-                "poi_count": len(poi_results.pois),
-                "pois": pois_for_state,
+                "poi_count": len(pois),
+                "pois": pois,
+                "planning_metrics": itinerary_result.metrics,
+                "alternatives": [
+                    candidate["output"].itinerary.model_dump()
+                    for candidate in candidates[1:1 + MAX_ALTERNATIVES]
+                ],
                 "message": f"Created {duration}-day itinerary for {city}!",
                 "rag_loaded": True,
                 "rag_citations": rag_citations,
@@ -426,6 +344,376 @@ class PlanningPipeline:
                 "message": f"Error generating itinerary: {e}"
             }
     
+    def _city_legs(self, constraints: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Multi-city legs [{city, days, hotel}] from constraints['cities'] (invalid legs dropped)"""
+        legs = []
+        for leg in constraints.get("cities") or []:
+            if isinstance(leg, dict) and leg.get("city"):
+                try:
+                    days = int(leg.get("days") or 1)
+                except (TypeError, ValueError):
+                    days = 1
+                legs.append({"city": leg["city"], "days": max(1, days), "hotel": leg.get("hotel")})
+        return legs
+    
+    def _search_city_pois(
+        self,
+        city: str,
+        interests: List[str],
+        constraints: Dict[str, Any],
+        duration: int,
+        pace: str
+    ) -> List[POIRecord]:
+        """Ranked POI records for a city, enough to fill `duration` days at `pace`"""
+        poi_input = POISearchInput(
+            city=city,
+            interests=interests,
+            constraints=constraints.get("constraints") or {},
+            seed=self._plan_seed(constraints)
+        )
+        
+        # Typed records end-to-end: no pydantic round-trips between search and builder
+        poi_page = self.poi_search_mcp.search_records(poi_input)
+        pois = list(poi_page.pois)
+        
+        # Long or fast-paced trips need more POIs than one page: pull further pages lazily
+        needed = duration * 3 * PACE_MAX_POIS.get(pace, 2)
+        next_cursor = poi_page.nextCursor
+        while next_cursor and len(pois) < needed:
+            poi_page = self.poi_search_mcp.search_records(poi_input.model_copy(update={"cursor": next_cursor}))
+            pois.extend(poi_page.pois)
+            next_cursor = poi_page.nextCursor
+        
+        # Restaurants for lunch/dinner stops (the builder keeps them out of sight slots).
+        # When the first search already fetched restaurants' OSM category, keep its
+        # interests so this only re-filters its cached candidates instead of fetching
+        if self._meals_enabled(constraints):
+            categories = self.poi_search_mcp.search_categories(interests)
+            food_page = self.poi_search_mcp.search_records(poi_input.model_copy(update={
+                "interests": interests if "amenity" in categories else ["food"],
+                "constraints": {**poi_input.constraints, "category": sorted(FOOD_SUBCATEGORIES)},
+                "pageSize": MEAL_CANDIDATES
+            }))
+            seen = {poi["id"] for poi in pois}
+            pois.extend(poi for poi in food_page.pois if is_food(poi) and poi["id"] not in seen)
+        return pois
+    
+    def _meals_enabled(self, constraints: Dict[str, Any]) -> bool:
+        """Lunch/dinner stops only if constraints or preferences turn meals on"""
+        meals = constraints.get("meals")
+        if meals is None:
+            meals = (constraints.get("constraints") or {}).get("meals", False)
+        return bool(meals)
+    
+    def _load_city_rag(self, city: str):
+        """Load travel guidance for a city into the vector store"""
+        city_name = city.split(',')[0].strip()
+        print(f"📖 Loading RAG data for {city_name}...")
+        rag_stats = self.rag_loader.load_city_data(city_name)  # Load city data into RAG
+        print(f"   ✅ Loaded {rag_stats.get('total_documents', 0)} documents into RAG")
+        
+        # Check vector store stats
+        vector_stats = self.rag_loader.get_stats()
+        print(f"   📦 Vector store has {vector_stats.get('document_count', 0)} total documents")
+    
+    def _build_city_itinerary(
+        self,
+        pois: List[POIRecord],
+        time_windows: List[TimeWindow],
+        pace: str,
+        constraints: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None,
+        builder: Optional[ItineraryBuilderMCP] = None
+    ) -> ItineraryBuilderOutput:
+        """Build day blocks for one city (Itinerary Builder MCP)"""
+        return self._build_city_candidates(pois, time_windows, pace, constraints, should_stop, builder)[0]["output"]
+    
+    def _build_city_candidates(
+        self,
+        pois: List[POIRecord],
+        time_windows: List[TimeWindow],
+        pace: str,
+        constraints: Dict[str, Any],
+        should_stop: Optional[Callable[[], bool]] = None,
+        builder: Optional[ItineraryBuilderMCP] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Candidate itineraries for one city, best first ([{output, spec, scores}])
+        
+        One build by default; `candidates` > 1 (in constraints or preferences)
+        builds that many strategy/seed variants in a process pool within
+        `candidateBudget` seconds and ranks them. `timeBudget` (seconds) bounds
+        anytime planning, which also ends early when should_stop() is True.
+        Builds run on `builder` (default: the pipeline's builder), which keeps
+        their state for rebuilds.
+        """
+        builder = builder or self.itinerary_builder_mcp
+        preferences = constraints.get("constraints") or {}
+        builder_constraints = self._builder_constraints(pace, constraints)
+        count = int(constraints.get("candidates") or preferences.get("candidates") or DEFAULT_CANDIDATES)
+        if count <= 1:
+            output = builder.build_records(pois, time_windows, builder_constraints, should_stop)
+            return [{"output": output, "spec": {"planningMode": builder_constraints["planningMode"]}, "scores": None}]
+        
+        budget = float(constraints.get("candidateBudget") or preferences.get("candidateBudget") or DEFAULT_CANDIDATE_BUDGET_SECONDS)
+        ranked = build_best_of_k(
+            pois, time_windows, builder_constraints, constraints.get("interests", []), count, budget
+        )
+        # Candidates were built in worker processes: keep the winner's inputs for rebuilds
+        winner = ranked[0]["spec"]
+        builder.remember_build(perturb_ranking(pois, winner["rankSeed"]), time_windows, {**builder_constraints, **winner})
+        ranked[0]["output"].metrics["candidates"] = [
+            {**candidate["spec"], "score": candidate["scores"]["total"]} for candidate in ranked
+        ]
+        return ranked
+    
+    def _builder_constraints(self, pace: str, constraints: Dict[str, Any]) -> Dict[str, Any]:
+        """Itinerary Builder constraints from the collected constraints and preferences"""
+        preferences = constraints.get("constraints") or {}
+        builder_constraints = {
+            "maxTravelTimePerDay": 120,
+            "pace": pace,
+            "preferences": preferences,
+            "planningMode": constraints.get("planningMode") or preferences.get("planningMode") or DEFAULT_PLANNING_MODE
+        }
+        time_budget = constraints.get("timeBudget") or preferences.get("timeBudget")
+        if time_budget:
+            builder_constraints["timeBudget"] = float(time_budget)
+        hotel = constraints["hotel"] if "hotel" in constraints else preferences.get("hotel")
+        if hotel:
+            builder_constraints["hotel"] = hotel
+        builder_constraints["meals"] = self._meals_enabled(constraints)
+        travel_modes = constraints.get("travelModes") or preferences.get("travelModes")
+        if travel_modes is not None:
+            builder_constraints["travelModes"] = list(travel_modes)
+        builder_constraints["seed"] = self._plan_seed(constraints)
+        return builder_constraints
+    
+    def _prepare_city(
+        self,
+        leg: Dict[str, Any],
+        interests: List[str],
+        constraints: Dict[str, Any],
+        pace: str
+    ) -> Tuple[List[POIRecord], Optional[Dict]]:
+        """Per-city I/O for a multi-city trip: geocoding + POI search, then RAG loading"""
+        pois = self._search_city_pois(leg["city"], interests, constraints, leg["days"], pace)
+        if pois:
+            self._load_city_rag(leg["city"])
+        # City centre from geocoding; mock/offline runs fall back to the POIs' median point
+        center = self.poi_search_mcp.osm_client.get_city_center(leg["city"])
+        if center is None and pois:
+            lats = sorted(p["coordinates"]["lat"] for p in pois)
+            lons = sorted(p["coordinates"]["lon"] for p in pois)
+            center = {"lat": lats[len(lats) // 2], "lon": lons[len(lons) // 2]}
+        return pois, center
+    
+    def _leg_time_windows(self, legs: List[Dict[str, Any]], constraints: Dict[str, Any]) -> List[List[TimeWindow]]:
+        """Time windows per leg: each city's days in order, with a transfer day between cities"""
+        windows_by_leg = []
+        day_num = 1
+        for i, leg in enumerate(legs):
+            if i:
+                day_num += 1  # Transfer day
+            windows_by_leg.append(self._create_time_windows(
+                leg["days"], constraints.get("dates"), first_day=day_num
+            ))
+            day_num += leg["days"]
+        return windows_by_leg
+    
+    def _transfer_day(
+        self,
+        day_num: int,
+        date: datetime,
+        from_leg: Dict[str, Any],
+        to_leg: Dict[str, Any],
+        from_center: Optional[Dict],
+        to_center: Optional[Dict]
+    ) -> Day:
+        """Inter-city transfer day: one 'transfer' block sized by road distance between centres"""
+        travel_minutes = TRANSFER_FALLBACK_MINUTES
+        if from_center and to_center:
+            km = geodesic(
+                (from_center["lat"], from_center["lon"]),
+                (to_center["lat"], to_center["lon"])
+            ).kilometers
+            travel_minutes = int(km * TRANSFER_ROAD_FACTOR / TRANSFER_SPEED_KMH * 60)
+        start = date.replace(hour=TRANSFER_DEPARTURE_HOUR, minute=0, second=0, microsecond=0)
+        end = start + timedelta(minutes=travel_minutes)
+        return Day(
+            day=day_num,
+            date=start.date().isoformat(),
+            city=f"{from_leg['city']} → {to_leg['city']}",
+            blocks=[TimeBlock(
+                time={"start": start.isoformat(), "end": end.isoformat()},
+                type="transfer",
+                pois=[],
+                travelTime=travel_minutes,
+                totalDuration=travel_minutes
+            )],
+            totalTravelTime=travel_minutes,
+            feasibilityScore=1.0 if travel_minutes <= TRANSFER_MAX_COMFORTABLE_MINUTES else 0.7
+        )
+    
+    def _generate_multi_city_itinerary(
+        self,
+        constraints: Dict[str, Any],
+        legs: List[Dict[str, Any]],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan a multi-city trip ("3 days Jaipur, 2 days Udaipur")
+        
+        Per-city POI search (with geocoding) and RAG loading run concurrently,
+        then per-city day blocks are built and enriched concurrently, so the plan
+        costs roughly the latency of the slowest city. A transfer day is inserted
+        between consecutive cities.
+        """
+        interests = constraints.get("interests", [])
+        pace = constraints.get("pace", "moderate")
+        cities = [leg["city"] for leg in legs]
+        workers = min(len(legs), MAX_CITY_WORKERS)
+        
+        # Step 1 + 2: Search POIs and load RAG for every city concurrently
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            prepared = list(pool.map(
+                lambda leg: self._prepare_city(leg, interests, constraints, pace),
+                legs
+            ))
+        
+        missing = [leg["city"] for leg, (pois, _) in zip(legs, prepared) if not pois]
+        if missing:
+            return {
+                "action": "error",
+                "message": f"Could not find any points of interest in {', '.join(missing)}. Please try different cities or interests."
+            }
+        
+        # Step 3: Lay out days: each city's days, with a transfer day between cities
+        windows_by_leg = self._leg_time_windows(legs, constraints)
+        
+        # Step 4 + 5: Build and enrich each city's days concurrently, each leg on
+        # its own builder (builders keep per-build state)
+        leg_builders = [ItineraryBuilderMCP(self.itinerary_builder_mcp.travel_engine) for _ in legs]
+        
+        def build_leg(i: int):
+            # Each city has its own hotel (if any); the trip-level one does not apply
+            leg_constraints = {**constraints, "hotel": legs[i]["hotel"]}
+            result = self._build_city_itinerary(
+                prepared[i][0], windows_by_leg[i], pace, leg_constraints, should_stop, leg_builders[i]
+            )
+            citations, descriptions = self._enrich_with_rag(result.itinerary, legs[i]["city"])
+            return result, citations, descriptions
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(build_leg, range(len(legs))))
+        # Edits rebuild each day from the leg it belongs to
+        self.itinerary_builder_mcp.adopt_builds(leg_builders)
+        for leg, (pois, _) in zip(legs, prepared):
+            leg["poiCount"] = len(pois)
+        
+        # Step 6: Stitch cities and transfer days together
+        days: List[Day] = []
+        decisions = []
+        warnings = []
+        rag_citations = []
+        rag_descriptions = {}
+        rain_alternatives = {}
+        for i, (result, citations, descriptions) in enumerate(built):
+            if i:
+                first_window = windows_by_leg[i][0]
+                days.append(self._transfer_day(
+                    first_window.day - 1,
+                    datetime.fromisoformat(first_window.morning["start"]) - timedelta(days=1),
+                    legs[i - 1], legs[i],
+                    prepared[i - 1][1], prepared[i][1]
+                ))
+            for day in result.itinerary.days:
+                day.city = legs[i]["city"]
+                days.append(day)
+            decisions.extend(result.reasoning.decisions)
+            warnings.extend(f"{legs[i]['city']}: {w}" for w in result.reasoning.warnings)
+            rag_citations.extend(citations)
+            rag_descriptions.update(descriptions)
+            rain_alternatives.update(result.itinerary.rainAlternatives)
+        
+        itinerary = Itinerary(days=days, rainAlternatives=rain_alternatives)
+        reasoning = Reasoning(decisions=decisions, warnings=warnings)
+        pois = [poi for pois, _ in prepared for poi in pois]
+        self.collected_constraints = self._session_constraints(constraints)
+        
+        return {
+            "action": "itinerary",
+            "itinerary": itinerary.model_dump(),
+            "reasoning": reasoning.model_dump(),
+            "poi_count": len(pois),
+            "pois": pois,
+            "cities": legs,
+            "planning_metrics": {leg["city"]: result.metrics for leg, (result, _, _) in zip(legs, built)},
+            "message": f"Created {len(days)}-day itinerary for {' → '.join(cities)}!",
+            "rag_loaded": True,
+            "rag_citations": rag_citations,
+            "rag_descriptions": rag_descriptions
+        }
+    
+    def _enrich_with_rag(self, itinerary: Itinerary, city: str) -> Tuple[List[Dict], Dict[str, str]]:
+        """
+        Attach RAG descriptions and citations to each POI in an itinerary
+        
+        POIs linked to documents at ingest (curated names, aliases, OSM ids; see
+        rag.poi_linker) are plain lookups; any other POI costs one vector query,
+        whose result the linker remembers.
+        
+        Returns:
+            (citations, descriptions by POI ID)
+        """
+        rag_citations = []
+        rag_descriptions = {}
+
+        # Check if vector store has data
+        vector_stats = self.rag_loader.get_stats()
+        total_docs = vector_stats.get('document_count', 0)
+        print(f"   🔍 Vector store has {total_docs} documents available for querying")
+
+        if total_docs == 0:
+            print(f"   ⚠️  Warning: Vector store is empty! RAG data may not have loaded correctly.")
+            return rag_citations, rag_descriptions
+
+        linker = self.rag_loader.linker
+        city_name = city.split(',')[0].strip()
+        queries = 0
+        for day in itinerary.days:
+            for block in day.blocks:
+                for poi_block in block.pois:
+                    poi_name = poi_block.name or poi_block.poiId
+                    link = linker.lookup(city, poi_block.poiId, poi_name)
+                    if link is None:
+                        # Unknown POI: one query, by canonical name (e.g. Amber Fort -> Amer Fort)
+                        canonical_name = _normalize_poi_name_for_rag(poi_name)
+                        results = self.rag_loader.vector_store.query(
+                            query_text=f"What is {canonical_name} in {city_name}? Why should tourists visit?",
+                            n_results=3
+                        )
+                        queries += 1
+                        link = linker.remember(city, poi_block.poiId, poi_name, results)
+
+                    if not link.found:
+                        print(f"   ⚠️  No RAG data found for {poi_name}")
+                        continue
+                    rag_descriptions[poi_block.poiId] = link.description
+                    for citation in link.citations(poi_name):
+                        # Avoid duplicate citations by checking source + poi combination
+                        is_duplicate = any(
+                            c.get("poi") == citation["poi"] and
+                            c.get("source") == citation["source"] and
+                            c.get("section") == citation["section"]
+                            for c in rag_citations
+                        )
+                        if not is_duplicate:
+                            rag_citations.append(citation)
+
+        print(f"   📚 Collected {len(rag_citations)} RAG citations total ({queries} vector queries)")
+        return rag_citations, rag_descriptions
+    
     def explain(self, question: str, itinerary: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Answer questions about the itinerary in a grounded way. Handles:
@@ -446,8 +734,14 @@ class PlanningPipeline:
 
         # 1) Weather / rain
         if "rain" in question_lower or ("weather" in question_lower and ("if" in question_lower or "what" in question_lower)):
-            result = self.explanation_generator.explain_weather_impact(city)
-            return self._normalize_explain_response(result)
+            result = self._normalize_explain_response(self.explanation_generator.explain_weather_impact(city))
+            swaps = self._rain_swaps(itinerary)
+            if swaps:
+                result["answer"] = (result["answer"] + " If it rains on your trip: " + "; ".join(
+                    f"swap {swap['from']} for {swap['to']} ({swap['distanceKm']:.1f} km away)" for swap in swaps
+                ) + ".").strip()
+                result["rain_alternatives"] = swaps
+            return result
         # 2) Doable / feasible
         if "doable" in question_lower or "feasible" in question_lower or "realistic" in question_lower:
             result = self.explanation_generator.explain_plan(question, itinerary, city)
@@ -465,6 +759,30 @@ class PlanningPipeline:
         result = self.explanation_generator.explain_plan(question, itinerary, city)
         return self._normalize_explain_response(result)
 
+    def _rain_swaps(self, itinerary: Dict) -> List[Dict[str, Any]]:
+        """Nearest unused indoor alternative for each outdoor POI in the plan (precomputed at build time)"""
+        alternatives = itinerary.get("rainAlternatives") or {}
+        days = itinerary.get("days") or []
+        used = {poi.get("poiId") for day in days for block in day.get("blocks", []) for poi in block.get("pois", [])}
+        swaps = []
+        for day in days:
+            for block in day.get("blocks", []):
+                for poi in block.get("pois", []):
+                    option = next(
+                        (alt for alt in alternatives.get(poi.get("poiId"), []) if alt["poiId"] not in used), None
+                    )
+                    if option:
+                        used.add(option["poiId"])
+                        swaps.append({
+                            "day": day.get("day"),
+                            "block": block.get("type"),
+                            "from": poi.get("name") or poi.get("poiId"),
+                            "to": option["name"],
+                            "poiId": option["poiId"],
+                            "distanceKm": option["distanceKm"]
+                        })
+        return swaps
+    
     def _extract_poi_from_question(self, question: str, itinerary: Dict) -> Optional[str]:
         """Try to get a POI name from the question or from the itinerary."""
         # From itinerary: collect POI names for matching
@@ -543,9 +861,10 @@ class PlanningPipeline:
     def _create_time_windows(
         self,
         duration: int,
-        dates: Optional[Dict] = None
+        dates: Optional[Dict] = None,
+        first_day: int = 1
     ) -> List[TimeWindow]:
-        """Create time windows for itinerary"""
+        """Create time windows for itinerary (days numbered from first_day, dated from the trip start)"""
         time_windows = []
         
         # Default start date (today + 1)
@@ -561,7 +880,7 @@ class PlanningPipeline:
         else:
             base_date = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
         
-        for day in range(1, duration + 1):
+        for day in range(first_day, first_day + duration):
             day_date = base_date + timedelta(days=day - 1)
             
             time_windows.append(TimeWindow(
@@ -3,12 +3,14 @@ RAG module - Vector store and explanation generation
 """
 from .vector_store import VectorStore
 from .rag_loader import RAGLoader
+from .poi_linker import POILinker
 from .explanation_generator import ExplanationGenerator
 from .jaipur_data import JAIPUR_RAG_DATA, JAIPUR_POIS, JAIPUR_FESTIVALS
 
 __all__ = [
     'VectorStore', 
     'RAGLoader', 
+    'POILinker',
     'ExplanationGenerator',
     'JAIPUR_RAG_DATA',
     'JAIPUR_POIS',
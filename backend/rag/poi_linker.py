@@ -0,0 +1,153 @@
+"""
+POI Linker
+Entity links from POIs to RAG documents, built as documents are ingested:
+curated `poi_name` metadata, its aliases (POI_NAME_ALIASES) and OSM ids map to
+document ids, and each city keeps POI id / normalised name -> best description
+and citations, so enriching a known POI needs no vector query
+"""
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from mcp_tools.poi_search.name_index import POI_NAME_ALIASES, normalize_name
+
+# Description length shown per POI and citation snippet length
+DESCRIPTION_CHARS = 280
+CITATION_CHARS = 100
+
+# Linked documents cited per POI
+MAX_CITATIONS = 3
+
+# Bucket for documents without a city (e.g. POI descriptions from OSM)
+ANY_CITY = ''
+
+
+class LinkedPOI(NamedTuple):
+    """RAG data for one POI (no documents = known to have none)"""
+    description: Optional[str]
+    documents: Tuple[Dict, ...]   # Best first: {id, text, metadata}
+
+    @property
+    def found(self) -> bool:
+        return bool(self.documents)
+
+    def citations(self, poi_name: str) -> List[Dict]:
+        """Citation dicts for the API (same shape the pipeline has always returned)."""
+        return [
+            {
+                "poi": poi_name,
+                "text": doc["text"][:CITATION_CHARS] + "...",
+                "source": doc["metadata"].get("source", "unknown"),
+                "section": doc["metadata"].get("section", "unknown"),
+                "url": doc["metadata"].get("url", "")
+            }
+            for doc in self.documents
+        ]
+
+
+NO_LINK = LinkedPOI(None, ())
+
+
+def city_key(city: str) -> str:
+    """'Jaipur, India' -> 'jaipur'."""
+    return normalize_name((city or '').split(',')[0])
+
+
+def _describe(text: str) -> str:
+    return text[:DESCRIPTION_CHARS] + ("..." if len(text) > DESCRIPTION_CHARS else "")
+
+
+def _mentions(doc: Dict, name: str) -> bool:
+    """True if a document is about name (poi_name metadata or the opening of its text)."""
+    meta_poi = normalize_name((doc.get("metadata") or {}).get("poi_name", ""))
+    if meta_poi and (name in meta_poi or meta_poi in name):
+        return True
+    return bool(name) and name in normalize_name((doc.get("text") or "")[:200])
+
+
+class POILinker:
+    """
+    Thread-safe per-city map from POI keys to linked documents.
+    Keys are 'id:<osm id>' and normalised names (poi_name plus every alias of
+    it); lookups try the POI id, then its name, then its canonical alias.
+    Vector-search results for unknown POIs are remembered (including "none")
+    until new documents arrive.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        aliases = POI_NAME_ALIASES if aliases is None else aliases
+        self._canonical: Dict[str, str] = {normalize_name(a): normalize_name(c) for a, c in aliases.items()}
+        self._alias_groups: Dict[str, List[str]] = {}
+        for alias, canonical in self._canonical.items():
+            self._alias_groups.setdefault(canonical, []).append(alias)
+        self._docs: Dict[str, Dict] = {}
+        self._links: Dict[str, Dict[str, List[str]]] = {}   # city -> key -> doc ids
+        self._remembered: Dict[Tuple[str, str], LinkedPOI] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add_documents(self, documents: Sequence[Dict]):
+        """
+        Link ingested documents (same dicts as VectorStore.add_documents).
+        Only documents with `poi_name` or `osm_id` metadata are linked; adding a
+        document twice is a no-op.
+        """
+        with self._lock:
+            for doc in documents:
+                metadata = doc.get("metadata") or {}
+                doc_id = doc.get("id")
+                if not doc_id or doc_id in self._docs or not (metadata.get("poi_name") or metadata.get("osm_id")):
+                    continue
+                self._docs[doc_id] = {"id": doc_id, "text": doc.get("text", ""), "metadata": metadata}
+                links = self._links.setdefault(city_key(metadata.get("city", ANY_CITY)), {})
+                keys = []
+                if metadata.get("osm_id"):
+                    keys.append("id:" + str(metadata["osm_id"]))
+                name = normalize_name(metadata.get("poi_name", ""))
+                if name:
+                    canonical = self._canonical.get(name, name)
+                    keys.extend({name, canonical, *self._alias_groups.get(canonical, ())})
+                for key in keys:
+                    links.setdefault(key, []).append(doc_id)
+            # New documents may answer POIs that had no data before
+            self._remembered.clear()
+
+    def lookup(self, city: str, poi_id: Optional[str], name: Optional[str]) -> Optional[LinkedPOI]:
+        """
+        Linked documents for a POI, or None if the POI is unknown (never
+        linked or looked up)
+        """
+        normalized = normalize_name(name or '')
+        keys = ["id:" + poi_id] if poi_id else []
+        if normalized:
+            keys.extend([normalized, self._canonical.get(normalized, normalized)])
+        with self._lock:
+            for bucket in (city_key(city), ANY_CITY):
+                links = self._links.get(bucket, {})
+                for key in keys:
+                    if key in links:
+                        documents = tuple(self._docs[doc_id] for doc_id in links[key][:MAX_CITATIONS])
+                        return LinkedPOI(_describe(documents[0]["text"]), documents)
+            return self._remembered.get((city_key(city), poi_id or normalized))
+
+    def remember(self, city: str, poi_id: Optional[str], name: Optional[str], results: List[Dict]) -> LinkedPOI:
+        """
+        Store vector-search results for an unknown POI, best match first
+        (a document about the POI beats a merely similar one)
+
+        Returns:
+            The link (NO_LINK if results is empty)
+        """
+        normalized = normalize_name(name or '')
+        canonical = self._canonical.get(normalized, normalized)
+        results = [r for r in results if r.get("text")]
+        best = next((r for r in results if _mentions(r, canonical)), results[0] if results else None)
+        if best is None:
+            link = NO_LINK
+        else:
+            documents = (best,) + tuple(r for r in results if r is not best)
+            link = LinkedPOI(_describe(best["text"]), documents[:MAX_CITATIONS])
+        with self._lock:
+            self._remembered[(city_key(city), poi_id or normalized)] = link
+        return link
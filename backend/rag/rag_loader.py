@@ -8,6 +8,7 @@ from typing import List, Dict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rag.vector_store import VectorStore
+from rag.poi_linker import POILinker
 from data_sources.wikivoyage_scraper import WikivoyageScraper
 from rag.jaipur_data import JAIPUR_RAG_DATA, JAIPUR_POIS, JAIPUR_FESTIVALS
 
@@ -19,6 +20,9 @@ class RAGLoader:
     def __init__(self):
         self.vector_store = VectorStore()
         self.wikivoyage_scraper = WikivoyageScraper()
+        # POI -> document links, filled as documents are ingested
+        self.linker = POILinker()
+        self._stored_linked = False
     
     def load_city_data(self, city: str) -> Dict:
         """
@@ -52,6 +56,7 @@ class RAGLoader:
                     self.vector_store.add_documents(JAIPUR_RAG_DATA)
                     stats["curated_chunks"] = len(JAIPUR_RAG_DATA)
                     print(f"   ✅ Loaded {len(JAIPUR_RAG_DATA)} curated chunks")
+                self.linker.add_documents(JAIPUR_RAG_DATA)
             except Exception as e:
                 stats["errors"].append(f"Curated data error: {e}")
                 print(f"   ❌ Error loading curated data: {e}")
@@ -90,6 +95,8 @@ class RAGLoader:
             stats["errors"].append(f"Wikivoyage error: {e}")
             print(f"   ❌ Error: {e}")
         
+        self._link_stored_documents()
+        
         # Calculate total
         stats["total_documents"] = stats["curated_chunks"] + stats["wikivoyage_chunks"]
         
@@ -114,6 +121,7 @@ class RAGLoader:
                     "metadata": {
                         "type": "poi",
                         "poi_name": poi["name"],
+                        "osm_id": poi.get("id", ""),
                         "category": poi.get("category", "unknown"),
                         "source": "osm"
                     },
@@ -123,11 +131,26 @@ class RAGLoader:
         
         if chunks:
             self.vector_store.add_documents(chunks)
+            self.linker.add_documents(chunks)
         
         return {
             "poi_chunks": len(chunks)
         }
     
+    def _link_stored_documents(self):
+        """Link documents persisted by earlier runs (once per loader; a metadata read, not a vector query)"""
+        if self._stored_linked:
+            return
+        try:
+            stored = self.vector_store.collection.get(include=["documents", "metadatas"])
+            self.linker.add_documents([
+                {"id": doc_id, "text": text, "metadata": metadata or {}}
+                for doc_id, text, metadata in zip(stored.get("ids") or [], stored.get("documents") or [], stored.get("metadatas") or [])
+            ])
+            self._stored_linked = True
+        except Exception as e:
+            print(f"   ⚠️  Could not link stored documents: {e}")
+    
     def get_stats(self) -> Dict:
         """Get vector store statistics"""
         return self.vector_store.get_collection_stats()
@@ -157,7 +157,8 @@ class FeasibilityEngine:
         poi_count = 0
         
         for block in day.get("blocks", []):
-            poi_count += len(block.get("pois", []))
+            # Meal stops are not sightseeing visits
+            poi_count += sum(1 for poi in block.get("pois", []) if not poi.get("meal"))
         
         limits = self.pace_poi_limits.get(pace, self.pace_poi_limits["moderate"])
         